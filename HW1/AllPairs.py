@@ -0,0 +1,158 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from CompactGraph import edgeWeights, gridGraph
+from GraphCache import cachePath, cachedConnections, loadGraph, saveGraph
+from Main import aStarSearch, allPairsSearch, runSearch
+from RouteEngine import dijkstraTree
+
+# Precomputed all-pairs shortest paths over the distance() weighted graph, for graphs small
+# enough that answering a query should be a table lookup. One Dijkstra tree per source node
+# gives a row of both n x n tables, kept in graph.tables so saveGraph() stores them with the
+# graph and loadGraph() memory maps them:
+#   allPairsDistances  float32 shortest distance, inf where unreachable
+#   allPairsNextHop    first node after the source on a shortest path, -1 where unreachable
+# allPairsSearch in Main.py unrolls the next hops into a path and falls back to aStarSearch
+# for graphs without the tables.
+
+# the tables are not built when they would take more than this
+maxTableBytes = 2 * 1024 ** 3
+
+def nextHopType(n):
+    return np.int16 if n < 2 ** 15 else np.int32
+
+# Bytes the two tables take for a graph of n nodes
+def allPairsBytes(n):
+    return n * n * (np.dtype(np.float32).itemsize + np.dtype(nextHopType(n)).itemsize)
+
+def fitsAllPairs(graph, maxBytes=maxTableBytes):
+    return allPairsBytes(len(graph)) <= maxBytes
+
+# distance and next hop rows of the given sources
+def allPairsRows(graph, sources):
+    n = len(graph)
+    distances = np.full((len(sources), n), np.inf, dtype=np.float32)
+    nextHops = np.full((len(sources), n), -1, dtype=nextHopType(n))
+    for row, source in enumerate(sources):
+        parents, cost = dijkstraTree(graph, source)
+        # the first hop of a node is the first hop of its parent, the tree is walked once
+        hops = {source: source}
+        for node in cost:
+            chain = []
+            while node not in hops:
+                if parents[node] == source:
+                    hops[node] = node
+                    break
+                chain.append(node)
+                node = parents[node]
+            for child in chain:
+                hops[child] = hops[node]
+        nodes = list(cost.keys())
+        distances[row, nodes] = list(cost.values())
+        nextHops[row, nodes] = [hops[node] for node in nodes]
+    return distances, nextHops
+
+# the graph each worker process maps from the cache file
+workerGraph = None
+
+def initWorker(graphPath):
+    global workerGraph
+    workerGraph = loadGraph(graphPath)
+
+def rowsTask(sources):
+    return sources, allPairsRows(workerGraph, sources)
+
+# Builds both tables into graph.tables and returns True, or returns False without building
+# when they would take more than maxBytes. With graphPath, the cache file of this graph,
+# blocks of sources are spread over a pool of workers
+def addAllPairs(graph, maxBytes=maxTableBytes, graphPath=None, workers=None, blockSize=64):
+    if not fitsAllPairs(graph, maxBytes):
+        return False
+    n = len(graph)
+    edgeWeights(graph)
+    distances = np.empty((n, n), dtype=np.float32)
+    nextHops = np.empty((n, n), dtype=nextHopType(n))
+    blocks = [list(range(begin, min(begin + blockSize, n))) for begin in range(0, n, blockSize)]
+    if graphPath and (workers or os.cpu_count()) > 1:
+        with ProcessPoolExecutor(workers, initializer=initWorker, initargs=(graphPath,)) as executor:
+            results = executor.map(rowsTask, blocks)
+            for sources, (distanceRows, hopRows) in results:
+                distances[sources[0]:sources[-1] + 1] = distanceRows
+                nextHops[sources[0]:sources[-1] + 1] = hopRows
+    else:
+        for sources in blocks:
+            distances[sources[0]:sources[-1] + 1], nextHops[sources[0]:sources[-1] + 1] = allPairsRows(graph, sources)
+    graph.tables["allPairsDistances"] = distances
+    graph.tables["allPairsNextHop"] = nextHops
+    return True
+
+# Shortest distance between two node ids, None when unreachable or the graph has no tables
+def allPairsDistance(graph, start, goal):
+    distances = graph.tables.get("allPairsDistances")
+    if distances is None or not np.isfinite(distances[start, goal]):
+        return None
+    return float(distances[start, goal])
+
+# Adds the tables to the graph cache of the given source files, reports if the graph is too big
+def storeAllPairs(file_path, csv_file, maxBytes=maxTableBytes, workers=None):
+    graph = cachedConnections(file_path, csv_file)
+    path = cachePath(file_path)
+    if not addAllPairs(graph, maxBytes, path, workers):
+        print(f"{len(graph)} nodes need {allPairsBytes(len(graph)) / 1024 ** 2:.0f} MB of all-pairs tables, more than {maxBytes / 1024 ** 2:.0f} MB; queries use A* instead")
+        return graph
+    saveGraph(graph, path, (file_path, csv_file))
+    return loadGraph(path)
+
+# Compares table lookups with aStarSearch
+def main():
+    parser = argparse.ArgumentParser(description="Build all-pairs distance and next-hop tables and compare lookups with A*")
+    parser.add_argument("--grid", type=int, default=0, help="use an N x N jittered grid graph instead of the Kansas data")
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-gb", type=float, default=maxTableBytes / 1024 ** 3, help="largest table size to build")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    maxBytes = int(args.max_gb * 1024 ** 3)
+
+    startTime = time.perf_counter()
+    if args.grid:
+        graph = gridGraph(args.grid, args.grid, args.jitter, args.seed)
+        edgeWeights(graph)
+        # the workers map the graph from a cache file, and queries run on the tables as loaded from disk
+        indexFile = tempfile.NamedTemporaryFile(suffix=".graph", delete=False)
+        indexFile.close()
+        saveGraph(graph, indexFile.name)
+        if addAllPairs(graph, maxBytes, indexFile.name, args.workers):
+            saveGraph(graph, indexFile.name)
+            graph = loadGraph(indexFile.name)
+        else:
+            print(f"{len(graph)} nodes need {allPairsBytes(len(graph)) / 1024 ** 2:.0f} MB of all-pairs tables, more than {maxBytes / 1024 ** 2:.0f} MB; queries use A* instead")
+        os.unlink(indexFile.name)
+    else:
+        graph = storeAllPairs("Adjacencies.txt", "coordinates.csv", maxBytes, args.workers)
+    buildTime = time.perf_counter() - startTime
+    if "allPairsNextHop" in graph.tables:
+        print(f"{len(graph)} nodes, tables of {allPairsBytes(len(graph)) / 1024 ** 2:.1f} MB, built in {buildTime:.1f}s")
+
+    rng = random.Random(args.seed)
+    aStarTimes, lookupTimes = [], []
+    for _ in range(args.queries):
+        start, goal = graph.cityName(rng.randrange(len(graph))), graph.cityName(rng.randrange(len(graph)))
+        _, aStarDistance, aStarTime = runSearch(aStarSearch, "A* Search", graph, start, goal, None)
+        _, lookupDistance, lookupTime = runSearch(allPairsSearch, "All-Pairs Lookup", graph, start, goal, None)
+        if (aStarDistance is None) != (lookupDistance is None) or (aStarDistance is not None and abs(aStarDistance - lookupDistance) > 1e-9 * max(1.0, aStarDistance)):
+            print(f"Distance mismatch {start} -> {goal}: {aStarDistance} vs {lookupDistance}")
+        aStarTimes.append(aStarTime)
+        lookupTimes.append(lookupTime)
+
+    for name, times in (("A*", aStarTimes), ("lookup", lookupTimes)):
+        times = np.array(times) * 1000
+        print(f"{name:<7} median {np.median(times):>9.3f} ms   p99 {np.percentile(times, 99):>9.3f} ms   mean {times.mean():>9.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import sys
+import time
+from Main import dfs, iddfs
+from CompactGraph import chainGraph, gridGraph
+
+# Compares the previous recursive dfs/iddfs with the explicit-stack versions in Main.py on
+# long chains and grids. The recursive versions run with a raised recursion limit and
+# are reported as failed when they still overflow it. iddfs also runs without a depth cap
+# on chains of growing length, which shows its quadratic cost in the depth of the goal
+
+# previous recursive implementations
+def recursiveDfs(graph, start, goal, path=None, visited=None):
+    if path is None:
+        path = [start]
+    if visited is None:
+        visited = set()
+    if start == goal:
+        return path, None
+    visited.add(start)
+    for neighbor in graph.neighbors(start):
+        if neighbor not in visited:
+            newPath, _ = recursiveDfs(graph, neighbor, goal, path + [neighbor], visited)
+            if newPath:
+                return newPath, None
+    return None, None
+
+def recursiveIddfs(graph, start, goal, maxDepth=50):
+    def dls(node, goal, depth, path, visited):
+        if depth == 0 and node == goal:
+            return path
+        if depth > 0:
+            visited.add(node)
+            for neighbor in graph.neighbors(node):
+                if neighbor not in visited:
+                    newPath = dls(neighbor, goal, depth - 1, path + [neighbor], visited)
+                    if newPath:
+                        return newPath
+        return None
+
+    for depth in range(maxDepth):
+        result = dls(start, goal, depth, [start], set())
+        if result:
+            return result, None
+    return None, None
+
+# runs a search and returns (seconds, path length) or the name of the error it raised
+def timed(function, *args):
+    startTime = time.perf_counter()
+    try:
+        path, _ = function(*args)
+    except RecursionError:
+        return "RecursionError"
+    return f"{time.perf_counter() - startTime:.3f}s ({len(path) if path else 0} nodes)"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recursive against explicit-stack dfs and iddfs")
+    parser.add_argument("--chain", type=int, default=1000000, help="nodes in the long chain used for dfs")
+    parser.add_argument("--iddfs-chain", type=int, default=2000, help="nodes in the chain used for iddfs")
+    parser.add_argument("--grid", type=int, default=200)
+    parser.add_argument("--iddfs-grid", type=int, default=12)
+    parser.add_argument("--deep-chains", default="2000,5000,10000", help="comma separated chain lengths for iddfs without a depth cap")
+    parser.add_argument("--recursion-limit", type=int, default=20000)
+    args = parser.parse_args()
+    sys.setrecursionlimit(args.recursion_limit)
+
+    cases = []
+    graph = chainGraph(args.chain)
+    cases.append((f"dfs chain {args.chain}", recursiveDfs, dfs, (graph, graph.nodeId("0"), graph.nodeId(str(args.chain - 1)))))
+    graph = gridGraph(args.grid, args.grid)
+    cases.append((f"dfs grid {args.grid}x{args.grid}", recursiveDfs, dfs, (graph, graph.nodeId("0_0"), graph.nodeId(f"{args.grid - 1}_{args.grid - 1}"))))
+    graph = chainGraph(args.iddfs_chain)
+    goal = graph.nodeId(str(args.iddfs_chain - 1))
+    cases.append((f"iddfs chain {args.iddfs_chain}", recursiveIddfs, iddfs, (graph, graph.nodeId("0"), goal, args.iddfs_chain)))
+    graph = gridGraph(args.iddfs_grid, args.iddfs_grid)
+    goal = graph.nodeId(f"{args.iddfs_grid - 1}_{args.iddfs_grid - 1}")
+    cases.append((f"iddfs grid {args.iddfs_grid}x{args.iddfs_grid}", recursiveIddfs, iddfs, (graph, graph.nodeId("0_0"), goal, 4 * args.iddfs_grid)))
+
+    print(f"{'case':<24}{'recursive':>28}{'explicit stack':>28}")
+    for name, before, after, searchArgs in cases:
+        print(f"{name:<24}{timed(before, *searchArgs):>28}{timed(after, *searchArgs):>28}")
+
+    # the time per chain node grows with the chain, the cost of a goal d deep is about d * d / 2 expansions
+    print(f"{'iddfs, maxDepth=None':<24}{'seconds':>28}{'us per node^2':>28}")
+    for n in [int(n) for n in args.deep_chains.split(",") if n]:
+        graph = chainGraph(n)
+        startTime = time.perf_counter()
+        path, _ = iddfs(graph, graph.nodeId("0"), graph.nodeId(str(n - 1)), None)
+        elapsed = time.perf_counter() - startTime
+        print(f"{f'chain {n}':<24}{f'{elapsed:.2f}s ({len(path)} nodes)':>28}{elapsed / n / n * 1e6:>28.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import random
+import time
+import numpy as np
+from AllPairs import addAllPairs
+from CompactGraph import compactFromEdges, edgeWeights, gridGraph
+from DynamicGraph import staleRoutes, updateEdge
+from GraphCache import cachedConnections
+from Landmarks import addLandmarks
+from Main import aStarLandmarkSearch, aStarSearch, allPairsSearch, runSearch
+
+# Compares applying road closures and reopenings with DynamicGraph against rebuilding the
+# graph and its landmark and all-pairs tables from the edge list, which is what editing
+# Adjacencies.txt and restarting does. Every update removes a random edge or adds back one
+# removed earlier. A cache of A* routes is kept alongside to count how many routes each
+# update invalidates, where a reload loses all of them, and query latency is measured on
+# the updated and on the rebuilt graph at the end.
+
+def edgeList(graph):
+    return [(graph.cityName(a), graph.cityName(b)) for a in range(len(graph)) for b in graph.neighbors(a) if a < b]
+
+# rebuilds the graph and its tables from scratch
+def fullReload(graph, edges, landmarks):
+    rebuilt = compactFromEdges(edges, {city: tuple(graph.coordinates[i]) for i, city in enumerate(graph.cities)})
+    edgeWeights(rebuilt)
+    if landmarks:
+        addLandmarks(rebuilt, landmarks)
+    addAllPairs(rebuilt)
+    return rebuilt
+
+def queryTimes(graph, function, name, queries):
+    return np.array([runSearch(function, name, graph, start, destination, None)[2] for start, destination in queries]) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark runtime edge updates against a full graph reload")
+    parser.add_argument("--grid", type=int, default=0, help="use an N x N jittered grid graph instead of the Kansas data")
+    parser.add_argument("--updates", type=int, default=20)
+    parser.add_argument("--landmarks", type=int, default=16)
+    parser.add_argument("--cached", type=int, default=2000, help="A* routes kept in the simulated route cache")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    graph = gridGraph(args.grid, args.grid, 0.3, args.seed) if args.grid else cachedConnections("Adjacencies.txt", "coordinates.csv")
+    graph = fullReload(graph, edgeList(graph), args.landmarks)
+    rng = random.Random(args.seed)
+    cities = list(graph.cities)
+    cache = {}
+    for _ in range(args.cached):
+        start, destination = rng.choice(cities), rng.choice(cities)
+        path, distance, _ = runSearch(aStarSearch, "A* Search", graph, start, destination, None)
+        cache[(start, destination, "A* Search")] = {"path": path, "distance": distance}
+
+    edges = edgeList(graph)
+    removed = []
+    updateTimes, reloadTimes, invalidated, landmarkRuns, rows = [], [], [], [], []
+    for _ in range(args.updates):
+        if removed and rng.random() < 0.5:
+            edge, add = removed.pop(rng.randrange(len(removed))), True
+            edges.append(edge)
+        else:
+            edge, add = edges.pop(rng.randrange(len(edges))), False
+            removed.append(edge)
+
+        startTime = time.perf_counter()
+        graph, report = updateEdge(graph, *edge, add)
+        stale = staleRoutes(cache.items(), graph, *edge, add)
+        for key in stale:
+            del cache[key]
+        updateTimes.append(time.perf_counter() - startTime)
+        invalidated.append(len(stale) / (len(cache) + len(stale)) if cache or stale else 0.0)
+        landmarkRuns.append(report["landmarksRecomputed"])
+        rows.append(report["allPairsRows"])
+
+        startTime = time.perf_counter()
+        rebuilt = fullReload(graph, edges, args.landmarks)
+        reloadTimes.append(time.perf_counter() - startTime)
+
+    updateTimes, reloadTimes = np.array(updateTimes) * 1000, np.array(reloadTimes) * 1000
+    print(f"{len(graph)} nodes, {graph.numberOfEdges()} edges, {args.updates} updates")
+    print(f"update  median {np.median(updateTimes):>10.3f} ms   mean {updateTimes.mean():>10.3f} ms")
+    print(f"reload  median {np.median(reloadTimes):>10.3f} ms   mean {reloadTimes.mean():>10.3f} ms   ({np.median(reloadTimes) / np.median(updateTimes):.1f}x)")
+    print(f"per update: {np.mean(landmarkRuns):.1f} of {args.landmarks} landmarks and {np.mean(rows):.1f} of {len(graph)} all-pairs rows recomputed, "
+          f"{np.mean(invalidated):.1%} of cached routes invalidated (a reload drops all)")
+
+    queries = [(rng.choice(cities), rng.choice(cities)) for _ in range(args.queries)]
+    print(f"\n{'query latency':<20}{'updated median':>16}{'rebuilt median':>16}")
+    for name, function in (("A* Search", aStarSearch), ("ALT A* Search", aStarLandmarkSearch), ("All-Pairs Lookup", allPairsSearch)):
+        updated, fresh = queryTimes(graph, function, name, queries), queryTimes(rebuilt, function, name, queries)
+        print(f"{name:<20}{np.median(updated):>13.3f} ms{np.median(fresh):>13.3f} ms")
+
+if __name__ == "__main__":
+    main()
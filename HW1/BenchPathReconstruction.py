@@ -0,0 +1,117 @@
+import argparse
+import heapq
+import sys
+import time
+import tracemalloc
+from collections import deque
+from Main import bfs, dfs, bestFirstSearch, aStarSearch, distance
+from CompactGraph import gridGraph
+
+# Compares the previous path-copying searches with the parent-pointer searches in Main.py
+# on a synthetic grid graph, reporting runtime and peak traced memory for each
+
+# previous implementations that push a full path copy with every frontier entry
+def pathCopyBfs(graph, start, goal):
+    queue = deque([(start, [start])])
+    visited = set()
+    while queue:
+        node, path = queue.popleft()
+        if node == goal:
+            return path, None
+        if node not in visited:
+            visited.add(node)
+            for neighbor in graph.neighbors(node):
+                if neighbor not in visited:
+                    queue.append((neighbor, path + [neighbor]))
+    return None, None
+
+def pathCopyDfs(graph, start, goal, path=None, visited=None):
+    if path is None:
+        path = [start]
+    if visited is None:
+        visited = set()
+    if start == goal:
+        return path, None
+    visited.add(start)
+    for neighbor in graph.neighbors(start):
+        if neighbor not in visited:
+            newPath, _ = pathCopyDfs(graph, neighbor, goal, path + [neighbor], visited)
+            if newPath:
+                return newPath, None
+    return None, None
+
+def pathCopyBestFirstSearch(graph, start, goal, coordinates):
+    queue = [(distance(coordinates[start], coordinates[goal]), start, [start])]
+    visited = set()
+    while queue:
+        _, node, path = heapq.heappop(queue)
+        if node == goal:
+            return path, None
+        if node in visited:
+            continue
+        visited.add(node)
+        for neighbor in graph.neighbors(node):
+            if neighbor not in visited:
+                heapq.heappush(queue, (distance(coordinates[neighbor], coordinates[goal]), neighbor, path + [neighbor]))
+    return None, None
+
+def pathCopyAStarSearch(graph, start, goal, coordinates):
+    priorityQueue = [(0, start, [start])]
+    visitedNodes = set()
+    gCost = {start: 0}
+    while priorityQueue:
+        _, node, path = heapq.heappop(priorityQueue)
+        if node == goal:
+            return path, None
+        if node in visitedNodes:
+            continue
+        visitedNodes.add(node)
+        for neighbor in graph.neighbors(node):
+            travelCost = gCost[node] + distance(coordinates[node], coordinates[neighbor])
+            if neighbor not in gCost or travelCost < gCost[neighbor]:
+                gCost[neighbor] = travelCost
+                estimatedTotalCost = travelCost + distance(coordinates[neighbor], coordinates[goal])
+                heapq.heappush(priorityQueue, (estimatedTotalCost, neighbor, path + [neighbor]))
+    return None, None
+
+# runs one search twice, once for wall-clock time and once under tracemalloc for peak memory
+def measure(function, args):
+    startTime = time.perf_counter()
+    path, _ = function(*args)
+    runtime = time.perf_counter() - startTime
+
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return path, runtime, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark path copying against parent pointers on a grid graph")
+    parser.add_argument("--rows", type=int, default=300)
+    parser.add_argument("--cols", type=int, default=300)
+    parser.add_argument("--dfs-size", type=int, default=60, help="side of the smaller grid used for the recursive dfs")
+    args = parser.parse_args()
+
+    graph = gridGraph(args.rows, args.cols)
+    start, goal = graph.nodeId("0_0"), graph.nodeId(f"{args.rows - 1}_{args.cols - 1}")
+    smallGraph = gridGraph(args.dfs_size, args.dfs_size)
+    smallStart, smallGoal = smallGraph.nodeId("0_0"), smallGraph.nodeId(f"{args.dfs_size - 1}_{args.dfs_size - 1}")
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10 * args.dfs_size * args.dfs_size))
+
+    cases = [
+        ("BFS", pathCopyBfs, bfs, (graph, start, goal)),
+        ("DFS", pathCopyDfs, dfs, (smallGraph, smallStart, smallGoal)),
+        ("Best-First", pathCopyBestFirstSearch, bestFirstSearch, (graph, start, goal, graph.coordinates)),
+        ("A*", pathCopyAStarSearch, aStarSearch, (graph, start, goal, graph.coordinates)),
+    ]
+
+    print(f"Grid {args.rows}x{args.cols} ({len(graph)} nodes), DFS grid {args.dfs_size}x{args.dfs_size}")
+    print(f"{'Search':<12}{'copy time':>12}{'parent time':>14}{'copy peak':>14}{'parent peak':>14}  same path")
+    for name, before, after, searchArgs in cases:
+        pathBefore, timeBefore, peakBefore = measure(before, searchArgs)
+        pathAfter, timeAfter, peakAfter = measure(after, searchArgs)
+        print(f"{name:<12}{timeBefore:>11.3f}s{timeAfter:>13.3f}s{peakBefore / 2**20:>11.1f} MB{peakAfter / 2**20:>11.1f} MB  {pathBefore == pathAfter}")
+
+if __name__ == "__main__":
+    main()
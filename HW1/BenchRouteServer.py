@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+import numpy as np
+from GraphCache import cachedConnections
+
+# Load generator for RouteServer.py. Opens several connections that each keep a number of
+# requests in flight, draws the queries from a pool of distinct routes so repeats exercise
+# the result cache, and reports throughput and client side latency next to the stats the
+# server reports. With --spawn it starts the server itself, so one command measures a
+# configuration on one machine.
+
+async def client(host, port, queries, depth, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    sent = {}
+    nextQuery = 0
+
+    def send():
+        nonlocal nextQuery
+        index, (start, destination, algorithm) = nextQuery, queries[nextQuery]
+        sent[index] = time.perf_counter()
+        writer.write((json.dumps({"id": index, "start": start, "destination": destination, "algorithm": algorithm}) + "\n").encode())
+        nextQuery += 1
+
+    while nextQuery < min(depth, len(queries)):
+        send()
+    errors = 0
+    while sent:
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - sent.pop(response["id"]))
+        errors += "error" in response
+        if nextQuery < len(queries):
+            send()
+    writer.close()
+    return errors
+
+async def serverStats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"stats": true}\n')
+    stats = json.loads(await reader.readline())
+    writer.close()
+    return stats
+
+async def generateLoad(args, queries):
+    latencies = []
+    perClient = [queries[i::args.connections] for i in range(args.connections)]
+    startTime = time.perf_counter()
+    errors = await asyncio.gather(*(client(args.host, args.port, part, args.depth, latencies) for part in perClient if part))
+    elapsed = time.perf_counter() - startTime
+    return elapsed, latencies, sum(errors), await serverStats(args.host, args.port)
+
+# waits until the spawned server accepts connections
+async def waitForServer(host, port, timeout=60.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate route query load against RouteServer.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--distinct", type=int, default=500, help="distinct routes the requests are drawn from")
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=4, help="requests each connection keeps in flight")
+    parser.add_argument("--algorithm", default="A* Search", help="menu name or number, 'mixed' draws one per route")
+    parser.add_argument("--grid", type=int, default=0, help="query an N x N grid graph served with the same --grid")
+    parser.add_argument("--spawn", action="store_true", help="start RouteServer.py with --grid, --workers and --cache-size")
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--cache-size", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cities = [f"{r}_{c}" for r in range(args.grid) for c in range(args.grid)] if args.grid else list(cachedConnections("Adjacencies.txt", "coordinates.csv").cities)
+    rng = random.Random(args.seed)
+    names = [str(key) for key in range(1, 10)]
+    routes = [(rng.choice(cities), rng.choice(cities), rng.choice(names) if args.algorithm == "mixed" else args.algorithm) for _ in range(args.distinct)]
+    queries = [rng.choice(routes) for _ in range(args.requests)]
+
+    server = None
+    if args.spawn:
+        server = subprocess.Popen([sys.executable, "RouteServer.py", "--host", args.host, "--port", str(args.port), "--grid", str(args.grid),
+                                   "--workers", str(args.workers), "--cache-size", str(args.cache_size)], stdout=subprocess.DEVNULL)
+    try:
+        if server:
+            asyncio.run(waitForServer(args.host, args.port))
+        elapsed, latencies, errors, stats = asyncio.run(generateLoad(args, queries))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    latencies = np.array(latencies) * 1000
+    print(f"{len(latencies)} requests over {args.connections} connections in {elapsed:.2f}s: {len(latencies) / elapsed:.1f} requests/s, {errors} errors")
+    print(f"client  p50 {np.percentile(latencies, 50):>9.3f} ms   p99 {np.percentile(latencies, 99):>9.3f} ms")
+    print(f"server  p50 {stats['p50Ms']:>9.3f} ms   p99 {stats['p99Ms']:>9.3f} ms   cache hit rate {stats['cache']['hitRate']:.1%} ({stats['cache']['size']} entries)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import argparse
+import json
+import random
+import sys
+import time
+import numpy as np
+from AllPairs import addAllPairs
+from CompactGraph import chainGraph, edgeWeights, geometricGraph, gridGraph
+from GraphCache import cachedConnections
+from Landmarks import addLandmarks
+from Main import SearchStats, algorithms, runSearch
+
+# Runs every search of the algorithm menu over generated graph families and the Kansas data
+# and writes one JSON line per graph, algorithm and trial, so a run can be kept as a baseline
+# and later runs checked against it with --baseline. Every trial answers the same random
+# queries; the search counters come from SearchStats, and with --memory an extra untimed pass
+# records the peak memory of each algorithm, since tracing memory slows the searches down.
+
+def benchGraphs(families, args):
+    # (name, family, graph) of every requested family
+    for family in families:
+        if family == "grid":
+            yield f"grid {args.grid}x{args.grid}", family, gridGraph(args.grid, args.grid, 0.3, args.seed)
+        elif family == "geometric":
+            yield f"geometric {args.geometric}", family, geometricGraph(args.geometric, seed=args.seed)
+        elif family == "chain":
+            yield f"chain {args.chain}", family, chainGraph(args.chain)
+        elif family == "kansas":
+            yield "kansas", family, cachedConnections("Adjacencies.txt", "coordinates.csv")
+        else:
+            raise ValueError(f"unknown graph family {family}")
+
+# builds the tables ALT A* and the all-pairs lookup use, graphs without them fall back to plain searches
+def prepare(graph, landmarks):
+    edgeWeights(graph)
+    if landmarks and "landmarkDistances" not in graph.tables:
+        addLandmarks(graph, min(landmarks, len(graph)))
+    if "allPairsNextHop" not in graph.tables:
+        addAllPairs(graph)
+
+def runQueries(function, name, graph, queries, stats):
+    # seconds of every query as measured by the search, paths found and their total distance
+    times, found, total = [], 0, 0.0
+    for start, destination in queries:
+        path, distance, runtime = runSearch(function, name, graph, start, destination, None, stats)
+        times.append(runtime)
+        if path:
+            found += 1
+            total += distance
+    return times, found, total
+
+def benchmark(args, output):
+    families = args.families.split(",")
+    chosen = args.algorithms.split(",") if args.algorithms else list(algorithms)
+    rows = []
+    for graphName, family, graph in benchGraphs(families, args):
+        prepare(graph, args.landmarks)
+        rng = random.Random(args.seed)
+        queries = [(graph.cityName(rng.randrange(len(graph))), graph.cityName(rng.randrange(len(graph)))) for _ in range(args.queries)]
+        for key in chosen:
+            name, function = algorithms[key]
+            peakMemory = None
+            if args.memory:
+                stats = SearchStats(traceMemory=True)
+                runQueries(function, name, graph, queries, stats)
+                peakMemory = stats.peakMemory
+            for trial in range(args.trials):
+                stats = SearchStats()
+                startTime = time.perf_counter()
+                times, found, total = runQueries(function, name, graph, queries, stats)
+                wallTime = time.perf_counter() - startTime
+                times = np.array(times)
+                row = {
+                    "graph": graphName, "family": family, "nodes": len(graph), "edges": len(graph.adjacency) // 2,
+                    "algorithm": name, "trial": trial, "queries": len(queries), "found": found, "totalDistance": total,
+                    "seconds": float(times.sum()), "wallSeconds": wallTime,
+                    "medianMs": float(np.median(times) * 1000), "p99Ms": float(np.percentile(times, 99) * 1000)
+                }
+                row.update(stats.asDict())
+                row["peakMemory"] = peakMemory
+                output.write(json.dumps(row) + "\n")
+                output.flush()
+                rows.append(row)
+            print(f"{graphName:<16}{name:<26}{np.median([r['seconds'] for r in rows[-args.trials:]]) * 1000:>11.3f} ms{row['nodesExpanded']:>11} expanded{row['peakFrontier']:>9} frontier", file=sys.stderr)
+    return rows
+
+# median seconds and the counters of every (graph, algorithm) of a result file
+def summarize(rows):
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["graph"], row["algorithm"]), []).append(row)
+    return {key: (float(np.median([r["seconds"] for r in group])), group[0]["nodesExpanded"], group[0]["found"]) for key, group in groups.items()}
+
+# Lists the cases that got slower than tolerance allows or now search differently, compared with a baseline file
+def regressions(rows, baselineRows, tolerance):
+    baseline, current = summarize(baselineRows), summarize(rows)
+    found = []
+    for key, (seconds, expanded, paths) in current.items():
+        if key not in baseline:
+            continue
+        baseSeconds, baseExpanded, basePaths = baseline[key]
+        if seconds > baseSeconds * (1 + tolerance):
+            found.append(f"{key[0]} {key[1]}: {seconds * 1000:.3f} ms, baseline {baseSeconds * 1000:.3f} ms")
+        if expanded != baseExpanded or paths != basePaths:
+            found.append(f"{key[0]} {key[1]}: {expanded} nodes expanded and {paths} paths found, baseline {baseExpanded} and {basePaths}")
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every search algorithm over generated graphs and the Kansas data")
+    parser.add_argument("--families", default="grid,geometric,chain,kansas", help="comma separated graph families")
+    parser.add_argument("--algorithms", default=None, help="comma separated menu numbers, all by default")
+    parser.add_argument("--grid", type=int, default=20, help="side of the jittered grid graph")
+    parser.add_argument("--geometric", type=int, default=400, help="nodes of the random geometric graph")
+    parser.add_argument("--chain", type=int, default=400, help="nodes of the chain graph")
+    parser.add_argument("--queries", type=int, default=20, help="random queries per graph")
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--landmarks", type=int, default=16, help="landmarks for ALT A*, 0 runs it without")
+    parser.add_argument("--memory", action="store_true", help="also record the peak memory of every algorithm")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="-", help="JSON lines result file, '-' for stdout")
+    parser.add_argument("--baseline", default=None, help="result file of an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    if args.output == "-":
+        rows = benchmark(args, sys.stdout)
+    else:
+        with open(args.output, "w") as output:
+            rows = benchmark(args, output)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baselineRows = [json.loads(line) for line in file if line.strip()]
+        found = regressions(rows, baselineRows, args.tolerance)
+        for line in found:
+            print(f"Regression {line}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import numpy as np
+import bisect
+import csv
+
+# Sorted city names packed into one utf-8 buffer with an offsets array, so a cached
+# table can be used straight from a memory-mapped file without building a dict
+class CityTable:
+    def __init__(self, nameOffsets, names):
+        self.nameOffsets = nameOffsets
+        self.names = names
+
+    @classmethod
+    def fromCities(cls, cities):
+        encoded = [city.encode() for city in cities]
+        nameOffsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        nameOffsets[1:] = np.cumsum([len(name) for name in encoded])
+        return cls(nameOffsets, np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+    def __len__(self):
+        return len(self.nameOffsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.names[self.nameOffsets[i]:self.nameOffsets[i + 1]].tobytes().decode()
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+# Compact graph stored as CSR arrays: city names are interned to integer ids,
+# the neighbors of node i are adjacency[offsets[i]:offsets[i+1]] and the
+# coordinates of node i are coordinates[i] = (lat, lon)
+class CompactGraph:
+    def __init__(self, cities, offsets, adjacency, coordinates, tables=None):
+        # cities must be sorted, ids are looked up by binary search
+        self.cities = cities
+        self.offsets = offsets
+        self.adjacency = adjacency
+        self.coordinates = coordinates
+        # extra precomputed per-node arrays that are cached along with the graph
+        self.tables = tables if tables is not None else {}
+
+    def __len__(self):
+        return len(self.cities)
+
+    def numberOfEdges(self):
+        return int(self.offsets[-1]) // 2
+
+    # same interface as networkx.Graph.neighbors, but on integer ids
+    def neighbors(self, node):
+        return self.adjacency[self.offsets[node]:self.offsets[node + 1]].tolist()
+
+    def degree(self, node):
+        return int(self.offsets[node + 1] - self.offsets[node])
+
+    def nodeId(self, city):
+        i = bisect.bisect_left(self.cities, city)
+        if i == len(self.cities) or self.cities[i] != city:
+            raise KeyError(city)
+        return i
+
+    def cityName(self, node):
+        return self.cities[node]
+
+    def pathNames(self, path):
+        return [self.cities[node] for node in path] if path else path
+
+# distance() of every CSR edge, computed once with numpy and kept in graph.tables
+def edgeWeights(graph):
+    if "weights" not in graph.tables:
+        sources = np.repeat(np.arange(len(graph), dtype=np.int64), np.diff(graph.offsets))
+        delta = graph.coordinates[graph.adjacency] - graph.coordinates[sources]
+        graph.tables["weights"] = np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2)
+    return graph.tables["weights"]
+
+# Builds a compact graph from an ordered list of (city1, city2) edges
+def compactFromEdges(edges, cityCoordinates=None):
+    # adjacency order follows edge insertion order like networkx.Graph does,
+    # so every search expands neighbors in the same order as before
+    order = {}
+    for city1, city2 in edges:
+        order.setdefault(city1, len(order))
+        order.setdefault(city2, len(order))
+    if cityCoordinates:
+        for city in cityCoordinates:
+            order.setdefault(city, len(order))
+
+    # ids are assigned in sorted name order, so heap ties broken on the node
+    # id pop in the same order as ties broken on the city string
+    cities = sorted(order)
+    cityIds = {city: i for i, city in enumerate(cities)}
+
+    neighborLists = [[] for _ in cities]
+    seen = set()
+    for city1, city2 in edges:
+        a, b = cityIds[city1], cityIds[city2]
+        if (a, b) in seen:
+            continue
+        seen.add((a, b))
+        seen.add((b, a))
+        neighborLists[a].append(b)
+        if a != b:
+            neighborLists[b].append(a)
+
+    offsets = np.zeros(len(cities) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(n) for n in neighborLists])
+    adjacency = np.fromiter((n for ns in neighborLists for n in ns), dtype=np.int32, count=int(offsets[-1]))
+
+    coordinates = np.full((len(cities), 2), np.nan, dtype=np.float64)
+    if cityCoordinates:
+        for city, (lat, lon) in cityCoordinates.items():
+            coordinates[cityIds[city]] = (lat, lon)
+
+    return CompactGraph(CityTable.fromCities(cities), offsets, adjacency, coordinates)
+
+# Reads the adjacency and coordinate files into a compact graph
+def compactConnections(file_path, csv_file):
+    edges = []
+    with open(file_path, 'r') as file:
+        for line in file:
+            cities = line.strip().split()
+            if len(cities) == 2:
+                edges.append((cities[0].replace('_', ' ').lower(), cities[1].replace('_', ' ').lower()))
+
+    cityCoordinates = {}
+    with open(csv_file, 'r') as file:
+        reader = csv.reader(file)
+        for row in reader:
+            city = row[0].strip().replace('_', ' ').lower()
+            cityCoordinates[city] = (float(row[1]), float(row[2]))
+
+    return compactFromEdges(edges, cityCoordinates)
+
+# Builds a rows x cols grid graph, node names are "r_c" and coordinates are the grid position,
+# optionally moved by up to jitter in each direction so edge lengths differ like on a road map
+def gridGraph(rows, cols, jitter=0.0, seed=0):
+    edges = []
+    for r in range(rows):
+        for c in range(cols):
+            if c + 1 < cols:
+                edges.append((f"{r}_{c}", f"{r}_{c + 1}"))
+            if r + 1 < rows:
+                edges.append((f"{r}_{c}", f"{r + 1}_{c}"))
+    rng = np.random.default_rng(seed)
+    offsets = rng.uniform(-jitter, jitter, size=(rows * cols, 2)) if jitter else np.zeros((rows * cols, 2))
+    cityCoordinates = {f"{r}_{c}": (r + offsets[r * cols + c, 0], c + offsets[r * cols + c, 1]) for r in range(rows) for c in range(cols)}
+    return compactFromEdges(edges, cityCoordinates)
+
+# Builds a path graph of n nodes named "0" .. "n-1" laid out on a line
+def chainGraph(n):
+    edges = [(str(i), str(i + 1)) for i in range(n - 1)]
+    return compactFromEdges(edges, {str(i): (float(i), 0.0) for i in range(n)})
+
+# Builds a random geometric graph of n nodes named "0" .. "n-1": points are spread uniformly
+# over a square of area n and every two points closer than radius are connected, so a node
+# has about pi * radius^2 neighbors whatever n is. Points are bucketed into radius sized
+# cells and only compared with the points of neighboring cells
+def geometricGraph(n, degree=6.0, seed=0):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0.0, np.sqrt(n), size=(n, 2))
+    radius = np.sqrt(degree / np.pi)
+    cells = {}
+    for i, cell in enumerate(map(tuple, (points // radius).astype(np.int64).tolist())):
+        cells.setdefault(cell, []).append(i)
+
+    edges = []
+    for (row, col), members in cells.items():
+        # each pair of cells is compared once, from the cell that comes first
+        for other in ((row, col), (row, col + 1), (row + 1, col - 1), (row + 1, col), (row + 1, col + 1)):
+            candidates = cells.get(other)
+            if candidates is None:
+                continue
+            for position, i in enumerate(members):
+                others = np.array(candidates[position + 1:] if other == (row, col) else candidates, dtype=np.int64)
+                if len(others) == 0:
+                    continue
+                close = others[np.hypot(*(points[others] - points[i]).T) < radius]
+                edges.extend((str(i), str(j)) for j in close.tolist())
+    return compactFromEdges(edges, {str(i): (float(points[i, 0]), float(points[i, 1])) for i in range(n)})
@@ -0,0 +1,194 @@
+import argparse
+import heapq
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from CompactGraph import edgeWeights, geometricGraph, gridGraph
+from GraphCache import cachePath, cachedConnections, loadGraph, saveGraph
+from Main import aStarSearch, contractionHierarchySearch, runSearch, upwardEdges
+
+# Contraction hierarchy over the distance() weighted graph. Nodes are contracted one at a
+# time, cheapest first by twice the edge difference plus contracted neighbors plus level, the
+# depth of the hierarchy below the node, which keeps contractions spread over the graph;
+# whenever removing a node would lengthen a shortest path
+# between two of its neighbors, a shortcut edge remembering the removed middle node is added.
+# Queries, contractionHierarchySearch in Main.py and "Contraction Hierarchy" in the menu, then
+# run a bidirectional Dijkstra that only follows edges to higher ranked nodes, stalling nodes
+# that a higher ranked neighbor already reaches more cheaply, and shortcuts are unpacked back
+# into original edges.
+#
+# The index is kept in graph.tables, so saveGraph() writes it to disk with the graph:
+#   chRank     contraction order of every node
+#   chOffsets  CSR offsets of the upward edges of every node
+#   chTargets  higher ranked endpoint of each upward edge
+#   chWeights  length of each upward edge
+#   chMiddle   contracted middle node of a shortcut, -1 for an original edge
+#
+# Jittered grids are close to the worst case, they need about four shortcuts per node; random
+# geometric graphs, closer to road networks, need less than two. In pure Python a query takes
+# under a millisecond up to a few thousand nodes (0.4 ms on 6,400 geometric nodes); on 100,000
+# nodes it takes 1-2 ms, against about 300 ms for A*.
+
+infinity = float("inf")
+
+# bounded Dijkstra from source that skips the node being contracted. targets maps every
+# neighbor still to be checked to the length of its path through the excluded node; the
+# distances found are lengths of real paths, so a target reached at most that cheaply has a
+# witness and is dropped, and the search stops once no target is left. Returns the targets
+# without a witness
+def witnessSearch(remaining, source, excluded, targets, settleLimit):
+    targets = dict(targets)
+    maxCost = max(targets.values())
+    cost = {source: 0.0}
+    queue = [(0.0, source)]
+    settled = 0
+    while queue and settled < settleLimit:
+        nodeCost, node = heapq.heappop(queue)
+        if nodeCost > cost[node]:
+            continue
+        if nodeCost > maxCost:
+            break
+        settled += 1
+        for neighbor, weight in remaining[node].items():
+            if neighbor == excluded:
+                continue
+            travelCost = nodeCost + weight
+            if travelCost < cost.get(neighbor, infinity):
+                cost[neighbor] = travelCost
+                heapq.heappush(queue, (travelCost, neighbor))
+                if neighbor in targets and travelCost <= targets[neighbor]:
+                    del targets[neighbor]
+                    if not targets:
+                        return targets
+    return targets
+
+# the shortcuts needed to contract node, as (u, w, length) with every pair of neighbors once
+def shortcutsFor(remaining, node, settleLimit):
+    neighbors = list(remaining[node].items())
+    shortcuts = []
+    for i, (u, toU) in enumerate(neighbors[:-1]):
+        missing = witnessSearch(remaining, u, node, {w: toU + toW for w, toW in neighbors[i + 1:]}, settleLimit)
+        shortcuts.extend((u, w, length) for w, length in missing.items())
+    return shortcuts
+
+# Contracts every node of the graph and stores the upward graph in graph.tables. Priorities
+# are first estimated with cheap witness searches of estimateLimit settled nodes; a node
+# taken from the queue is checked with the full settleLimit search, whose shortcuts are
+# used when it is contracted
+def buildHierarchy(graph, settleLimit=60, estimateLimit=8):
+    weights = edgeWeights(graph).tolist()
+    offsets = graph.offsets.tolist()
+    adjacency = graph.adjacency.tolist()
+    n = len(graph)
+
+    # the graph that is left after each contraction, as neighbor -> length dictionaries
+    remaining = [{} for _ in range(n)]
+    for u in range(n):
+        for i in range(offsets[u], offsets[u + 1]):
+            v = adjacency[i]
+            if v != u and weights[i] < remaining[u].get(v, infinity):
+                remaining[u][v] = weights[i]
+    shortcutMiddle = {}
+    contractedNeighbors = [0] * n
+    level = [0] * n
+
+    def priority(node, shortcuts):
+        return 2 * (len(shortcuts) - len(remaining[node])) + contractedNeighbors[node] + level[node]
+
+    queue = [(priority(node, shortcutsFor(remaining, node, estimateLimit)), node) for node in range(n)]
+    heapq.heapify(queue)
+    rank = np.empty(n, dtype=np.int32)
+    upward = [None] * n
+    order = 0
+
+    while queue:
+        _, node = heapq.heappop(queue)
+        # lazy update: if the node got worse since it was queued, put it back
+        shortcuts = shortcutsFor(remaining, node, settleLimit)
+        newPriority = priority(node, shortcuts)
+        if queue and newPriority > queue[0][0]:
+            heapq.heappush(queue, (newPriority, node))
+            continue
+
+        rank[node] = order
+        order += 1
+        # every neighbor still in the graph is contracted later, so these are the upward edges
+        upward[node] = [(u, length, shortcutMiddle.get((min(node, u), max(node, u)), -1)) for u, length in remaining[node].items()]
+        for u, w, length in shortcuts:
+            if length < remaining[u].get(w, infinity):
+                remaining[u][w] = length
+                remaining[w][u] = length
+                shortcutMiddle[(min(u, w), max(u, w))] = node
+        for u in remaining[node]:
+            del remaining[u][node]
+            contractedNeighbors[u] += 1
+            level[u] = max(level[u], level[node] + 1)
+        remaining[node] = {}
+
+    chOffsets = np.zeros(n + 1, dtype=np.int64)
+    chOffsets[1:] = np.cumsum([len(edges) for edges in upward])
+    graph.tables["chRank"] = rank
+    graph.tables["chOffsets"] = chOffsets
+    graph.tables["chTargets"] = np.array([u for edges in upward for u, _, _ in edges], dtype=np.int32)
+    graph.tables["chWeights"] = np.array([length for edges in upward for _, length, _ in edges], dtype=np.float64)
+    graph.tables["chMiddle"] = np.array([middle for edges in upward for _, _, middle in edges], dtype=np.int32)
+    # queries must not reuse edges read from an earlier hierarchy of this graph
+    upwardEdges.pop(graph, None)
+    return graph
+
+# Builds the hierarchy for the graph cache of the given source files and saves it there
+def storeHierarchy(file_path, csv_file, settleLimit=60):
+    graph = buildHierarchy(cachedConnections(file_path, csv_file), settleLimit)
+    saveGraph(graph, cachePath(file_path), (file_path, csv_file))
+    return graph
+
+# Compares query latency of the contraction hierarchy with aStarSearch
+def main():
+    parser = argparse.ArgumentParser(description="Build a contraction hierarchy and compare its query latency with A*")
+    parser.add_argument("--grid", type=int, default=0, help="use an N x N jittered grid graph instead of the Kansas data")
+    parser.add_argument("--geometric", type=int, default=0, help="use a random geometric graph of N nodes instead of the Kansas data")
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    startTime = time.perf_counter()
+    if args.grid or args.geometric:
+        if args.grid:
+            graph = buildHierarchy(gridGraph(args.grid, args.grid, args.jitter, args.seed))
+        else:
+            graph = buildHierarchy(geometricGraph(args.geometric, seed=args.seed))
+        # round trip through a cache file so queries run on the index as loaded from disk
+        indexFile = tempfile.NamedTemporaryFile(suffix=".graph", delete=False)
+        indexFile.close()
+        saveGraph(graph, indexFile.name)
+        graph = loadGraph(indexFile.name)
+        os.unlink(indexFile.name)
+    else:
+        graph = storeHierarchy("Adjacencies.txt", "coordinates.csv")
+    buildTime = time.perf_counter() - startTime
+    shortcuts = int(np.count_nonzero(graph.tables["chMiddle"] >= 0))
+    print(f"{len(graph)} nodes, {graph.numberOfEdges()} edges, {shortcuts} shortcuts, built in {buildTime:.1f}s")
+
+    rng = random.Random(args.seed)
+    aStarTimes, hierarchyTimes = [], []
+    samePath = 0
+    for _ in range(args.queries):
+        start, goal = graph.cityName(rng.randrange(len(graph))), graph.cityName(rng.randrange(len(graph)))
+        aStarPath, aStarDistance, aStarTime = runSearch(aStarSearch, "A* Search", graph, start, goal, None)
+        path, hierarchyDistance, hierarchyTime = runSearch(contractionHierarchySearch, "Contraction Hierarchy", graph, start, goal, None)
+        if (aStarDistance is None) != (hierarchyDistance is None) or (aStarDistance is not None and abs(aStarDistance - hierarchyDistance) > 1e-9 * max(1.0, aStarDistance)):
+            print(f"Distance mismatch {start} -> {goal}: {aStarDistance} vs {hierarchyDistance}")
+        samePath += path == aStarPath
+        aStarTimes.append(aStarTime)
+        hierarchyTimes.append(hierarchyTime)
+
+    for name, times in (("A*", aStarTimes), ("CH", hierarchyTimes)):
+        times = np.array(times) * 1000
+        print(f"{name:<4} median {np.median(times):>9.3f} ms   p99 {np.percentile(times, 99):>9.3f} ms   mean {times.mean():>9.3f} ms")
+    print(f"identical paths {samePath}/{args.queries}")
+
+if __name__ == "__main__":
+    main()
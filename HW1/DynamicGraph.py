@@ -0,0 +1,149 @@
+import numpy as np
+from AllPairs import allPairsRows
+from CompactGraph import CompactGraph, edgeWeights
+from Landmarks import dijkstraDistances
+from Main import distance
+
+# Road closures and new links applied to a loaded compact graph at runtime. An update never
+# changes the graph it is given: it returns a new CompactGraph that shares every array the
+# change does not touch, so searches still running on the old graph are not disturbed and
+# the caller swaps the new one in when it is ready. Edge weights stay the distance() between
+# the two cities, and a new edge is appended to both neighbor lists like networkx add_edge.
+#
+# The precomputed tables are kept where the change cannot affect them:
+#   weights            the two CSR entries of the edge are inserted or deleted
+#   landmarkDistances  only the landmarks whose distances change are recomputed: for a new
+#                      edge the ones it gives a shorter route to an endpoint, for a removed
+#                      edge the ones with the edge on a shortest path (|d(L, a) - d(L, b)| = w)
+#   allPairs*          only the source rows changed by the same two tests are recomputed, the
+#                      next hops of every other row still lead along shortest routes
+#   spatial index      depends on the coordinates only and is shared
+# The contraction hierarchy depends on every edge and is dropped; ContractionHierarchy.py
+# builds it again offline.
+
+# tables that do not depend on the edges
+edgeFreeTables = ("spatialOrder", "spatialCellStarts", "spatialGrid", "landmarks")
+
+# searches returning the shortest route by distance, a new edge only changes their route
+# when it can be shorter
+distanceOptimal = {"A* Search", "ALT A* Search", "Bidirectional A* Search", "All-Pairs Lookup", "Contraction Hierarchy"}
+# searches returning the route with the fewest edges, any new edge can shorten those
+hopOptimal = {"Breadth-First Search", "Bidirectional BFS", "ID-DFS Search"}
+# the route of any other search, like DFS or Best-First, depends on the order the whole
+# neighborhood is explored in, so every update makes it stale
+
+# CSR position of b in the neighbor list of a, None if the edge is missing
+def edgePosition(graph, a, b):
+    begin = int(graph.offsets[a])
+    positions = np.flatnonzero(graph.adjacency[begin:graph.offsets[a + 1]] == b)
+    return begin + int(positions[0]) if len(positions) else None
+
+# offsets, adjacency and weights with the edge a-b added or removed
+def editedArrays(graph, a, b, add):
+    weights = edgeWeights(graph)
+    shift = (np.arange(len(graph) + 1) > a).astype(np.int64) + (np.arange(len(graph) + 1) > b)
+    if add:
+        positions = [graph.offsets[a + 1], graph.offsets[b + 1]]
+        weight = distance(graph.coordinates[a], graph.coordinates[b])
+        adjacency = np.insert(graph.adjacency, positions, [b, a])
+        weights = np.insert(weights, positions, [weight, weight])
+        return graph.offsets + shift, adjacency, weights
+    positions = [edgePosition(graph, a, b), edgePosition(graph, b, a)]
+    return graph.offsets - shift, np.delete(graph.adjacency, positions), np.delete(weights, positions)
+
+# positions of the sources whose distances the change affects, given the distances of every
+# source to both endpoints. A table entry is off by rounding relative to the distance itself,
+# so the tests are loose by a few units in the last place of the larger of the two operands
+# and ties are recomputed too
+def affectedRows(distancesToA, distancesToB, weight, add):
+    with np.errstate(invalid="ignore"):
+        slack = 4 * np.finfo(distancesToA.dtype).eps * np.fmax(distancesToA, distancesToB)
+        if add:
+            shorter = (distancesToA + weight < distancesToB + slack) | (distancesToB + weight < distancesToA + slack)
+        else:
+            shorter = np.abs(distancesToA - distancesToB) >= weight - slack
+    return np.flatnonzero(shorter)
+
+# Returns a copy of graph with the edge between two cities added (add=True) or removed, and a
+# report of what was recomputed. Raises ValueError for an edge that already exists when
+# adding, is missing when removing, or joins a city to itself
+def updateEdge(graph, cityA, cityB, add=True):
+    a, b = graph.nodeId(cityA), graph.nodeId(cityB)
+    if a == b:
+        raise ValueError(f"an edge needs two different cities, got '{cityA}' twice")
+    exists = edgePosition(graph, a, b) is not None
+    if add and exists:
+        raise ValueError(f"edge {cityA} - {cityB} already exists")
+    if not add and not exists:
+        raise ValueError(f"no edge {cityA} - {cityB}")
+
+    offsets, adjacency, weights = editedArrays(graph, a, b, add)
+    tables = {name: graph.tables[name] for name in edgeFreeTables if name in graph.tables}
+    tables["weights"] = weights
+    updated = CompactGraph(graph.cities, offsets, adjacency, graph.coordinates, tables)
+    weight = distance(graph.coordinates[a], graph.coordinates[b])
+    report = {"edge": [cityA, cityB], "added": add, "landmarksRecomputed": 0, "allPairsRows": 0}
+
+    landmarkDistances = graph.tables.get("landmarkDistances")
+    if landmarkDistances is not None:
+        changed = affectedRows(landmarkDistances[a], landmarkDistances[b], weight, add)
+        landmarkDistances = np.array(landmarkDistances)
+        for column in changed:
+            landmarkDistances[:, column] = dijkstraDistances(updated, int(graph.tables["landmarks"][column]))
+        tables["landmarkDistances"] = landmarkDistances
+        report["landmarksRecomputed"] = len(changed)
+
+    allPairsDistances = graph.tables.get("allPairsDistances")
+    if allPairsDistances is not None:
+        # the tables are symmetric, so column a holds the distance of every source to a
+        changed = affectedRows(allPairsDistances[:, a], allPairsDistances[:, b], weight, add)
+        allPairsDistances, nextHops = np.array(allPairsDistances), np.array(graph.tables["allPairsNextHop"])
+        if len(changed):
+            allPairsDistances[changed], nextHops[changed] = allPairsRows(updated, changed.tolist())
+        tables["allPairsDistances"] = allPairsDistances
+        tables["allPairsNextHop"] = nextHops
+        report["allPairsRows"] = len(changed)
+    report["dropped"] = sorted(name for name in graph.tables if name not in tables)
+    return updated, report
+
+# Keys of the cached routes an update makes stale, from (key, result) pairs where key is
+# (start, destination, algorithm) and result has the path and distance of RouteEngine.route().
+# Routes of searches that are neither shortest nor fewest-edge are always stale. After a
+# removal the other routes are stale when they go over the removed edge. After an addition
+# routes without a path are stale, routes of fewest-edge searches are stale, and shortest
+# routes are stale when the straight-line bound of a route through the new edge is below them
+def staleRoutes(routes, graph, cityA, cityB, add):
+    stale = []
+    if not add:
+        edge = {(cityA, cityB), (cityB, cityA)}
+        for key, result in routes:
+            path = result["path"] or []
+            if (key[2] not in distanceOptimal and key[2] not in hopOptimal) or any(step in edge for step in zip(path, path[1:])):
+                stale.append(key)
+        return stale
+
+    shortest = []
+    for key, result in routes:
+        if result["path"] is None or key[2] not in distanceOptimal:
+            stale.append(key)
+        else:
+            shortest.append((key, result["distance"]))
+    if not shortest:
+        return stale
+
+    # the bounds of all shortest routes at once, every city is looked up once
+    ids = {}
+    def nodeId(city):
+        if city not in ids:
+            ids[city] = graph.nodeId(city)
+        return ids[city]
+    coordinates = graph.coordinates
+    pointA, pointB = coordinates[graph.nodeId(cityA)], coordinates[graph.nodeId(cityB)]
+    starts = coordinates[[nodeId(key[0]) for key, _ in shortest]]
+    destinations = coordinates[[nodeId(key[1]) for key, _ in shortest]]
+    def lengths(points, point):
+        return np.sqrt(((points - point) ** 2).sum(axis=1))
+    bounds = distance(pointA, pointB) + np.minimum(lengths(starts, pointA) + lengths(destinations, pointB), lengths(starts, pointB) + lengths(destinations, pointA))
+    distances = np.array([routeDistance for _, routeDistance in shortest])
+    stale.extend(shortest[i][0] for i in np.flatnonzero(bounds < distances))
+    return stale
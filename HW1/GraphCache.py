@@ -0,0 +1,113 @@
+import json
+import os
+import numpy as np
+from CompactGraph import CityTable, CompactGraph, compactConnections, edgeWeights
+
+# Binary graph cache written next to the source files. The file is a small JSON
+# header followed by 64-byte aligned raw arrays, so loading is a single memory map
+# and every array is a zero-copy view into it.
+MAGIC = b"HW1GRAPH"
+VERSION = 1
+ALIGNMENT = 64
+
+# The cache file for a given adjacency file
+def cachePath(file_path):
+    return file_path + ".graph"
+
+# mtime and size of each source file, a change in either invalidates the cache
+def sourceStamps(sources):
+    stamps = []
+    for source in sources:
+        info = os.stat(source)
+        stamps.append({"path": os.path.basename(source), "mtime": info.st_mtime_ns, "size": info.st_size})
+    return stamps
+
+def graphArrays(graph):
+    cities = graph.cities if isinstance(graph.cities, CityTable) else CityTable.fromCities(graph.cities)
+    arrays = {
+        "offsets": graph.offsets,
+        "adjacency": graph.adjacency,
+        "coordinates": graph.coordinates,
+        "nameOffsets": cities.nameOffsets,
+        "names": cities.names,
+    }
+    for name, table in graph.tables.items():
+        arrays["table:" + name] = table
+    return arrays
+
+# Writes the graph and its extra tables to path, stamped with the given source files
+def saveGraph(graph, path, sources=()):
+    arrays = {name: np.ascontiguousarray(array) for name, array in graphArrays(graph).items()}
+    layout = {}
+    position = 0
+    for name, array in arrays.items():
+        position = -(-position // ALIGNMENT) * ALIGNMENT
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": position}
+        position += array.nbytes
+
+    header = json.dumps({"version": VERSION, "sources": sourceStamps(sources), "arrays": layout}).encode()
+    dataStart = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    # write to a temporary file first so a concurrent reader never sees a partial cache
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(MAGIC)
+        file.write(len(header).to_bytes(8, "little"))
+        file.write(header)
+        for name, array in arrays.items():
+            file.seek(dataStart + layout[name]["offset"])
+            file.write(array.tobytes())
+        file.truncate(dataStart + position)
+    os.replace(temporary, path)
+
+# Reads the cache header, returns None when the file is missing, corrupt or from another version
+def readHeader(path):
+    try:
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                return None
+            length = int.from_bytes(file.read(8), "little")
+            header = json.loads(file.read(length))
+    except (OSError, ValueError):
+        return None
+    if header.get("version") != VERSION:
+        return None
+    header["dataStart"] = -(-(len(MAGIC) + 8 + length) // ALIGNMENT) * ALIGNMENT
+    return header
+
+# Memory maps a cache file into a compact graph without copying any array
+def loadGraph(path):
+    header = readHeader(path)
+    if header is None:
+        raise ValueError(f"{path} is not a graph cache")
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        start = header["dataStart"] + spec["offset"]
+        arrays[name] = data[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+
+    tables = {name[len("table:"):]: array for name, array in arrays.items() if name.startswith("table:")}
+    cities = CityTable(arrays["nameOffsets"], arrays["names"])
+    return CompactGraph(cities, arrays["offsets"], arrays["adjacency"], arrays["coordinates"], tables)
+
+# True if the cache exists and was built from the current versions of the sources
+def isFresh(path, sources):
+    header = readHeader(path)
+    return header is not None and header["sources"] == sourceStamps(sources)
+
+# Loads the graph from its cache, reparsing the text files only when they changed
+def cachedConnections(file_path, csv_file):
+    path = cachePath(file_path)
+    sources = (file_path, csv_file)
+    if not isFresh(path, sources):
+        graph = compactConnections(file_path, csv_file)
+        # edge weights are cached too, so processes mapping the file share them
+        edgeWeights(graph)
+        try:
+            saveGraph(graph, path, sources)
+        except OSError:
+            # read-only directory, fall back to parsing every run
+            return graph
+    return loadGraph(path)
@@ -0,0 +1,84 @@
+import argparse
+import random
+import numpy as np
+from CompactGraph import edgeWeights, gridGraph
+from GraphCache import cachePath, cachedConnections, saveGraph
+from Main import aStarSearch, aStarLandmarkSearch, expandedNodes, runSearch
+from RouteEngine import dijkstraTree
+
+# Offline preprocessing for the ALT heuristic used by aStarLandmarkSearch. K landmarks are
+# picked by farthest-point selection and the shortest-path distance from each landmark to
+# every node is stored as graph.tables["landmarkDistances"], an (nodes, K) array, so a
+# query only has to look rows up.
+
+# shortest distance from source to every node, inf where unreachable
+def dijkstraDistances(graph, source):
+    _, cost = dijkstraTree(graph, source)
+    distances = np.full(len(graph), np.inf)
+    distances[list(cost.keys())] = list(cost.values())
+    return distances
+
+# Picks k landmarks, each the node farthest from the ones already picked, and returns
+# them with their distance table. Unreachable nodes count as farthest, so every
+# connected component gets a landmark before any component gets a second one
+def selectLandmarks(graph, k, seed=0):
+    k = min(k, len(graph))
+    landmarks = []
+    rows = []
+    # the first landmark is the node farthest from a random start within its component
+    closest = dijkstraDistances(graph, random.Random(seed).randrange(len(graph)))
+    closest[~np.isfinite(closest)] = -1
+    for _ in range(k):
+        landmark = int(np.argmax(closest))
+        landmarks.append(landmark)
+        rows.append(dijkstraDistances(graph, landmark))
+        closest = rows[0] if len(rows) == 1 else np.minimum(closest, rows[-1])
+    return np.array(landmarks, dtype=np.int32), np.ascontiguousarray(np.array(rows).T)
+
+# Computes the landmark tables for a graph and keeps them in graph.tables
+def addLandmarks(graph, k=16, seed=0):
+    edgeWeights(graph)
+    landmarks, distances = selectLandmarks(graph, k, seed)
+    graph.tables["landmarks"] = landmarks
+    graph.tables["landmarkDistances"] = distances
+    return graph
+
+# Adds landmark tables to the graph cache of the given source files
+def storeLandmarks(file_path, csv_file, k=16, seed=0):
+    graph = addLandmarks(cachedConnections(file_path, csv_file), k, seed)
+    saveGraph(graph, cachePath(file_path), (file_path, csv_file))
+    return graph
+
+# Reports how many nodes A* and ALT A* expand on random queries
+def main():
+    parser = argparse.ArgumentParser(description="Build ALT landmark tables and compare A* search space with and without them")
+    parser.add_argument("--landmarks", type=int, default=16)
+    parser.add_argument("--grid", type=int, default=0, help="use an N x N grid graph instead of the Kansas data")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.grid:
+        graph = addLandmarks(gridGraph(args.grid, args.grid), args.landmarks, args.seed)
+    else:
+        graph = storeLandmarks("Adjacencies.txt", "coordinates.csv", args.landmarks, args.seed)
+        print(f"Stored {len(graph.tables['landmarks'])} landmarks in {cachePath('Adjacencies.txt')}")
+
+    rng = random.Random(args.seed)
+    totals = {"A*": [0, 0.0], "ALT A*": [0, 0.0]}
+    for _ in range(args.queries):
+        start, goal = graph.cityName(rng.randrange(len(graph))), graph.cityName(rng.randrange(len(graph)))
+        _, plainDistance, plainTime = runSearch(aStarSearch, "A* Search", graph, start, goal, None)
+        _, landmarkDistance, landmarkTime = runSearch(aStarLandmarkSearch, "ALT A* Search", graph, start, goal, None)
+        if plainDistance is not None and abs(plainDistance - landmarkDistance) > 1e-9 * max(1.0, plainDistance):
+            print(f"Distance mismatch {start} -> {goal}: {plainDistance} vs {landmarkDistance}")
+        for name, runtime in (("A*", plainTime), ("ALT A*", landmarkTime)):
+            totals[name][0] += expandedNodes[name]
+            totals[name][1] += runtime
+
+    print(f"{len(graph)} nodes, {args.queries} queries, {len(graph.tables['landmarks'])} landmarks")
+    for name, (expanded, runtime) in totals.items():
+        print(f"{name:<8} mean expanded nodes {expanded / args.queries:>10.1f}   mean time {runtime / args.queries * 1000:>8.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -1,254 +1,763 @@
-import networkx as nx
-from collections import deque
-import heapq
-import time
-import csv
-import math
-
-# Reads the text file containing city connections and returns an adjacency graph
-def connections(file_path):
-    graph = nx.Graph()
-    with open(file_path, 'r') as file:
-        for line in file:
-            cities = line.strip().split()
-            if len(cities) == 2:  
-                city1 = cities[0].replace('_', ' ').lower()
-                city2 = cities[1].replace('_', ' ').lower()
-                graph.add_edge(city1, city2)
-    return graph
-
-# Reads the CSV file containing city coordinates and returns a dictionary
-def coordinates(csv_file):
-    coordinates = {}
-    with open(csv_file, 'r') as file:
-        reader = csv.reader(file)
-        for row in reader:
-            city = row[0].strip().replace('_', ' ').lower()
-            lat, lon = float(row[1]), float(row[2])
-            coordinates[city] = (lat, lon)
-    return coordinates
-
- # Calculates the distance between coordinates
-def distance(coord1, coord2):
-    lat1, lon1 = coord1
-    lat2, lon2 = coord2
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    return math.sqrt(dlat**2 + dlon**2)
-
-# Calculates the total distance used for heristic functions
-def totalDistance(path, coordinates):
-    return sum(distance(coordinates[path[i]], coordinates[path[i+1]]) for i in range(len(path) - 1))
-
-# interface for distinguishing functions that use coordinates and those that do not
-def runSearch(function, name, graph, start, destination, coordinates):
-    path, runtime = function(graph, start, destination, coordinates) if name in ["Best-First Search", "A* Search"] else function(graph, start, destination)
-    distance = totalDistance(path, coordinates) if path else None
-    return path, distance, runtime
-
-# Dictonarey that stores runtimes
-runtimes = {}
-
-# uses FIFO queue to visit all nodes at the current depth then moves to the next depth, continuing until it finds the goal
-def bfs(graph, start, goal):
-    # Breadth-First Search
-    startTime = time.perf_counter()
-    queue = deque([(start, [start])])
-    visited = set()
-
-    while queue:
-        # pops the first node from the queue
-        node, path = queue.popleft()
-        if node == goal:
-            runtime = (time.perf_counter() - startTime)
-            runtimes["BFS"] = runtime
-            return path, runtime
-
-        if node not in visited:
-            # adds nodes visited into the set
-            visited.add(node)
-            # moves all neighbors of node onto the queue
-            for neighbor in graph.neighbors(node):
-                if neighbor not in visited:
-                    queue.append((neighbor, path + [neighbor]))
-
-    runtime = (time.perf_counter() - startTime)
-    runtimes["BFS"] = runtime
-    return None, runtime
-
-# uses recursion to explore as far as possible along each branch before backtracking until it reaches the goal
-def dfs(graph, start, goal, path=None, visited=None, startTime=None):
-    # Depth-First Search
-    if path is None:
-        path = [start]
-    if visited is None:
-        visited = set()
-    if startTime is None:
-        startTime = time.perf_counter()
-
-    if start == goal:
-        runtime = (time.perf_counter() - startTime)
-        runtimes["DFS"] = runtime
-        return path, runtime
-
-    visited.add(start)
-    # recursively visits all neighbor nodes
-    for neighbor in graph.neighbors(start):
-        if neighbor not in visited:
-            newPath, _ = dfs(graph, neighbor, goal, path + [neighbor], visited, startTime)
-            if newPath:
-                runtime = (time.perf_counter() - startTime)
-                runtimes["DFS"] = runtime
-                return newPath, runtime
-
-    runtime = (time.perf_counter() - startTime)
-    runtimes["DFS"] = runtime
-    return None, runtime
-
-# uses repeated calls of dls with an incremented depth limit until the goal is found
-def iddfs(graph, start, goal, maxDepth=50):
-    # Iterative Deepening
-    startTime = time.perf_counter()
-
-    # depth-limited search
-    def dls(node, goal, depth, path, visited):
-        if depth == 0 and node == goal:
-            return path
-        if depth > 0:
-            visited.add(node)
-            for neighbor in graph.neighbors(node):
-                if neighbor not in visited:
-                    # recursively add all neighbor nodes to path, one branch at a time
-                    newPath = dls(neighbor, goal, depth - 1, path + [neighbor], visited)
-                    if newPath:
-                        return newPath
-        return None
-
-    # iterates through depth levels
-    for depth in range(maxDepth):
-        visited = set()
-        result = dls(start, goal, depth, [start], visited)
-        if result:
-            runtime = (time.perf_counter() - startTime)
-            runtimes["ID-DFS"] = runtime
-            return result, runtime
-
-    runtime = (time.perf_counter() - startTime)
-    runtimes["ID-DFS"] = runtime
-    return None, runtime
-
-# uses a priority queue to visit the node with the smallest distance to the goal
-def bestFirstSearch(graph, start, goal, coordinates):
-    # Best First Search using distance as a heuristic.
-    startTime = time.perf_counter()
-    queue = [(distance(coordinates[start], coordinates[goal]), start, [start])]
-    visited = set()
-
-    while queue:
-        _, node, path = heapq.heappop(queue) # pops the node with the smallest distance
-        if node == goal:
-            runtime = (time.perf_counter() - startTime)
-            runtimes["Best-First"] = runtime
-            return path, runtime
-
-        # skip if already visited
-        if node in visited:
-            continue # goes to next iteration of the loop
-
-        visited.add(node)
-        for neighbor in graph.neighbors(node):
-            if neighbor not in visited:
-                heapq.heappush(queue, (distance(coordinates[neighbor], coordinates[goal]), neighbor, path + [neighbor]))
-
-    runtime = (time.perf_counter() - startTime)
-    runtimes["Best-First"] = runtime
-    return None, runtime
-
-# uses a priority queue to visit the node with the smallest estimated cost to goal
-def aStarSearch(graph, start, goal, coordinates):
-    # A* Search using distance as heuristic
-    startTime = time.perf_counter()
-    priorityQueue = [(0, start, [start])]
-    visitedNodes = set()
-    gCost = {start: 0}  # Stores the known cost to reach each visited node
-
-    while priorityQueue:
-        _, node, path = heapq.heappop(priorityQueue)
-        
-        if node == goal:
-            runtime = time.perf_counter() - startTime
-            runtimes["A*"] = runtime
-            return path, runtime
-
-        if node in visitedNodes:
-            continue  
-
-        visitedNodes.add(node)
-        
-        for neighbor in graph.neighbors(node):
-            travelCost = gCost[node] + distance(coordinates[node], coordinates[neighbor])
-            if neighbor not in gCost or travelCost < gCost[neighbor]:
-                gCost[neighbor] = travelCost
-                # f(n) = g(n) + h(n)
-                estimatedTotalCost = travelCost + distance(coordinates[neighbor], coordinates[goal])
-                heapq.heappush(priorityQueue, (estimatedTotalCost, neighbor, path + [neighbor]))
-
-    runtime = time.perf_counter() - startTime
-    runtimes["A*"] = runtime
-    return None, runtime
-
-# Load Data
-file_path = "Adjacencies.txt"
-csv_file = "coordinates.csv"
-graph = connections(file_path)
-coordinates = coordinates(csv_file)
-
-# User Input
-start = input("Enter your starting city: ").strip().lower()
-destination = input("Enter your destination city: ").strip().lower()
-
-algorithms = {
-    "1": ("Breadth-First Search", bfs),
-    "2": ("Depth-First Search", dfs),
-    "3": ("ID-DFS Search", iddfs),
-    "4": ("Best-First Search", bestFirstSearch),
-    "5": ("A* Search", aStarSearch)
-}
-
-# Display algorithm options
-print("\nChoose a search algorithm:")
-for key, (name, _) in algorithms.items():
-    print(f"{key}. {name}")
-
-choice1 = input("Enter the number of the algorithm you want to use: ").strip()
-name1, function1 = algorithms[choice1]
-path1, distance1, runtime1 = runSearch(function1, name1, graph, start, destination, coordinates)
-
-# initial path
-if path1:
-    print(f"\n{name1} Path: {' -> '.join(path1)}")
-    print(f"Total Distance: {distance1:.2f} km")
-    print(f"Time Taken: {runtime1:.6f} seconds")
-
-# Run comparison
-compare = input("\nWould you like to compare another algorithm? (y/n): ").strip().lower()
-if compare == 'y':
-    print("\nChoose another search algorithm:")
-    for key, (name, _) in algorithms.items():
-        print(f"{key}. {name}")
-
-    choice2 = input("Enter the number of another algorithm to compare: ").strip()
-    name2, function2 = algorithms[choice2]
-    path2, distance2, runtime2 = runSearch(function2, name2, graph, start, destination, coordinates)
-
-    # Display comparison
-    if path2:
-        print(f"\nComparison Results:")
-        print(f"{name1} Path: {' -> '.join(path1)}")
-        print(f"{name2} Path: {' -> '.join(path2)}")
-        print(f"{name1} Distance: {distance1:.2f} km")
-        print(f"{name2} Distance: {distance2:.2f} km")
-        print(f"{name1} Time: {runtime1:.6f} seconds")
-        print(f"{name2} Time: {runtime2:.6f} seconds")
-    else:
-        print(f"\n{name2}: No path found.")
\ No newline at end of file
+import networkx as nx
+import argparse
+import sys
+from collections import deque
+import heapq
+import time
+import tracemalloc
+import weakref
+import csv
+import math
+import numpy as np
+from CompactGraph import CompactGraph
+from GraphCache import cachedConnections
+from SpatialIndex import goalHeuristic, resolveCity
+
+# Reads the text file containing city connections and returns an adjacency graph
+def connections(file_path):
+    graph = nx.Graph()
+    with open(file_path, 'r') as file:
+        for line in file:
+            cities = line.strip().split()
+            if len(cities) == 2:  
+                city1 = cities[0].replace('_', ' ').lower()
+                city2 = cities[1].replace('_', ' ').lower()
+                graph.add_edge(city1, city2)
+    return graph
+
+# Reads the CSV file containing city coordinates and returns a dictionary
+def coordinates(csv_file):
+    coordinates = {}
+    with open(csv_file, 'r') as file:
+        reader = csv.reader(file)
+        for row in reader:
+            city = row[0].strip().replace('_', ' ').lower()
+            lat, lon = float(row[1]), float(row[2])
+            coordinates[city] = (lat, lon)
+    return coordinates
+
+ # Calculates the distance between coordinates
+def distance(coord1, coord2):
+    lat1, lon1 = coord1
+    lat2, lon2 = coord2
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    return math.sqrt(dlat**2 + dlon**2)
+
+# Calculates the total distance used for heristic functions
+def totalDistance(path, coordinates):
+    return sum(distance(coordinates[path[i]], coordinates[path[i+1]]) for i in range(len(path) - 1))
+
+# Counters a search adds to when one is passed as its stats argument. The searches count in
+# local variables and add them here once when they return, so passing no stats costs nothing.
+# Counts add up over every search run with the same object, peaks keep the largest value.
+# traceMemory has runSearch record the peak memory allocated during the search with
+# tracemalloc, which slows the search down, so its runtime should not be compared
+class SearchStats:
+    def __init__(self, traceMemory=False):
+        self.traceMemory = traceMemory
+        self.searches = 0
+        self.nodesExpanded = 0
+        self.nodesGenerated = 0
+        self.peakFrontier = 0
+        self.heuristicEvaluations = 0
+        self.peakMemory = None
+
+    def record(self, expanded, generated, peakFrontier, heuristicEvaluations=0):
+        self.searches += 1
+        self.nodesExpanded += expanded
+        self.nodesGenerated += generated
+        self.peakFrontier = max(self.peakFrontier, peakFrontier)
+        self.heuristicEvaluations += heuristicEvaluations
+
+    def asDict(self):
+        return {"searches": self.searches, "nodesExpanded": self.nodesExpanded, "nodesGenerated": self.nodesGenerated,
+                "peakFrontier": self.peakFrontier, "heuristicEvaluations": self.heuristicEvaluations, "peakMemory": self.peakMemory}
+
+# interface for distinguishing functions that use coordinates and those that do not
+def runSearch(function, name, graph, start, destination, coordinates, stats=None):
+    # the compact graph searches on integer ids, so translate the city names in and out
+    if isinstance(graph, CompactGraph):
+        start, destination, coordinates = graph.nodeId(start), graph.nodeId(destination), graph.coordinates
+    searchArgs = (graph, start, destination, coordinates) if name in ["Best-First Search", "A* Search", "ALT A* Search", "Bidirectional A* Search", "All-Pairs Lookup", "Contraction Hierarchy"] else (graph, start, destination)
+    if stats is None:
+        path, runtime = function(*searchArgs)
+    elif stats.traceMemory:
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        path, runtime = function(*searchArgs, stats=stats)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        if not tracing:
+            tracemalloc.stop()
+        stats.peakMemory = max(stats.peakMemory or 0, peak)
+    else:
+        path, runtime = function(*searchArgs, stats=stats)
+    distance = totalDistance(path, coordinates) if path else None
+    if isinstance(graph, CompactGraph):
+        path = graph.pathNames(path)
+    return path, distance, runtime
+
+# Dictonarey that stores runtimes
+runtimes = {}
+# Dictionary that stores how many nodes the informed searches expanded
+expandedNodes = {}
+
+# Walks the predecessor map back from the goal to rebuild the path
+def reconstructPath(parents, goal):
+    path = []
+    node = goal
+    while node is not None:
+        path.append(node)
+        node = parents[node]
+    path.reverse()
+    return path
+
+# Whether reconstructPath(parents, node) + [last] sorts before reconstructPath(parents, other) + [last],
+# without building either path. Both run down from the start, so they are ordered by the nodes
+# below their deepest common ancestor; depths holds the depth of every node in parents
+def pathPrecedes(parents, depths, node, other, last):
+    if node == other:
+        return False
+    # the node after node and after other on their paths
+    nodeNext = otherNext = last
+    while depths[node] > depths[other]:
+        nodeNext, node = node, parents[node]
+    while depths[other] > depths[node]:
+        otherNext, other = other, parents[other]
+    if node == other:
+        # one path runs through the end of the other
+        return nodeNext < otherNext
+    while parents[node] != parents[other]:
+        node, other = parents[node], parents[other]
+    return node < other
+
+# uses FIFO queue to visit all nodes at the current depth then moves to the next depth, continuing until it finds the goal
+def bfs(graph, start, goal, stats=None):
+    # Breadth-First Search
+    startTime = time.perf_counter()
+    queue = deque([start])
+    # parents doubles as the visited set, a node is recorded the first time it is reached
+    parents = {start: None}
+    expanded, peakFrontier = 0, 1
+
+    while queue:
+        # pops the first node from the queue
+        node = queue.popleft()
+        if node == goal:
+            path = reconstructPath(parents, goal)
+            runtime = (time.perf_counter() - startTime)
+            runtimes["BFS"] = runtime
+            if stats is not None:
+                stats.record(expanded, len(parents), peakFrontier)
+            return path, runtime
+
+        # moves all unseen neighbors of node onto the queue
+        expanded += 1
+        for neighbor in graph.neighbors(node):
+            if neighbor not in parents:
+                parents[neighbor] = node
+                queue.append(neighbor)
+        if len(queue) > peakFrontier:
+            peakFrontier = len(queue)
+
+    runtime = (time.perf_counter() - startTime)
+    runtimes["BFS"] = runtime
+    if stats is not None:
+        stats.record(expanded, len(parents), peakFrontier)
+    return None, runtime
+
+# uses an explicit stack to explore as far as possible along each branch before backtracking until it reaches the goal
+def dfs(graph, start, goal, stats=None):
+    # Depth-First Search
+    startTime = time.perf_counter()
+    parents = {start: None}
+    visited = {start}
+    # each stack entry is a node and the iterator over its remaining neighbors, which
+    # expands neighbors in the same order as the recursive version did
+    stack = [(start, iter(graph.neighbors(start)))]
+    peakFrontier = 1
+
+    if start == goal:
+        runtime = (time.perf_counter() - startTime)
+        runtimes["DFS"] = runtime
+        if stats is not None:
+            stats.record(0, 1, 0)
+        return [start], runtime
+
+    while stack:
+        node, neighbors = stack[-1]
+        for neighbor in neighbors:
+            if neighbor not in visited:
+                parents[neighbor] = node
+                if neighbor == goal:
+                    path = reconstructPath(parents, goal)
+                    runtime = (time.perf_counter() - startTime)
+                    runtimes["DFS"] = runtime
+                    if stats is not None:
+                        stats.record(len(visited), len(parents), peakFrontier)
+                    return path, runtime
+                # descend into the neighbor, the rest of this node's neighbors wait on the stack
+                visited.add(neighbor)
+                stack.append((neighbor, iter(graph.neighbors(neighbor))))
+                if len(stack) > peakFrontier:
+                    peakFrontier = len(stack)
+                break
+        else:
+            stack.pop()
+
+    runtime = (time.perf_counter() - startTime)
+    runtimes["DFS"] = runtime
+    if stats is not None:
+        stats.record(len(visited), len(parents), peakFrontier)
+    return None, runtime
+
+# uses repeated depth-limited searches with an incremented depth limit until the goal is found,
+# maxDepth=None keeps deepening until the goal is found or no node was cut off by the limit.
+# The default maxDepth=50 returns no path for a goal more than 49 edges away. Every limit
+# searches the whole tree again, so a goal d edges deep costs about d * d / 2 expansions:
+# on a chain, depth 20,000 takes minutes and depth 1,000,000 would take days, it runs without
+# recursion but is no search for very deep goals (see BenchDeepSearch.py)
+def iddfs(graph, start, goal, maxDepth=50, stats=None):
+    # Iterative Deepening
+    startTime = time.perf_counter()
+    # totals over all depth limits
+    expanded = generated = peakFrontier = 0
+
+    # depth-limited search with an explicit stack. A node is entered again only when it is
+    # reached with more depth left than before, so no subtree is explored twice at the same
+    # depth but a shorter route to a node is never cut off by an earlier, longer one
+    def dls(limit):
+        nonlocal expanded, generated, peakFrontier
+        generated += 1
+        if limit == 0:
+            return ([start] if start == goal else None), start != goal
+        parents = {start: None}
+        remainingDepth = {start: limit}
+        stack = [(start, limit, iter(graph.neighbors(start)))]
+        expanded += 1
+        peakFrontier = max(peakFrontier, 1)
+        cutOff = False
+        while stack:
+            node, depth, neighbors = stack[-1]
+            for neighbor in neighbors:
+                if remainingDepth.get(neighbor, -1) >= depth - 1:
+                    continue
+                parents[neighbor] = node
+                remainingDepth[neighbor] = depth - 1
+                generated += 1
+                if depth - 1 == 0:
+                    if neighbor == goal:
+                        return reconstructPath(parents, goal), True
+                    cutOff = True
+                    continue
+                stack.append((neighbor, depth - 1, iter(graph.neighbors(neighbor))))
+                expanded += 1
+                if len(stack) > peakFrontier:
+                    peakFrontier = len(stack)
+                break
+            else:
+                stack.pop()
+        return None, cutOff
+
+    # iterates through depth levels
+    depth = 0
+    while maxDepth is None or depth < maxDepth:
+        result, cutOff = dls(depth)
+        if result:
+            runtime = (time.perf_counter() - startTime)
+            runtimes["ID-DFS"] = runtime
+            if stats is not None:
+                stats.record(expanded, generated, peakFrontier)
+            return result, runtime
+        # nothing was deeper than the limit, so a deeper search cannot find more
+        if not cutOff:
+            break
+        depth += 1
+
+    runtime = (time.perf_counter() - startTime)
+    runtimes["ID-DFS"] = runtime
+    if stats is not None:
+        stats.record(expanded, generated, peakFrontier)
+    return None, runtime
+
+# uses a priority queue to visit the node with the smallest distance to the goal
+def bestFirstSearch(graph, start, goal, coordinates, stats=None):
+    # Best First Search using distance as a heuristic.
+    startTime = time.perf_counter()
+    # on the compact graph the distance of every node to the goal is computed at once
+    heuristics = goalHeuristic(coordinates, goal)
+    queue = [(distance(coordinates[start], coordinates[goal]), start)]
+    parents = {start: None}
+    depths = {start: 0}
+    visited = set()
+    peakFrontier = 1
+
+    while queue:
+        _, node = heapq.heappop(queue) # pops the node with the smallest distance
+        if node == goal:
+            path = reconstructPath(parents, goal)
+            runtime = (time.perf_counter() - startTime)
+            runtimes["Best-First"] = runtime
+            # every node is pushed once, with one heuristic evaluation
+            if stats is not None:
+                stats.record(len(visited), len(parents), peakFrontier, len(parents))
+            return path, runtime
+
+        # skip if already visited
+        if node in visited:
+            continue # goes to next iteration of the loop
+
+        visited.add(node)
+        for neighbor in graph.neighbors(node):
+            if neighbor not in visited:
+                if neighbor not in parents:
+                    parents[neighbor] = node
+                    depths[neighbor] = depths[node] + 1
+                    heuristic = float(heuristics[neighbor]) if heuristics is not None else distance(coordinates[neighbor], coordinates[goal])
+                    heapq.heappush(queue, (heuristic, neighbor))
+                # the priority only depends on the node, so equal entries used to be ordered by their
+                # path; keep the lexicographically smaller path to pop the same route as before
+                elif pathPrecedes(parents, depths, node, parents[neighbor], neighbor):
+                    parents[neighbor] = node
+                    depths[neighbor] = depths[node] + 1
+        if len(queue) > peakFrontier:
+            peakFrontier = len(queue)
+
+    runtime = (time.perf_counter() - startTime)
+    runtimes["Best-First"] = runtime
+    if stats is not None:
+        stats.record(len(visited), len(parents), peakFrontier, len(parents))
+    return None, runtime
+
+# uses a priority queue to visit the node with the smallest estimated cost to goal
+def aStarSearch(graph, start, goal, coordinates, stats=None):
+    # A* Search using distance as heuristic
+    startTime = time.perf_counter()
+    heuristics = goalHeuristic(coordinates, goal)
+    priorityQueue = [(0, start)]
+    parents = {start: None}
+    depths = {start: 0}
+    visitedNodes = set()
+    gCost = {start: 0}  # Stores the known cost to reach each visited node
+    # queue entries pushed after the start, each with one heuristic evaluation
+    pushes, peakFrontier = 0, 1
+
+    while priorityQueue:
+        _, node = heapq.heappop(priorityQueue)
+        
+        if node == goal:
+            path = reconstructPath(parents, goal)
+            runtime = time.perf_counter() - startTime
+            runtimes["A*"] = runtime
+            expandedNodes["A*"] = len(visitedNodes)
+            if stats is not None:
+                stats.record(len(visitedNodes), pushes + 1, peakFrontier, pushes)
+            return path, runtime
+
+        if node in visitedNodes:
+            continue  
+
+        visitedNodes.add(node)
+        
+        for neighbor in graph.neighbors(node):
+            # the heuristic is consistent, so a visited node already has its cheapest parent
+            if neighbor in visitedNodes:
+                continue
+            travelCost = gCost[node] + distance(coordinates[node], coordinates[neighbor])
+            if neighbor not in gCost or travelCost < gCost[neighbor]:
+                # f(n) = g(n) + h(n)
+                heuristic = float(heuristics[neighbor]) if heuristics is not None else distance(coordinates[neighbor], coordinates[goal])
+                estimatedTotalCost = travelCost + heuristic
+                # a cheaper g can round to the same f, and equal entries used to be ordered by their path
+                if neighbor not in gCost or gCost[neighbor] + heuristic != estimatedTotalCost or pathPrecedes(parents, depths, node, parents[neighbor], neighbor):
+                    parents[neighbor] = node
+                    depths[neighbor] = depths[node] + 1
+                gCost[neighbor] = travelCost
+                heapq.heappush(priorityQueue, (estimatedTotalCost, neighbor))
+                pushes += 1
+        if len(priorityQueue) > peakFrontier:
+            peakFrontier = len(priorityQueue)
+
+    runtime = time.perf_counter() - startTime
+    runtimes["A*"] = runtime
+    expandedNodes["A*"] = len(visitedNodes)
+    if stats is not None:
+        stats.record(len(visitedNodes), pushes + 1, peakFrontier, pushes)
+    return None, runtime
+
+# uses A* with the larger of the straight-line distance and the landmark lower bound as heuristic
+def aStarLandmarkSearch(graph, start, goal, coordinates, stats=None):
+    # A* Search with ALT heuristic, landmark tables come from Landmarks.py and are stored in graph.tables
+    startTime = time.perf_counter()
+    landmarkDistances = getattr(graph, "tables", {}).get("landmarkDistances")
+
+    # triangle inequality: |d(L, goal) - d(L, node)| <= d(node, goal) for every landmark L,
+    # looked up for a node when it is first pushed. A landmark that reaches neither node has
+    # inf in both rows and is skipped, so inf - inf is never taken
+    goalDistances = landmarkDistances[goal].tolist() if landmarkDistances is not None else None
+    heuristics = goalHeuristic(coordinates, goal)
+    bounds = {}
+    def heuristic(node):
+        if node in bounds:
+            return bounds[node]
+        estimate = float(heuristics[node]) if heuristics is not None else distance(coordinates[node], coordinates[goal])
+        if goalDistances is not None:
+            for toGoal, toNode in zip(goalDistances, landmarkDistances[node].tolist()):
+                if toGoal != toNode and abs(toGoal - toNode) > estimate:
+                    estimate = abs(toGoal - toNode)
+        bounds[node] = estimate
+        return estimate
+
+    priorityQueue = [(0, start)]
+    parents = {start: None}
+    visitedNodes = set()
+    gCost = {start: 0}
+    pushes, peakFrontier = 0, 1
+
+    while priorityQueue:
+        _, node = heapq.heappop(priorityQueue)
+
+        if node == goal:
+            path = reconstructPath(parents, goal)
+            runtime = time.perf_counter() - startTime
+            runtimes["ALT A*"] = runtime
+            expandedNodes["ALT A*"] = len(visitedNodes)
+            if stats is not None:
+                stats.record(len(visitedNodes), pushes + 1, peakFrontier, pushes)
+            return path, runtime
+
+        if node in visitedNodes:
+            continue
+
+        visitedNodes.add(node)
+
+        for neighbor in graph.neighbors(node):
+            if neighbor in visitedNodes:
+                continue
+            travelCost = gCost[node] + distance(coordinates[node], coordinates[neighbor])
+            if neighbor not in gCost or travelCost < gCost[neighbor]:
+                gCost[neighbor] = travelCost
+                parents[neighbor] = node
+                heapq.heappush(priorityQueue, (travelCost + heuristic(neighbor), neighbor))
+                pushes += 1
+        if len(priorityQueue) > peakFrontier:
+            peakFrontier = len(priorityQueue)
+
+    runtime = time.perf_counter() - startTime
+    runtimes["ALT A*"] = runtime
+    expandedNodes["ALT A*"] = len(visitedNodes)
+    if stats is not None:
+        stats.record(len(visitedNodes), pushes + 1, peakFrontier, pushes)
+    return None, runtime
+
+# searches level by level from both ends, always growing the smaller frontier, until the two meet
+def bidirectionalBfs(graph, start, goal, stats=None):
+    # Bidirectional Breadth-First Search
+    startTime = time.perf_counter()
+    parents = ({start: None}, {goal: None})
+    depths = ({start: 0}, {goal: 0})
+    frontiers = ([start], [goal])
+    meeting = start if start == goal else None
+    expanded, peakFrontier = 0, 2
+
+    while meeting is None and frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        seen, depth, otherDepth = parents[side], depths[side], depths[1 - side]
+        # the whole level is expanded before stopping, and the meeting closest to the other end wins
+        nextFrontier = []
+        expanded += len(frontiers[side])
+        for node in frontiers[side]:
+            for neighbor in graph.neighbors(node):
+                if neighbor not in seen:
+                    seen[neighbor] = node
+                    depth[neighbor] = depth[node] + 1
+                    nextFrontier.append(neighbor)
+                    if neighbor in otherDepth and (meeting is None or otherDepth[neighbor] < otherDepth[meeting]):
+                        meeting = neighbor
+        frontiers = (nextFrontier, frontiers[1]) if side == 0 else (frontiers[0], nextFrontier)
+        if len(frontiers[0]) + len(frontiers[1]) > peakFrontier:
+            peakFrontier = len(frontiers[0]) + len(frontiers[1])
+
+    if stats is not None:
+        stats.record(expanded, len(parents[0]) + len(parents[1]), peakFrontier)
+    if meeting is None:
+        runtime = (time.perf_counter() - startTime)
+        runtimes["Bidirectional BFS"] = runtime
+        return None, runtime
+
+    path = reconstructPath(parents[0], meeting) + reconstructPath(parents[1], meeting)[-2::-1]
+    runtime = (time.perf_counter() - startTime)
+    runtimes["Bidirectional BFS"] = runtime
+    return path, runtime
+
+# runs A* forwards towards the goal and backwards towards the start at the same time
+def bidirectionalAStarSearch(graph, start, goal, coordinates, stats=None):
+    # Bidirectional A* Search with average potentials: the forward search uses half the
+    # straight-line distance to the goal minus half the one to the start, the backward search
+    # the negative of that, so both searches see the same edge costs and are consistent
+    startTime = time.perf_counter()
+    toGoal, toStart = goalHeuristic(coordinates, goal), goalHeuristic(coordinates, start)
+    potentials = (toGoal - toStart) / 2 if toGoal is not None else None
+    def potential(node):
+        if potentials is not None:
+            return float(potentials[node])
+        return (distance(coordinates[node], coordinates[goal]) - distance(coordinates[node], coordinates[start])) / 2
+    signs = (1.0, -1.0)
+    gCosts = ({start: 0}, {goal: 0})
+    parents = ({start: None}, {goal: None})
+    visited = (set(), set())
+    queues = ([(potential(start), start)], [(-potential(goal), goal)])
+    best = 0 if start == goal else float("inf")
+    meeting = start if start == goal else None
+    # queue entries pushed after the two ends, each with one potential evaluation
+    pushes, peakFrontier = 0, 2
+
+    # a path through nodes neither search has settled is at least the sum of the two smallest
+    # keys, since the potentials of its nodes cancel, so the best meeting is optimal once that sum reaches it
+    while queues[0] and queues[1] and queues[0][0][0] + queues[1][0][0] < best:
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        queue, gCost, other = queues[side], gCosts[side], gCosts[1 - side]
+        _, node = heapq.heappop(queue)
+        if node in visited[side]:
+            continue
+        visited[side].add(node)
+
+        for neighbor in graph.neighbors(node):
+            if neighbor in visited[side]:
+                continue
+            travelCost = gCost[node] + distance(coordinates[node], coordinates[neighbor])
+            if neighbor not in gCost or travelCost < gCost[neighbor]:
+                gCost[neighbor] = travelCost
+                parents[side][neighbor] = node
+                heapq.heappush(queue, (travelCost + signs[side] * potential(neighbor), neighbor))
+                pushes += 1
+                if neighbor in other and travelCost + other[neighbor] < best:
+                    best = travelCost + other[neighbor]
+                    meeting = neighbor
+        if len(queues[0]) + len(queues[1]) > peakFrontier:
+            peakFrontier = len(queues[0]) + len(queues[1])
+
+    expandedNodes["Bidirectional A*"] = len(visited[0]) + len(visited[1])
+    if stats is not None:
+        stats.record(len(visited[0]) + len(visited[1]), pushes + 2, peakFrontier, pushes + 2)
+    if meeting is None:
+        runtime = time.perf_counter() - startTime
+        runtimes["Bidirectional A*"] = runtime
+        return None, runtime
+
+    path = reconstructPath(parents[0], meeting) + reconstructPath(parents[1], meeting)[-2::-1]
+    runtime = time.perf_counter() - startTime
+    runtimes["Bidirectional A*"] = runtime
+    return path, runtime
+
+# reads the path out of the all-pairs next-hop table that AllPairs.py stores in graph.tables
+def allPairsSearch(graph, start, goal, coordinates, stats=None):
+    # All-Pairs table lookup, graphs without the table are searched with A* instead
+    nextHop = getattr(graph, "tables", {}).get("allPairsNextHop")
+    if nextHop is None:
+        return aStarSearch(graph, start, goal, coordinates, stats)
+    startTime = time.perf_counter()
+    path = None
+    if nextHop[start, goal] >= 0:
+        path = [start]
+        node = start
+        # every step moves to a node one hop closer to the goal, so at most len(graph) steps
+        while node != goal and len(path) <= len(nextHop):
+            node = int(nextHop[node, goal])
+            path.append(node)
+    runtime = time.perf_counter() - startTime
+    runtimes["All-Pairs Lookup"] = runtime
+    # nothing is searched, the path nodes are read from the table
+    if stats is not None:
+        stats.record(0, len(path) if path else 0, 0)
+    return path, runtime
+
+# (targets, weights, middles) lists of the upward edges of every node of the contraction
+# hierarchy of a graph, filled in as queries reach the nodes. The top of the hierarchy is
+# shared by most queries, so after a while few nodes still need their edges read from the tables
+upwardEdges = weakref.WeakKeyDictionary()
+
+def readUpwardEdges(upward, tables, node):
+    begin, end = tables["chOffsets"][node:node + 2].tolist()
+    upward[node] = tuple(tables[name][begin:end].tolist() for name in ("chTargets", "chWeights", "chMiddle"))
+    return upward[node]
+
+# the original nodes an upward edge of the contraction hierarchy between node and target
+# stands for, in order from node to target and excluding node. Both halves of a shortcut are
+# upward edges of its middle node, the lowest ranked of the three, and are unpacked in turn
+def unpackEdge(upward, tables, node, target, middle):
+    path = []
+    segments = [(node, target, middle)]
+    while segments:
+        node, target, middle = segments.pop()
+        if middle < 0:
+            path.append(target)
+            continue
+        targets, _, middles = upward[middle] or readUpwardEdges(upward, tables, middle)
+        segments.append((middle, target, middles[targets.index(target)]))
+        segments.append((node, middle, middles[targets.index(node)]))
+    return path
+
+# uses a bidirectional Dijkstra that only climbs to higher ranked nodes of the contraction
+# hierarchy that ContractionHierarchy.py stores in graph.tables, then unpacks shortcuts
+def contractionHierarchySearch(graph, start, goal, coordinates, stats=None):
+    # Contraction Hierarchy query, graphs without the index are searched with A* instead
+    tables = getattr(graph, "tables", {})
+    if "chOffsets" not in tables:
+        return aStarSearch(graph, start, goal, coordinates, stats)
+    startTime = time.perf_counter()
+    # plain ndarray views, slicing a memory-mapped array costs more than relaxing its edges
+    tables = {name: tables[name].view(np.ndarray) for name in ("chOffsets", "chTargets", "chWeights", "chMiddle")}
+    upward = upwardEdges.get(graph)
+    if upward is None:
+        upward = upwardEdges[graph] = [None] * len(graph)
+
+    costs = ({start: 0.0}, {goal: 0.0})
+    parents = ({start: None}, {goal: None})
+    queues = ([(0.0, start)], [(0.0, goal)])
+    best = math.inf if start != goal else 0.0
+    meeting = start if start == goal else None
+    expanded = pushes = 0
+    peakFrontier = 2
+
+    # a direction is finished once its smallest key can no longer improve the best meeting
+    while (queues[0] and queues[0][0][0] < best) or (queues[1] and queues[1][0][0] < best):
+        for side in (0, 1):
+            queue, cost, other, parent = queues[side], costs[side], costs[1 - side], parents[side]
+            if not queue or queue[0][0] >= best:
+                continue
+            nodeCost, node = heapq.heappop(queue)
+            if nodeCost > cost[node]:
+                continue
+            targets, weights, middles = upward[node] or readUpwardEdges(upward, tables, node)
+            # stall on demand: a higher ranked neighbor already reached more cheaply means no
+            # shortest route climbs through this node, so its edges are not followed
+            stalled = False
+            for target, weight in zip(targets, weights):
+                if target in cost and cost[target] + weight < nodeCost:
+                    stalled = True
+                    break
+            if stalled:
+                continue
+            expanded += 1
+            for target, weight, middle in zip(targets, weights, middles):
+                travelCost = nodeCost + weight
+                if target not in cost or travelCost < cost[target]:
+                    cost[target] = travelCost
+                    parent[target] = (node, middle)
+                    heapq.heappush(queue, (travelCost, target))
+                    pushes += 1
+                    if target in other and travelCost + other[target] < best:
+                        best = travelCost + other[target]
+                        meeting = target
+            if len(queues[0]) + len(queues[1]) > peakFrontier:
+                peakFrontier = len(queues[0]) + len(queues[1])
+
+    path = None
+    if meeting is not None:
+        # start -> meeting climbs along forward parents, meeting -> goal descends along backward parents
+        forward = []
+        node = meeting
+        while parents[0][node] is not None:
+            previous, middle = parents[0][node]
+            forward.append((previous, node, middle))
+            node = previous
+        path = [start]
+        for previous, node, middle in reversed(forward):
+            path.extend(unpackEdge(upward, tables, previous, node, middle))
+        node = meeting
+        while parents[1][node] is not None:
+            # the edge points up from previous towards the meeting node, walk it downwards
+            previous, middle = parents[1][node]
+            path.extend(unpackEdge(upward, tables, node, previous, middle))
+            node = previous
+
+    runtime = time.perf_counter() - startTime
+    runtimes["CH"] = runtime
+    if stats is not None:
+        stats.record(expanded, pushes + 2, peakFrontier)
+    return path, runtime
+
+algorithms = {
+    "1": ("Breadth-First Search", bfs),
+    "2": ("Depth-First Search", dfs),
+    "3": ("ID-DFS Search", iddfs),
+    "4": ("Best-First Search", bestFirstSearch),
+    "5": ("A* Search", aStarSearch),
+    "6": ("ALT A* Search", aStarLandmarkSearch),
+    "7": ("Bidirectional BFS", bidirectionalBfs),
+    "8": ("Bidirectional A* Search", bidirectionalAStarSearch),
+    "9": ("All-Pairs Lookup", allPairsSearch),
+    "10": ("Contraction Hierarchy", contractionHierarchySearch)
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find a route between two cities")
+    parser.add_argument("--batch", metavar="FILE", help="answer an origin-destination list from FILE ('-' for stdin) as JSON lines instead of prompting")
+    parser.add_argument("--algorithm", default="dijkstra", help="dijkstra or bfs to share one search tree per source, or a menu number/name to search each pair")
+    parser.add_argument("--chunk", type=int, default=10000, help="number of queries grouped by source at a time")
+    args = parser.parse_args()
+
+    # Load Data
+    file_path = "Adjacencies.txt"
+    csv_file = "coordinates.csv"
+    graph = cachedConnections(file_path, csv_file)
+    coordinates = graph.coordinates
+
+    # Non-interactive batch mode
+    if args.batch:
+        from RouteEngine import RouteEngine, runBatch, treeSearches
+        algorithm = algorithms[args.algorithm][0] if args.algorithm in algorithms else args.algorithm
+        if algorithm not in treeSearches and all(algorithm != name for name, _ in algorithms.values()):
+            parser.error(f"unknown algorithm '{args.algorithm}'")
+        inputFile = sys.stdin if args.batch == "-" else open(args.batch)
+        with inputFile:
+            runBatch(RouteEngine(graph), inputFile, sys.stdout, algorithm, args.chunk)
+        sys.exit(0)
+
+    # User Input
+    # a "lat, lon" location is snapped to the nearest city
+    start = resolveCity(graph, input("Enter your starting city or lat, lon: ").strip().lower())
+    destination = resolveCity(graph, input("Enter your destination city or lat, lon: ").strip().lower())
+    print(f"Routing from {start} to {destination}")
+
+    # Display algorithm options
+    print("\nChoose a search algorithm:")
+    for key, (name, _) in algorithms.items():
+        print(f"{key}. {name}")
+
+    choice1 = input("Enter the number of the algorithm you want to use: ").strip()
+    name1, function1 = algorithms[choice1]
+    path1, distance1, runtime1 = runSearch(function1, name1, graph, start, destination, coordinates)
+
+    # initial path
+    if path1:
+        print(f"\n{name1} Path: {' -> '.join(path1)}")
+        print(f"Total Distance: {distance1:.2f} km")
+        print(f"Time Taken: {runtime1:.6f} seconds")
+
+    # Run comparison
+    compare = input("\nWould you like to compare another algorithm? (y/n): ").strip().lower()
+    if compare == 'y':
+        print("\nChoose another search algorithm:")
+        for key, (name, _) in algorithms.items():
+            print(f"{key}. {name}")
+
+        choice2 = input("Enter the number of another algorithm to compare: ").strip()
+        name2, function2 = algorithms[choice2]
+        path2, distance2, runtime2 = runSearch(function2, name2, graph, start, destination, coordinates)
+
+        # Display comparison
+        if path2:
+            print(f"\nComparison Results:")
+            print(f"{name1} Path: {' -> '.join(path1)}")
+            print(f"{name2} Path: {' -> '.join(path2)}")
+            print(f"{name1} Distance: {distance1:.2f} km")
+            print(f"{name2} Distance: {distance2:.2f} km")
+            print(f"{name1} Time: {runtime1:.6f} seconds")
+            print(f"{name2} Time: {runtime2:.6f} seconds")
+        else:
+            print(f"\n{name2}: No path found.")
\ No newline at end of file
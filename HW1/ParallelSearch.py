@@ -0,0 +1,148 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from CompactGraph import edgeWeights, gridGraph
+from GraphCache import cachePath, cachedConnections, loadGraph, saveGraph
+from Main import algorithms
+from RouteEngine import RouteEngine, treeSearches
+from SpatialIndex import resolveCity
+
+# Runs route queries and algorithm comparisons in a process pool. Every worker memory
+# maps the same graph cache file read-only, so the arrays live once in the page cache
+# and are shared by all processes instead of being pickled or copied per worker.
+
+# the engine each worker process builds once from the cache file
+workerEngine = None
+
+def initWorker(graphPath):
+    global workerEngine
+    workerEngine = RouteEngine(loadGraph(graphPath))
+
+# answers one task of (start, [(index, destination), ...]) groups
+def routeGroups(groups, algorithm):
+    results = []
+    graph = workerEngine.graph
+    for start, group in groups:
+        # [lat, lon] endpoints are snapped in the worker, which has the graph loaded
+        start = resolveCity(graph, start)
+        group = [(index, resolveCity(graph, destination)) for index, destination in group]
+        if algorithm in treeSearches:
+            results.extend(workerEngine.routesFrom(start, group, algorithm))
+        else:
+            results.extend(workerEngine.route(start, destination, algorithm, index) for index, destination in group)
+    return results
+
+def routeOne(start, destination, algorithm):
+    return workerEngine.route(start, destination, algorithm)
+
+# Pool of search workers over one cached graph file
+class SearchPool:
+    def __init__(self, graphPath, workers=None):
+        self.workers = workers or os.cpu_count()
+        self.executor = ProcessPoolExecutor(self.workers, initializer=initWorker, initargs=(graphPath,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown()
+
+    # starts every worker and waits until each has mapped the graph
+    def warmUp(self):
+        wait([self.executor.submit(os.getpid) for _ in range(self.workers)])
+
+    # Answers (start, destination) pairs like RouteEngine.batch, with the source groups of
+    # each chunk split into tasks spread over the workers. At most a few tasks per worker
+    # are in flight, and results are yielded in completion order with their "id". A query
+    # that is an exception is answered with its message as the error, and an unknown
+    # algorithm raises ValueError before any task is submitted
+    def batch(self, queries, algorithm="dijkstra", chunkSize=10000, taskSize=64):
+        if algorithm not in treeSearches and algorithm not in {name for name, _ in algorithms.values()}:
+            raise ValueError(f"unknown algorithm '{algorithm}'")
+        return self.batchResults(iter(enumerate(queries)), algorithm, chunkSize, taskSize)
+
+    def batchResults(self, queries, algorithm, chunkSize, taskSize):
+        pending = set()
+        while True:
+            chunk = list(islice(queries, chunkSize))
+            groups = {}
+            for index, query in chunk:
+                if isinstance(query, Exception):
+                    yield dict(RouteEngine.result(index, None, None, algorithm, None, None), error=f"invalid query: {query}")
+                    continue
+                start, destination = query
+                groups.setdefault(start, []).append((index, destination))
+            groups = list(groups.items())
+
+            for i in range(0, len(groups), taskSize):
+                if len(pending) >= 4 * self.workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+                pending.add(self.executor.submit(routeGroups, groups[i:i + taskSize], algorithm))
+
+            if not chunk:
+                break
+        for future in pending:
+            yield from future.result()
+
+    # runs several menu searches for the same pair at once, by default all of them
+    def compare(self, start, destination, names=None):
+        names = names or [name for name, _ in algorithms.values()]
+        futures = {name: self.executor.submit(routeOne, start, destination, name) for name in names}
+        return {name: future.result() for name, future in futures.items()}
+
+# Reports query throughput for each worker count on the Kansas data or a grid graph
+def main():
+    parser = argparse.ArgumentParser(description="Measure how route query throughput scales with worker processes")
+    parser.add_argument("--grid", type=int, default=0, help="use an N x N grid graph instead of the Kansas data")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--sources", type=int, default=0, help="distinct sources to draw queries from, 0 for any node")
+    parser.add_argument("--algorithm", default="dijkstra")
+    parser.add_argument("--workers", default="1,2,4,8", help="comma separated worker counts")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    temporary = None
+    if args.grid:
+        graph = gridGraph(args.grid, args.grid)
+        edgeWeights(graph)
+        temporary = tempfile.NamedTemporaryFile(suffix=".graph", delete=False)
+        temporary.close()
+        saveGraph(graph, temporary.name)
+        graphPath = temporary.name
+    else:
+        graph = cachedConnections("Adjacencies.txt", "coordinates.csv")
+        graphPath = cachePath("Adjacencies.txt")
+
+    rng = random.Random(args.seed)
+    cities = list(graph.cities)
+    sources = rng.sample(cities, min(args.sources, len(cities))) if args.sources else cities
+    queries = [(rng.choice(sources), rng.choice(cities)) for _ in range(args.queries)]
+
+    print(f"{len(graph)} nodes, {len(queries)} queries, algorithm {args.algorithm}")
+    print(f"{'workers':>8}{'seconds':>10}{'queries/s':>12}{'speedup':>9}")
+    baseline = None
+    try:
+        for workers in [int(w) for w in args.workers.split(",")]:
+            with SearchPool(graphPath, workers) as pool:
+                # process start is not timed
+                pool.warmUp()
+                startTime = time.perf_counter()
+                answered = sum(1 for _ in pool.batch(queries, args.algorithm))
+                elapsed = time.perf_counter() - startTime
+            baseline = baseline or elapsed
+            print(f"{workers:>8}{elapsed:>10.3f}{answered / elapsed:>12.1f}{baseline / elapsed:>8.2f}x")
+    finally:
+        if temporary:
+            os.unlink(temporary.name)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import heapq
+import json
+from collections import deque
+from itertools import islice
+from CompactGraph import edgeWeights
+from GraphCache import cachedConnections
+from Main import algorithms, runSearch, reconstructPath
+from SpatialIndex import resolveCity
+
+# single-source Dijkstra over the distance() weighted graph, stops once every target is settled
+def dijkstraTree(graph, source, targets=None):
+    weights = edgeWeights(graph)
+    remaining = set(targets) if targets is not None else None
+    parents = {source: None}
+    cost = {source: 0.0}
+    settled = set()
+    queue = [(0.0, source)]
+
+    while queue:
+        nodeCost, node = heapq.heappop(queue)
+        if node in settled:
+            continue
+        settled.add(node)
+        if remaining is not None:
+            remaining.discard(node)
+            if not remaining:
+                break
+
+        begin, end = graph.offsets[node], graph.offsets[node + 1]
+        for neighbor, weight in zip(graph.adjacency[begin:end].tolist(), weights[begin:end].tolist()):
+            travelCost = nodeCost + weight
+            if neighbor not in settled and (neighbor not in cost or travelCost < cost[neighbor]):
+                cost[neighbor] = travelCost
+                parents[neighbor] = node
+                heapq.heappush(queue, (travelCost, neighbor))
+
+    return parents, {node: cost[node] for node in settled}
+
+# single-source BFS tree with the same first-discovery parents as bfs(), stops once every target is reached
+def bfsTree(graph, source, targets=None):
+    remaining = set(targets) if targets is not None else None
+    parents = {source: None}
+    queue = deque([source])
+    if remaining is not None:
+        remaining.discard(source)
+
+    while queue and remaining != set():
+        node = queue.popleft()
+        for neighbor in graph.neighbors(node):
+            if neighbor not in parents:
+                parents[neighbor] = node
+                queue.append(neighbor)
+                if remaining is not None:
+                    remaining.discard(neighbor)
+
+    return parents, None
+
+# searches that build one tree per source and answer every destination from it
+treeSearches = {
+    "dijkstra": dijkstraTree,
+    "bfs": bfsTree
+}
+
+# Parses one line of an origin-destination list, either a JSON object with start and
+# destination or two whitespace separated city names written like Adjacencies.txt.
+# In JSON an endpoint can also be a [lat, lon] pair, which is snapped to the nearest city.
+# Raises ValueError for a line that is neither
+def parseQuery(line):
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        query = json.loads(line)
+        if not isinstance(query, dict):
+            raise ValueError(f"expected a JSON object, got {line!r}")
+        return tuple(parseEndpoint(query, key) for key in ("start", "destination"))
+    cities = line.split()
+    if len(cities) != 2:
+        raise ValueError(f"expected two cities, got {line!r}")
+    return cities[0].replace('_', ' ').lower(), cities[1].replace('_', ' ').lower()
+
+def parseEndpoint(query, key):
+    if key not in query:
+        raise ValueError(f"missing '{key}'")
+    value = query[key]
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, list) and len(value) == 2 and all(isinstance(x, (int, float)) and not isinstance(x, bool) for x in value):
+        return tuple(value)
+    raise ValueError(f"'{key}' must be a city name or a [lat, lon] pair, got {json.dumps(value)}")
+
+# parsed queries of an origin-destination list, a line parseQuery rejects is passed on as its error
+def readQueries(inputFile):
+    for line in inputFile:
+        try:
+            query = parseQuery(line)
+        except ValueError as error:
+            yield error
+            continue
+        if query is not None:
+            yield query
+
+# Answers route queries against one loaded graph, reusing it for every query
+class RouteEngine:
+    def __init__(self, graph):
+        self.graph = graph
+        self.searches = {name: function for name, function in algorithms.values()}
+
+    @classmethod
+    def fromFiles(cls, file_path, csv_file):
+        return cls(cachedConnections(file_path, csv_file))
+
+    @staticmethod
+    def result(index, start, destination, algorithm, path, distance):
+        return {
+            "id": index,
+            "start": start,
+            "destination": destination,
+            "algorithm": algorithm,
+            "path": path,
+            "distance": float(distance) if distance is not None else None
+        }
+
+    # runs one of the menu searches for a single pair
+    def route(self, start, destination, algorithm="A* Search", index=None):
+        if algorithm not in self.searches:
+            return dict(self.result(index, start, destination, algorithm, None, None), error=f"unknown algorithm '{algorithm}'")
+        try:
+            path, distance, runtime = runSearch(self.searches[algorithm], algorithm, self.graph, start, destination, self.graph.coordinates)
+        except KeyError as error:
+            return dict(self.result(index, start, destination, algorithm, None, None), error=f"unknown city {error}")
+        return dict(self.result(index, start, destination, algorithm, path, distance), runtime=runtime)
+
+    # answers every destination of one source from a single search tree
+    def routesFrom(self, start, queries, algorithm):
+        graph = self.graph
+        known = []
+        for index, destination in queries:
+            try:
+                known.append((index, destination, graph.nodeId(destination)))
+            except KeyError:
+                yield dict(self.result(index, start, destination, algorithm, None, None), error=f"unknown city '{destination}'")
+        try:
+            source = graph.nodeId(start)
+        except KeyError:
+            for index, destination, _ in known:
+                yield dict(self.result(index, start, destination, algorithm, None, None), error=f"unknown city '{start}'")
+            return
+
+        parents, cost = treeSearches[algorithm](graph, source, [target for _, _, target in known])
+        weights = edgeWeights(graph)
+        for index, destination, target in known:
+            if target not in parents:
+                yield self.result(index, start, destination, algorithm, None, None)
+                continue
+            path = reconstructPath(parents, target)
+            distance = cost[target] if cost is not None else totalWeight(graph, weights, path)
+            yield self.result(index, start, destination, algorithm, graph.pathNames(path), distance)
+
+    # Answers an iterable of (start, destination) pairs. Queries are read in chunks and
+    # grouped by source, so one tree serves every destination of that source; results are
+    # yielded as soon as a group is done and carry the position of their query in "id".
+    # A query that is an exception, like the lines readQueries could not parse, is answered
+    # with its message as the error. Raises ValueError for an unknown algorithm
+    def batch(self, queries, algorithm="dijkstra", chunkSize=10000):
+        if algorithm not in treeSearches and algorithm not in self.searches:
+            raise ValueError(f"unknown algorithm '{algorithm}'")
+        return self.batchResults(iter(enumerate(queries)), algorithm, chunkSize)
+
+    def batchResults(self, queries, algorithm, chunkSize):
+        while True:
+            chunk = list(islice(queries, chunkSize))
+            if not chunk:
+                return
+            valid = []
+            for index, query in chunk:
+                if isinstance(query, Exception):
+                    yield dict(self.result(index, None, None, algorithm, None, None), error=f"invalid query: {query}")
+                else:
+                    valid.append((index, query))
+            chunk = valid
+            if algorithm not in treeSearches:
+                for index, (start, destination) in chunk:
+                    yield self.route(resolveCity(self.graph, start), resolveCity(self.graph, destination), algorithm, index)
+                continue
+
+            groups = {}
+            for index, (start, destination) in chunk:
+                groups.setdefault(resolveCity(self.graph, start), []).append((index, resolveCity(self.graph, destination)))
+            for start, group in groups.items():
+                yield from self.routesFrom(start, group, algorithm)
+
+# distance of a path of node ids, summed in path order like totalDistance()
+def totalWeight(graph, weights, path):
+    total = 0
+    for node, nextNode in zip(path, path[1:]):
+        begin = graph.offsets[node]
+        position = graph.adjacency[begin:graph.offsets[node + 1]].tolist().index(nextNode)
+        total += weights[begin + position]
+    return total
+
+# Reads an origin-destination list from a file object and writes one JSON result per line
+def runBatch(engine, inputFile, outputFile, algorithm="dijkstra", chunkSize=10000):
+    for result in engine.batch(readQueries(inputFile), algorithm, chunkSize):
+        outputFile.write(json.dumps(result) + "\n")
+    outputFile.flush()
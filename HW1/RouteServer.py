@@ -0,0 +1,258 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+from CompactGraph import edgeWeights, gridGraph
+from DynamicGraph import staleRoutes, updateEdge
+from GraphCache import cachePath, cachedConnections, saveGraph
+from Main import algorithms
+from ParallelSearch import initWorker, routeOne
+from RouteEngine import RouteEngine
+from SpatialIndex import resolveCity
+
+# Long-running route query service. The graph stays loaded and clients send one JSON object
+# per line over TCP:
+#   {"id": 1, "start": "wichita", "destination": "salina", "algorithm": "A* Search"}
+# algorithm is a menu name or number and defaults to A*, endpoints can be [lat, lon] pairs.
+# Every request gets one JSON line back with the fields of RouteEngine.route(), its "id" and
+# whether it came from the cache. Requests of a connection are answered concurrently, so
+# answers can come back out of order. {"stats": true} returns the latency percentiles and
+# cache counters instead of a route, and
+#   {"update": "remove", "edge": ["wichita", "newton"]}
+# closes a road ("add" opens one). An update builds the changed graph with DynamicGraph in its
+# own thread and swaps it in once done, so queries keep being answered meanwhile, and only the
+# cached routes the change can affect are dropped.
+#
+# Searches run in an executor so the event loop keeps reading requests: one thread by
+# default, or with --workers a process pool whose workers map the graph cache file like
+# ParallelSearch. Results are kept in a size bounded LRU cache keyed on (start, destination,
+# algorithm), and a request for a route that is already being searched waits for that search.
+
+# Bounded least-recently-used cache of route results
+class RouteCache:
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        if self.capacity <= 0:
+            return
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def discard(self, keys):
+        for key in keys:
+            self.entries.pop(key, None)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hitRate": self.hits / lookups if lookups else 0.0, "size": len(self.entries)}
+
+# menu name of a requested algorithm, which can also be given by its menu number
+def algorithmName(algorithm):
+    if algorithm in algorithms:
+        return algorithms[algorithm][0]
+    if any(algorithm == name for name, _ in algorithms.values()):
+        return algorithm
+    raise ValueError(f"unknown algorithm '{algorithm}'")
+
+class RouteServer:
+    def __init__(self, engine, cacheSize=10000, executor=None, pooled=False, latencyWindow=100000):
+        self.engine = engine
+        self.cache = RouteCache(cacheSize)
+        self.executor = executor or ThreadPoolExecutor(1)
+        # a process pool runs the searches of ParallelSearch's workers, threads use the engine here
+        self.pooled = pooled
+        self.search = routeOne if pooled else engine.route
+        # searches still running, for requests of the same route on the same graph to wait on
+        self.running = {}
+        # edge updates are built one at a time in their own thread, each one moves the version on
+        self.updater = ThreadPoolExecutor(1)
+        self.updateLock = asyncio.Lock()
+        self.version = 0
+        # seconds of the most recent answers, from reading the request to writing the answer
+        self.latencies = deque(maxlen=latencyWindow)
+        self.requests = 0
+
+    async def answer(self, request):
+        start, destination = (tuple(request[key]) if isinstance(request[key], list) else request[key].strip().lower() for key in ("start", "destination"))
+        algorithm = algorithmName(str(request.get("algorithm", "A* Search")))
+        start, destination = resolveCity(self.engine.graph, start), resolveCity(self.engine.graph, destination)
+        key = (start, destination, algorithm)
+
+        result = self.cache.get(key)
+        if result is not None:
+            return dict(result, cached=True)
+        version = self.version
+        future = self.running.get((key, version))
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, self.search, start, destination, algorithm)
+            self.running[(key, version)] = future
+            try:
+                result = await future
+            finally:
+                del self.running[(key, version)]
+            # a search that started before an update may have run on the old graph
+            if "error" not in result and version == self.version:
+                self.cache.put(key, result)
+        else:
+            result = await asyncio.shield(future)
+        return dict(result, cached=False)
+
+    async def update(self, request):
+        if self.pooled:
+            raise ValueError("edge updates need the searches in the server process, start it without --workers")
+        if request["update"] not in ("add", "remove"):
+            raise ValueError(f"unknown update '{request['update']}', expected add or remove")
+        add = request["update"] == "add"
+        cityA, cityB = (resolveCity(self.engine.graph, tuple(city) if isinstance(city, list) else city.strip().lower()) for city in request["edge"])
+        startTime = time.perf_counter()
+        async with self.updateLock:
+            try:
+                updated, report = await asyncio.get_running_loop().run_in_executor(self.updater, updateEdge, self.engine.graph, cityA, cityB, add)
+            except KeyError as error:
+                raise ValueError(f"unknown city {error}")
+            # searches already running keep the graph they started on
+            self.engine.graph = updated
+            self.version += 1
+            stale = staleRoutes(self.cache.entries.items(), updated, cityA, cityB, add)
+            self.cache.discard(stale)
+        report.update(invalidatedRoutes=len(stale), cachedRoutes=len(self.cache.entries), seconds=time.perf_counter() - startTime)
+        return report
+
+    async def respond(self, line, writer):
+        startTime = time.perf_counter()
+        request = {}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                request = {}
+                raise ValueError("expected a JSON object")
+            if request.get("stats"):
+                response = self.stats()
+            elif "update" in request:
+                response = await self.update(request)
+            else:
+                response = await self.answer(request)
+                self.requests += 1
+        except KeyError as error:
+            response = {"error": f"missing field {error}"}
+        except (ValueError, AttributeError, TypeError) as error:
+            response = {"error": str(error)}
+        if "id" in request:
+            response["id"] = request["id"]
+        writer.write((json.dumps(response) + "\n").encode())
+        if "stats" not in request and "update" not in request:
+            self.latencies.append(time.perf_counter() - startTime)
+
+    # answers the requests of one connection, at most maxInFlight of them at a time
+    async def handle(self, reader, writer, maxInFlight=64):
+        slots = asyncio.Semaphore(maxInFlight)
+        tasks = set()
+
+        async def respond(line):
+            try:
+                await self.respond(line, writer)
+            finally:
+                slots.release()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                await slots.acquire()
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                if writer.transport.get_write_buffer_size() > 1 << 20:
+                    await writer.drain()
+            await asyncio.gather(*tasks)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def stats(self):
+        latencies = np.array(self.latencies) * 1000
+        return {
+            "requests": self.requests,
+            "p50Ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+            "p99Ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+            "cache": self.cache.stats()
+        }
+
+    def report(self):
+        stats = self.stats()
+        if stats["p50Ms"] is None:
+            return f"{stats['requests']} requests"
+        return f"{stats['requests']} requests, p50 {stats['p50Ms']:.3f} ms, p99 {stats['p99Ms']:.3f} ms, cache hit rate {stats['cache']['hitRate']:.1%}"
+
+async def serve(server, host, port, reportEvery=0):
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"Serving routes on {', '.join(str(s.getsockname()[:2]) for s in listener.sockets)}", flush=True)
+    async with listener:
+        if reportEvery:
+            while True:
+                await asyncio.sleep(reportEvery)
+                print(server.report(), flush=True)
+        await listener.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve route queries as JSON lines over TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--grid", type=int, default=0, help="serve an N x N jittered grid graph instead of the Kansas data")
+    parser.add_argument("--workers", type=int, default=0, help="search processes, 0 searches in one thread of the server")
+    parser.add_argument("--cache-size", type=int, default=10000, help="route results kept in the LRU cache, 0 disables it")
+    parser.add_argument("--report", type=float, default=0, help="print latency and cache stats every this many seconds")
+    args = parser.parse_args()
+
+    temporary = None
+    if args.grid:
+        graph = gridGraph(args.grid, args.grid, 0.3)
+        edgeWeights(graph)
+        temporary = tempfile.NamedTemporaryFile(suffix=".graph", delete=False)
+        temporary.close()
+        saveGraph(graph, temporary.name)
+        graphPath = temporary.name
+    else:
+        graph = cachedConnections("Adjacencies.txt", "coordinates.csv")
+        graphPath = cachePath("Adjacencies.txt")
+
+    executor = ProcessPoolExecutor(args.workers, initializer=initWorker, initargs=(graphPath,)) if args.workers else None
+    server = RouteServer(RouteEngine(graph), args.cache_size, executor, pooled=bool(args.workers))
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.report))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(server.report(), flush=True)
+        server.executor.shutdown()
+        server.updater.shutdown()
+        if temporary:
+            os.unlink(temporary.name)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import re
+import numpy as np
+
+# Uniform grid index over the coordinate array of a compact graph. Node ids are sorted by
+# the grid cell they fall in, so the nodes of a cell are one contiguous slice:
+#   graph.tables["spatialOrder"]       node ids ordered by cell
+#   graph.tables["spatialCellStarts"]  start of every cell's slice in spatialOrder
+#   graph.tables["spatialGrid"]        [origin lat, origin lon, cell size, rows, cols]
+# The arrays live in graph.tables, so they are cached with the graph like the other indexes.
+
+# Straight-line distance from every node to the goal at once, the same values distance()
+# gives per node. Returns None for coordinates that are not a numpy array (networkx graphs)
+def goalHeuristic(coordinates, goal):
+    if not isinstance(coordinates, np.ndarray):
+        return None
+    delta = coordinates[goal] - coordinates
+    return np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2)
+
+# Builds the grid index with about nodesPerCell nodes in an average cell
+def buildSpatialIndex(graph, nodesPerCell=2.0):
+    coordinates = graph.coordinates
+    valid = np.flatnonzero(np.isfinite(coordinates).all(axis=1))
+    low = coordinates[valid].min(axis=0) if len(valid) else np.zeros(2)
+    high = coordinates[valid].max(axis=0) if len(valid) else np.zeros(2)
+    extent = np.maximum(high - low, 1e-12)
+    # the second bound keeps the number of cells near the number of nodes when the points lie on a line
+    cellSize = max(float(np.sqrt(extent[0] * extent[1] * nodesPerCell / max(len(valid), 1))), float(extent.max()) * nodesPerCell / max(len(valid), 1))
+    rows, cols = (np.floor(extent / cellSize).astype(np.int64) + 1).tolist()
+
+    cells = cellOf(coordinates[valid], low, cellSize, rows, cols)
+    order = np.argsort(cells, kind="stable")
+    graph.tables["spatialOrder"] = valid[order].astype(np.int32)
+    graph.tables["spatialCellStarts"] = np.searchsorted(cells[order], np.arange(rows * cols + 1)).astype(np.int64)
+    graph.tables["spatialGrid"] = np.array([low[0], low[1], cellSize, rows, cols], dtype=np.float64)
+    return graph
+
+def cellOf(points, low, cellSize, rows, cols):
+    row = np.clip(np.floor((points[:, 0] - low[0]) / cellSize).astype(np.int64), 0, rows - 1)
+    col = np.clip(np.floor((points[:, 1] - low[1]) / cellSize).astype(np.int64), 0, cols - 1)
+    return row * cols + col
+
+# Returns the id of the node nearest to (lat, lon), or None for a graph without coordinates.
+# Cells are searched in growing square rings around the query cell until the ring is
+# farther away than the best node found so far
+def nearestNode(graph, lat, lon):
+    if "spatialOrder" not in graph.tables:
+        buildSpatialIndex(graph)
+    order, starts = graph.tables["spatialOrder"], graph.tables["spatialCellStarts"]
+    originLat, originLon, cellSize, rows, cols = graph.tables["spatialGrid"].tolist()
+    rows, cols = int(rows), int(cols)
+    if len(order) == 0:
+        return None
+
+    row = min(max(int(np.floor((lat - originLat) / cellSize)), 0), rows - 1)
+    col = min(max(int(np.floor((lon - originLon) / cellSize)), 0), cols - 1)
+    best, bestDistance = None, float("inf")
+    for ring in range(max(rows, cols)):
+        # everything in ring + 1 is at least ring whole cells away
+        if bestDistance <= (ring - 1) * cellSize:
+            break
+        candidates = []
+        for r in range(row - ring, row + ring + 1):
+            if not 0 <= r < rows:
+                continue
+            step = 1 if r in (row - ring, row + ring) else 2 * ring
+            for c in range(col - ring, col + ring + 1, max(step, 1)):
+                if 0 <= c < cols:
+                    cell = r * cols + c
+                    candidates.append(order[starts[cell]:starts[cell + 1]])
+        if not candidates:
+            continue
+        nodes = np.concatenate(candidates)
+        if len(nodes) == 0:
+            continue
+        delta = graph.coordinates[nodes] - (lat, lon)
+        distances = np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2)
+        i = int(np.argmin(distances))
+        if distances[i] < bestDistance:
+            best, bestDistance = int(nodes[i]), float(distances[i])
+    return best
+
+# a location typed as "lat, lon" instead of a city name
+locationPattern = re.compile(r"^\s*(-?\d+(?:\.\d*)?)\s*[, ]\s*(-?\d+(?:\.\d*)?)\s*$")
+
+# Turns user input into a city name, snapping "lat, lon" or a (lat, lon) pair to the nearest city
+def resolveCity(graph, location):
+    if isinstance(location, (tuple, list)):
+        lat, lon = location
+    else:
+        match = locationPattern.match(location)
+        if not match:
+            return location
+        lat, lon = float(match.group(1)), float(match.group(2))
+    node = nearestNode(graph, float(lat), float(lon))
+    return graph.cityName(node) if node is not None else None
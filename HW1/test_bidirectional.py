@@ -0,0 +1,36 @@
+import math
+import random
+from CompactGraph import chainGraph, geometricGraph, gridGraph
+from Main import aStarSearch, bfs, bidirectionalAStarSearch, bidirectionalBfs, runSearch
+
+graphs = [gridGraph(15, 15, 0.3, 3), geometricGraph(400, 8.0, 3), geometricGraph(400, 5.0, 4), chainGraph(30)]
+
+def randomPairs(graph, count, rng):
+    cities = list(graph.cities)
+    return [(rng.choice(cities), rng.choice(cities)) for _ in range(count)] + [(cities[0], cities[0])]
+
+# each step of a path is an edge of the graph
+def isRoute(graph, path):
+    return all(graph.nodeId(b) in graph.neighbors(graph.nodeId(a)) for a, b in zip(path, path[1:]))
+
+def test_bidirectional_astar_matches_astar():
+    rng = random.Random(0)
+    for graph in graphs:
+        for start, destination in randomPairs(graph, 100, rng):
+            _, aStarDistance, _ = runSearch(aStarSearch, "A* Search", graph, start, destination, None)
+            path, distance, _ = runSearch(bidirectionalAStarSearch, "Bidirectional A* Search", graph, start, destination, None)
+            assert (path is None) == (aStarDistance is None), (start, destination)
+            if path is not None:
+                assert path[0] == start and path[-1] == destination and isRoute(graph, path)
+                assert math.isclose(distance, aStarDistance, rel_tol=1e-9, abs_tol=1e-12), (start, destination)
+
+def test_bidirectional_bfs_matches_bfs():
+    rng = random.Random(1)
+    for graph in graphs:
+        for start, destination in randomPairs(graph, 100, rng):
+            bfsPath, _, _ = runSearch(bfs, "Breadth-First Search", graph, start, destination, None)
+            path, _, _ = runSearch(bidirectionalBfs, "Bidirectional BFS", graph, start, destination, None)
+            assert (path is None) == (bfsPath is None), (start, destination)
+            if path is not None:
+                assert path[0] == start and path[-1] == destination and isRoute(graph, path)
+                assert len(path) == len(bfsPath), (start, destination)
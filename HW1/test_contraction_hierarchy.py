@@ -0,0 +1,34 @@
+import math
+import random
+from CompactGraph import geometricGraph, gridGraph
+from ContractionHierarchy import buildHierarchy
+from Main import aStarSearch, algorithms, contractionHierarchySearch, runSearch, totalDistance
+
+graphs = [gridGraph(15, 15, 0.3, 3), geometricGraph(600, 6.0, 3), geometricGraph(400, 3.0, 4)]
+
+# each step of a path is an edge of the graph
+def isRoute(graph, path):
+    return all(b in graph.neighbors(a) for a, b in zip(path, path[1:]))
+
+def test_hierarchy_matches_astar():
+    rng = random.Random(0)
+    for graph in graphs:
+        buildHierarchy(graph)
+        pairs = [(rng.randrange(len(graph)), rng.randrange(len(graph))) for _ in range(150)] + [(0, 0)]
+        for start, goal in pairs:
+            _, aStarDistance, _ = runSearch(aStarSearch, "A* Search", graph, graph.cityName(start), graph.cityName(goal), None)
+            path, _ = contractionHierarchySearch(graph, start, goal, graph.coordinates)
+            assert (path is None) == (aStarDistance is None), (start, goal)
+            if path is not None:
+                assert path[0] == start and path[-1] == goal and isRoute(graph, path)
+                assert math.isclose(totalDistance(path, graph.coordinates), aStarDistance, rel_tol=1e-9, abs_tol=1e-12), (start, goal)
+
+# the menu search answers with A* until the graph has a hierarchy
+def test_menu_search():
+    assert ("Contraction Hierarchy", contractionHierarchySearch) in algorithms.values()
+    graph = gridGraph(8, 8, 0.3, 1)
+    before = runSearch(contractionHierarchySearch, "Contraction Hierarchy", graph, "0_0", "7_7", None)[:2]
+    assert before == runSearch(aStarSearch, "A* Search", graph, "0_0", "7_7", None)[:2]
+    buildHierarchy(graph)
+    path, distance, _ = runSearch(contractionHierarchySearch, "Contraction Hierarchy", graph, "0_0", "7_7", None)
+    assert path[0] == "0_0" and path[-1] == "7_7" and math.isclose(distance, before[1], rel_tol=1e-9)
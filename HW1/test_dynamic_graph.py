@@ -0,0 +1,93 @@
+import math
+import random
+from AllPairs import addAllPairs
+from CompactGraph import compactFromEdges, edgeWeights, gridGraph
+from DynamicGraph import hopOptimal, staleRoutes, updateEdge
+from Landmarks import addLandmarks
+from Main import aStarLandmarkSearch, aStarSearch, algorithms, allPairsSearch, runSearch
+
+# a cycle of n cities around a circle of the given radius, with city 1 right next to city 0
+def ringGraph(n, radius):
+    angles = [0.0, 1e-6] + [2 * math.pi * i / n for i in range(2, n)]
+    coordinates = {str(i): (radius * math.cos(angle), radius * math.sin(angle)) for i, angle in enumerate(angles)}
+    return compactFromEdges([(str(i), str((i + 1) % n)) for i in range(n)], coordinates)
+
+def withTables(graph, landmarks=0):
+    edgeWeights(graph)
+    if landmarks:
+        addLandmarks(graph, landmarks)
+    addAllPairs(graph)
+    return graph
+
+def usesEdge(path, edge):
+    return any({a, b} == set(edge) for a, b in zip(path, path[1:]))
+
+# every lookup is a route of the A* distance that does not use a removed edge
+def checkLookups(graph, removed, queries, rng):
+    cities = list(graph.cities)
+    for _ in range(queries):
+        start, destination = rng.choice(cities), rng.choice(cities)
+        path, lookupDistance, _ = runSearch(allPairsSearch, "All-Pairs Lookup", graph, start, destination, None)
+        _, aStarDistance, _ = runSearch(aStarSearch, "A* Search", graph, start, destination, None)
+        _, landmarkDistance, _ = runSearch(aStarLandmarkSearch, "ALT A* Search", graph, start, destination, None)
+        assert (path is None) == (aStarDistance is None), (start, destination)
+        if path is None:
+            continue
+        assert path[0] == start and path[-1] == destination
+        assert not any(usesEdge(path, edge) for edge in removed), (start, destination, path)
+        assert math.isclose(lookupDistance, aStarDistance, rel_tol=1e-9), (start, destination)
+        assert math.isclose(landmarkDistance, aStarDistance, rel_tol=1e-9), (start, destination)
+
+# float32 distances far larger than the removed edge, where rounding hides which rows used it
+def test_removal_on_long_ring():
+    graph = withTables(ringGraph(400, 1e4))
+    graph, report = updateEdge(graph, "0", "1", add=False)
+    assert report["allPairsRows"] >= len(graph) - 1
+    checkLookups(graph, [("0", "1")], 300, random.Random(0))
+
+def test_random_updates_on_grid():
+    rng = random.Random(1)
+    graph = withTables(gridGraph(12, 12, 0.3, 1), landmarks=6)
+    edges = [(graph.cityName(a), graph.cityName(b)) for a in range(len(graph)) for b in graph.neighbors(a) if a < b]
+    removed = []
+    for _ in range(30):
+        if removed and rng.random() < 0.4:
+            edge = removed.pop(rng.randrange(len(removed)))
+            graph, _ = updateEdge(graph, *edge, add=True)
+            edges.append(edge)
+        else:
+            edge = edges.pop(rng.randrange(len(edges)))
+            graph, _ = updateEdge(graph, *edge, add=False)
+            removed.append(edge)
+        checkLookups(graph, removed, 40, rng)
+
+# after an update every cached route is either stale or what a fresh search returns
+def test_stale_routes_match_fresh_searches():
+    rng = random.Random(2)
+    graph = withTables(gridGraph(8, 8, 0.3, 2), landmarks=4)
+    cities = list(graph.cities)
+    pairs = [(rng.choice(cities), rng.choice(cities)) for _ in range(40)]
+    edges = [(graph.cityName(a), graph.cityName(b)) for a in range(len(graph)) for b in graph.neighbors(a) if a < b]
+    removed = []
+    for _ in range(20):
+        cache = {}
+        for name, function in algorithms.values():
+            for start, destination in pairs:
+                path, routeDistance, _ = runSearch(function, name, graph, start, destination, None)
+                cache[(start, destination, name)] = {"path": path, "distance": routeDistance}
+        if removed and rng.random() < 0.5:
+            edge, add = removed.pop(rng.randrange(len(removed))), True
+            edges.append(edge)
+        else:
+            edge, add = edges.pop(rng.randrange(len(edges))), False
+            removed.append(edge)
+        graph, _ = updateEdge(graph, *edge, add=add)
+        stale = set(staleRoutes(cache.items(), graph, *edge, add))
+        functions = dict(algorithms.values())
+        for (start, destination, name), result in cache.items():
+            if (start, destination, name) in stale:
+                continue
+            path, routeDistance, _ = runSearch(functions[name], name, graph, start, destination, None)
+            assert (path is None) == (result["path"] is None), (start, destination, name)
+            if path is not None:
+                assert len(path) == len(result["path"]) if name in hopOptimal else math.isclose(routeDistance, result["distance"], rel_tol=1e-9), (start, destination, name)
@@ -0,0 +1,24 @@
+import math
+import random
+import warnings
+from CompactGraph import geometricGraph, gridGraph
+from Landmarks import addLandmarks
+from Main import aStarLandmarkSearch, aStarSearch, runSearch
+
+# a sparse geometric graph falls apart into many components, so most landmarks reach
+# neither end of a query
+graphs = [addLandmarks(geometricGraph(500, 2.5, 5), 8), addLandmarks(gridGraph(12, 12, 0.3, 2), 4)]
+
+def test_landmark_search_matches_astar_without_warnings():
+    rng = random.Random(0)
+    for graph in graphs:
+        cities = list(graph.cities)
+        for _ in range(150):
+            start, destination = rng.choice(cities), rng.choice(cities)
+            _, aStarDistance, _ = runSearch(aStarSearch, "A* Search", graph, start, destination, None)
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                path, distance, _ = runSearch(aStarLandmarkSearch, "ALT A* Search", graph, start, destination, None)
+            assert (path is None) == (aStarDistance is None), (start, destination)
+            if path is not None:
+                assert math.isclose(distance, aStarDistance, rel_tol=1e-9, abs_tol=1e-12), (start, destination)
@@ -0,0 +1,15 @@
+import random
+from BenchPathReconstruction import pathCopyAStarSearch, pathCopyBestFirstSearch
+from CompactGraph import geometricGraph, gridGraph
+from Main import aStarSearch, bestFirstSearch
+
+# unjittered grids are full of exact ties in the heuristic and in f
+graphs = [gridGraph(25, 25), gridGraph(20, 20, 0.2, 1), geometricGraph(400, 4.0, 2)]
+
+def test_parent_pointers_pop_the_path_copying_routes():
+    rng = random.Random(1)
+    for graph in graphs:
+        for _ in range(80):
+            start, goal = rng.randrange(len(graph)), rng.randrange(len(graph))
+            assert bestFirstSearch(graph, start, goal, graph.coordinates)[0] == pathCopyBestFirstSearch(graph, start, goal, graph.coordinates)[0], (start, goal)
+            assert aStarSearch(graph, start, goal, graph.coordinates)[0] == pathCopyAStarSearch(graph, start, goal, graph.coordinates)[0], (start, goal)
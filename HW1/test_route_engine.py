@@ -0,0 +1,59 @@
+import io
+import json
+import pytest
+from CompactGraph import edgeWeights, gridGraph
+from GraphCache import saveGraph
+from ParallelSearch import SearchPool
+from RouteEngine import RouteEngine, readQueries, runBatch
+
+lines = [
+    "0_0 2_2",
+    "not_a_pair",
+    '{"start": "0_0"}',
+    "# comments and blank lines are not queries",
+    "",
+    '{"start": 5, "destination": "1_1"}',
+    "{not json",
+    '{"start": "2_2", "destination": [0.1, 0.2]}',
+    "0_0 nowhere",
+]
+
+def answers(algorithm):
+    output = io.StringIO()
+    runBatch(RouteEngine(gridGraph(3, 3)), io.StringIO("\n".join(lines) + "\n"), output, algorithm)
+    return {result["id"]: result for result in map(json.loads, output.getvalue().splitlines())}
+
+# a malformed line is answered with an error in its place, the queries around it still are
+@pytest.mark.parametrize("algorithm", ["dijkstra", "bfs", "A* Search", "Depth-First Search"])
+def test_malformed_lines_do_not_stop_the_batch(algorithm):
+    results = answers(algorithm)
+    assert sorted(results) == list(range(7))
+    assert [id for id, result in results.items() if "error" in result] == [1, 2, 3, 4, 6]
+    assert all(result["error"].startswith("invalid query") for id, result in results.items() if id in (1, 2, 3, 4))
+    assert results[0]["path"][0] == "0_0" and results[0]["path"][-1] == "2_2"
+    assert results[5]["path"][0] == "2_2" and results[5]["path"][-1] == "0_0"
+    assert results[6]["error"] == "unknown city 'nowhere'"
+
+def test_unknown_algorithm():
+    engine = RouteEngine(gridGraph(3, 3))
+    assert engine.route("0_0", "1_1", "foo")["error"] == "unknown algorithm 'foo'"
+    with pytest.raises(ValueError):
+        engine.batch([("0_0", "1_1")], "foo")
+
+# the worker pool answers the same lines like the engine, errors included
+@pytest.mark.parametrize("algorithm", ["dijkstra", "A* Search"])
+def test_pool_matches_engine(tmp_path, algorithm):
+    graph = gridGraph(3, 3)
+    edgeWeights(graph)
+    path = str(tmp_path / "grid.graph")
+    saveGraph(graph, path)
+    with SearchPool(path, 1) as pool:
+        with pytest.raises(ValueError):
+            pool.batch([("0_0", "1_1")], "foo")
+        results = {result["id"]: result for result in pool.batch(readQueries(io.StringIO("\n".join(lines) + "\n")), algorithm)}
+    expected = answers(algorithm)
+    assert sorted(results) == sorted(expected)
+    for id, result in results.items():
+        result.pop("runtime", None)
+        expected[id].pop("runtime", None)
+        assert result == expected[id]
@@ -0,0 +1,71 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import GeneticAlgorithm
+from BranchAndBound import branch_and_bound
+from Problem import generate_problem
+
+# Compares solution quality against time for branch_and_bound() and genetic_algorithm().
+# Both report their best fitness as they go; the table shows the best fitness each had
+# reached at every time budget, and the upper bound shows how far from optimal they can be
+
+def best_at(history, seconds):
+    values = [value for at, value in history if at <= seconds]
+    return max(values) if values else None
+
+def ga_history(population, generations, seed):
+    # (seconds, best fitness) after every generation, from the metrics stream
+    metrics = tempfile.NamedTemporaryFile(suffix=".jsonl", delete=False)
+    metrics.close()
+    random.seed(seed)
+    start = time.perf_counter()
+    schedule, _ = GeneticAlgorithm.genetic_algorithm(population, generations, metrics_path=metrics.name)
+    total = time.perf_counter() - start
+    with open(metrics.name) as file:
+        records = [json.loads(line) for line in file]
+    os.unlink(metrics.name)
+    # spread the measured run time over the generations by their own evaluation speed
+    spent = [population / record["evaluations_per_second"] for record in records]
+    scale = total / sum(spent)
+    history, elapsed = [], 0.0
+    for record, seconds in zip(records, spent):
+        elapsed += seconds * scale
+        history.append((elapsed, record["best_fitness"]))
+    return history, schedule
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare branch and bound with the genetic algorithm on quality over time")
+    parser.add_argument("--budgets", default="0.1,0.5,1,5,10,30", help="comma separated seconds")
+    parser.add_argument("--population", type=int, default=500)
+    parser.add_argument("--generations", type=int, default=300)
+    parser.add_argument("--width", type=int, default=None, help="values tried per activity in branch and bound")
+    parser.add_argument("--activities", type=int, default=0, help="use a synthetic instance with this many activities")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.activities:
+        GeneticAlgorithm.use_problem(generate_problem(args.activities, seed=args.seed))
+    tables = GeneticAlgorithm.fitness_tables
+    budgets = [float(budget) for budget in args.budgets.split(",")]
+
+    bb = branch_and_bound(tables, max(budgets), width=args.width)
+    ga, ga_schedule = ga_history(args.population, args.generations, args.seed)
+    # the GA result as the first incumbent lets branch and bound prune from the start
+    seeded = branch_and_bound(tables, max(budgets), initial=ga_schedule, width=args.width)
+    offset = ga[-1][0]
+
+    rows = {
+        "branch and bound": [(at, value) for at, value, _ in bb["history"]],
+        "genetic algorithm": ga,
+        "GA, then B&B": ga + [(offset + at, value) for at, value, _ in seeded["history"]]
+    }
+    print(f"upper bound {bb['bound']:.2f}; branch and bound {'proved its result optimal' if bb['finished'] and args.width is None else 'stopped at the budget'} after {bb['nodes']} nodes")
+    print(f"{'best fitness after':<20} " + " ".join(f"{budget:>8g}s" for budget in budgets))
+    for name, history in rows.items():
+        values = [best_at(history, budget) for budget in budgets]
+        print(f"{name:<20} " + " ".join(f"{value:>9.2f}" if value is not None else f"{'-':>9}" for value in values))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import GeneticAlgorithm
+from Problem import generate_problem
+
+# Runs genetic_algorithm() with and without the fitness cache on the same seed. The cache
+# returns the same values, so both runs follow the same trajectory and differ only in time.
+# Reports the evaluations the cache avoided in every block of generations
+
+def run(args, cache_size):
+    metrics = tempfile.NamedTemporaryFile(suffix=".jsonl", delete=False)
+    metrics.close()
+    random.seed(args.seed)
+    start = time.perf_counter()
+    _, best = GeneticAlgorithm.genetic_algorithm(args.population, args.generations, metrics_path=metrics.name, cache_size=cache_size)
+    elapsed = time.perf_counter() - start
+    with open(metrics.name) as file:
+        records = [json.loads(line) for line in file]
+    os.unlink(metrics.name)
+    return best, elapsed, records
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the LRU fitness cache in genetic_algorithm()")
+    parser.add_argument("--population", type=int, default=500)
+    parser.add_argument("--generations", type=int, default=200)
+    parser.add_argument("--cache-size", type=int, default=100000)
+    parser.add_argument("--activities", type=int, default=0, help="use a synthetic instance with this many activities")
+    parser.add_argument("--block", type=int, default=20, help="generations per line of the report")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.activities:
+        GeneticAlgorithm.use_problem(generate_problem(args.activities, seed=args.seed))
+
+    best, plain_time, _ = run(args, 0)
+    cached_best, cached_time, records = run(args, args.cache_size)
+    assert best == cached_best
+
+    print(f"{len(records)} generations of {args.population}: {plain_time:.2f}s without cache, {cached_time:.2f}s with cache ({plain_time / cached_time:.2f}x)")
+    print(f"{'generations':>12} {'evaluated':>10} {'avoided':>10} {'avoided %':>10}")
+    for first in range(0, len(records), args.block):
+        block = records[first:first + args.block]
+        hits = sum(record["cache"]["hits"] for record in block)
+        misses = sum(record["cache"]["misses"] for record in block)
+        print(f"{block[0]['generation']:>5}-{block[-1]['generation']:<6} {misses:>10} {hits:>10} {hits / max(hits + misses, 1):>10.1%}")
+
+if __name__ == "__main__":
+    main()
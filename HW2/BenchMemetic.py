@@ -0,0 +1,54 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import GeneticAlgorithm
+from Problem import generate_problem
+
+# Runs genetic_algorithm() on a synthetic instance with and without the memetic stage and
+# reports the best fitness over generations and wall time, plus the generation at which each
+# run first matched the final best fitness of the plain GA
+
+def run(args, **options):
+    metrics = tempfile.NamedTemporaryFile(suffix=".jsonl", delete=False)
+    metrics.close()
+    random.seed(args.seed)
+    start = time.perf_counter()
+    GeneticAlgorithm.genetic_algorithm(args.population, args.generations, metrics_path=metrics.name, **options)
+    elapsed = time.perf_counter() - start
+    with open(metrics.name) as file:
+        records = [json.loads(line) for line in file]
+    os.unlink(metrics.name)
+    return elapsed, records
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the memetic local search stage of the GA")
+    parser.add_argument("--activities", type=int, default=500)
+    parser.add_argument("--population", type=int, default=100)
+    parser.add_argument("--generations", type=int, default=60)
+    parser.add_argument("--fraction", type=float, default=0.1)
+    parser.add_argument("--moves", type=int, default=20)
+    parser.add_argument("--tabu", type=int, default=5)
+    parser.add_argument("--every", type=int, default=10, help="generations between report columns")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    GeneticAlgorithm.use_problem(generate_problem(args.activities, seed=args.seed))
+
+    runs = {
+        "plain GA": run(args),
+        "greedy memetic": run(args, memetic_fraction=args.fraction, memetic_moves=args.moves),
+        "tabu memetic": run(args, memetic_fraction=args.fraction, memetic_moves=args.moves, tabu_tenure=args.tabu)
+    }
+    target = runs["plain GA"][1][-1]["best_fitness"]
+    columns = list(range(0, args.generations, args.every))
+    print(f"{args.activities} activities, population {args.population}; best fitness after generation")
+    print(f"{'':<16} " + " ".join(f"{g:>9}" for g in columns) + f" {'seconds':>9} {'reached plain best at':>22}")
+    for name, (elapsed, records) in runs.items():
+        best = [records[g]["best_fitness"] if g < len(records) else records[-1]["best_fitness"] for g in columns]
+        reached = next((record["generation"] for record in records if record["best_fitness"] >= target), None)
+        print(f"{name:<16} " + " ".join(f"{value:>9.1f}" for value in best) + f" {elapsed:>9.1f} {'-' if reached is None else reached:>22}")
+
+if __name__ == "__main__":
+    main()
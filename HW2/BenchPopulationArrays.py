@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import numpy as np
+import GeneticAlgorithm
+from PopulationArrays import evolve_arrays
+from Problem import generate_problem
+
+# Compares the previous list-based generational loop with the preallocated array
+# population, both in genetic_algorithm() and in the bare evolve_arrays() loop: wall time
+# per generation for a fixed number of generations, and the number of evaluations needed
+# to reach a target fitness, averaged over several seeds
+
+# previous generation step on lists of schedules: selection, crossover() and mutate() on
+# every pair, then one batched fitness pass
+def list_generation(schedules, fitnesses, mutation_rate):
+    children = []
+    for p1, p2 in GeneticAlgorithm.selection(schedules, fitnesses, (len(schedules) + 1) // 2):
+        for child in GeneticAlgorithm.crossover(p1, p2):
+            GeneticAlgorithm.mutate(child, mutation_rate)
+            children.append(child)
+    children = children[:len(schedules)]
+    return children, GeneticAlgorithm.population_fitness(children)
+
+def list_run(population, generations, target, seed):
+    # the list loop with the mutation schedule of genetic_algorithm()
+    random.seed(seed)
+    start = time.perf_counter()
+    schedules = [GeneticAlgorithm.random_schedule() for _ in range(population)]
+    fitnesses = GeneticAlgorithm.population_fitness(schedules)
+    mutation_rate, best_fitness_so_far = 0.01, max(fitnesses)
+    evaluations, reached = population, None
+    for _ in range(generations):
+        schedules, fitnesses = list_generation(schedules, fitnesses, mutation_rate)
+        evaluations += population
+        if max(fitnesses) > best_fitness_so_far:
+            mutation_rate /= 2.0
+            best_fitness_so_far = max(fitnesses)
+        if reached is None and target is not None and best_fitness_so_far >= target:
+            reached = evaluations
+    return (time.perf_counter() - start) / max(generations, 1), reached
+
+def ga_run(population, generations, target, seed, elitism):
+    # genetic_algorithm() reports progress through its metrics stream
+    metrics = tempfile.NamedTemporaryFile(suffix=".jsonl", delete=False)
+    metrics.close()
+    random.seed(seed)
+    start = time.perf_counter()
+    GeneticAlgorithm.genetic_algorithm(population, generations, metrics_path=metrics.name, elitism=elitism)
+    elapsed = time.perf_counter() - start
+    with open(metrics.name) as file:
+        records = [json.loads(line) for line in file]
+    os.unlink(metrics.name)
+    reached = next((population + (population - elitism) * (record["generation"] + 1) for record in records if target is not None and record["best_fitness"] >= target), None)
+    return elapsed / max(len(records), 1), reached
+
+def array_run(population, generations, target, seed, **options):
+    timed = evolve_arrays(GeneticAlgorithm.fitness_tables, population, generations, seed=seed, **options)
+    targeted = evolve_arrays(GeneticAlgorithm.fitness_tables, population, generations, target_fitness=target, seed=seed, **options)
+    return timed["seconds"] / max(timed["generations"], 1), targeted["evaluations_to_target"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the array population against the list-based generational loop")
+    parser.add_argument("--population", type=int, default=500)
+    parser.add_argument("--generations", type=int, default=100)
+    parser.add_argument("--target", type=float, default=10.0)
+    parser.add_argument("--seeds", type=int, default=5)
+    parser.add_argument("--elitism", type=int, default=2)
+    parser.add_argument("--batch", type=int, default=50, help="offspring per steady-state step")
+    parser.add_argument("--activities", type=int, default=0, help="use a synthetic instance with this many activities")
+    args = parser.parse_args()
+    if args.activities:
+        GeneticAlgorithm.use_problem(generate_problem(args.activities))
+
+    runs = {
+        "lists": lambda seed: list_run(args.population, args.generations, args.target, seed),
+        f"genetic_algorithm, el. {args.elitism}": lambda seed: ga_run(args.population, args.generations, args.target, seed, args.elitism),
+        "arrays, no elitism": lambda seed: array_run(args.population, args.generations, args.target, seed, elitism=0),
+        f"arrays, elitism {args.elitism}": lambda seed: array_run(args.population, args.generations, args.target, seed, elitism=args.elitism),
+        f"arrays, steady state {args.batch}": lambda seed: array_run(args.population, args.generations, args.target, seed, steady_state=args.batch)
+    }
+    print(f"population {args.population}, target fitness {args.target}, {args.seeds} seeds")
+    print(f"{'':<26} {'ms/generation':>14} {'reached':>8} {'mean evaluations to target':>27}")
+    for name, run in runs.items():
+        results = [run(seed) for seed in range(args.seeds)]
+        reached = [evaluations for _, evaluations in results if evaluations is not None]
+        mean = f"{np.mean(reached):.0f}" if reached else "-"
+        print(f"{name:<26} {np.mean([seconds for seconds, _ in results]) * 1000:>14.2f} {len(reached):>5}/{args.seeds} {mean:>27}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import random
+import time
+import numpy as np
+from scipy.special import softmax
+from Selection import selection_methods
+
+# Compares the old per-pair roulette selection, which rebuilt the softmax CDF and scanned it
+# for every parent, against drawing a whole generation's parents in one pass with each
+# selection method, for growing population sizes
+
+def legacy_selection(population, fitnesses):
+    # selection() as it was before parents were drawn per generation
+    probs = softmax(fitnesses)
+    cdf = []
+    current_sum = 0.0
+    for p in probs:
+        current_sum += p
+        cdf.append(current_sum)
+
+    def pick_one():
+        rand = random.random()
+        for i, val in enumerate(cdf):
+            if rand <= val:
+                return population[i]
+        return population[-1]
+
+    return pick_one(), pick_one()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parent selection for one generation")
+    parser.add_argument("--sizes", default="500,1000,5000,10000,50000,100000")
+    parser.add_argument("--legacy-limit", type=int, default=5000, help="largest population to time the old selection on, it grows quadratically")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    random.seed(args.seed)
+    print(f"{'population':>10} {'legacy':>12} " + " ".join(f"{name:>12}" for name in selection_methods))
+    for size in map(int, args.sizes.split(",")):
+        fitnesses = rng.normal(0.0, 3.0, size)
+        population = list(range(size))
+        pairs = (size + 1) // 2
+        row = []
+
+        if size <= args.legacy_limit:
+            values = fitnesses.tolist()
+            start = time.perf_counter()
+            for _ in range(pairs):
+                legacy_selection(population, values)
+            row.append(f"{(time.perf_counter() - start) * 1000:>9.2f} ms")
+        else:
+            row.append(f"{'skipped':>12}")
+
+        for method in selection_methods.values():
+            start = time.perf_counter()
+            method(fitnesses, 2 * pairs, rng)
+            row.append(f"{(time.perf_counter() - start) * 1000:>9.2f} ms")
+        print(f"{size:>10} " + " ".join(row))
+
+if __name__ == "__main__":
+    main()
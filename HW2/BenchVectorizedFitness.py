@@ -0,0 +1,66 @@
+import argparse
+import random
+import time
+from GeneticAlgorithm import crossover, fitness, fitness_tables, mutate, population_fitness, random_schedule, selection
+from VectorizedFitness import batch_fitness
+
+# Compares scoring with the scalar fitness() against the batched numpy evaluation,
+# both for a single population and for whole generations of genetic_algorithm()
+
+def scalar_population_fitness(population):
+    return [fitness(sch) for sch in population]
+
+def next_generation(population, fitnesses, mutation_rate, evaluate):
+    # One generation of genetic_algorithm(), scored with the given evaluation function
+    new_population = []
+    for p1, p2 in selection(population, fitnesses, (len(population) + 1) // 2):
+        c1, c2 = crossover(p1, p2)
+        mutate(c1, mutation_rate)
+        mutate(c2, mutation_rate)
+        new_population.append(c1)
+        if len(new_population) < len(population):
+            new_population.append(c2)
+    return new_population, evaluate(new_population)
+
+def best_time(function, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scalar against batched fitness evaluation")
+    parser.add_argument("--population", type=int, default=500)
+    parser.add_argument("--generations", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    population = [random_schedule() for _ in range(args.population)]
+    encoded = fitness_tables.encode_population(population)
+    assert population_fitness(population) == scalar_population_fitness(population)
+
+    scalar = best_time(lambda: scalar_population_fitness(population), args.repeats)
+    batched = best_time(lambda: population_fitness(population), args.repeats)
+    preencoded = best_time(lambda: batch_fitness(fitness_tables, encoded), args.repeats)
+    print(f"Scoring {args.population} schedules")
+    print(f"  scalar fitness()          {scalar * 1000:>9.2f} ms")
+    print(f"  batched incl. encoding    {batched * 1000:>9.2f} ms  ({scalar / batched:.1f}x)")
+    print(f"  batched, already encoded  {preencoded * 1000:>9.2f} ms  ({scalar / preencoded:.1f}x)")
+
+    print(f"Running {args.generations} generations")
+    for name, evaluate in (("scalar", scalar_population_fitness), ("batched", population_fitness)):
+        random.seed(args.seed)
+        generation = [random_schedule() for _ in range(args.population)]
+        fitnesses = evaluate(generation)
+        start = time.perf_counter()
+        for _ in range(args.generations):
+            generation, fitnesses = next_generation(generation, fitnesses, 0.01, evaluate)
+        elapsed = (time.perf_counter() - start) / args.generations
+        print(f"  {name:<8} {elapsed * 1000:>9.2f} ms per generation, best fitness {max(fitnesses):.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import random
+import numpy as np
+from PopulationArrays import evolve_arrays
+from Problem import compile_problem, generate_problem
+from WarmStart import affected_activities, apply_changes, current_problem, read_schedule, reoptimize
+
+# Compares re-optimizing a schedule after a change with WarmStart against two cold starts on
+# the changed problem: the array GA from random schedules, and WarmStart's own repair and
+# evolution with every activity affected, which repairs a random schedule. The old schedule
+# is best_schedule.txt for the built-in instance, or the result of such a cold repair run on a
+# synthetic one. The change closes rooms the old schedule uses and removes facilitators. All
+# runs first go to the end, then run again until they reach the lower final fitness of the
+# warm start and the cold repair, the time to equal fitness.
+
+def random_changes(problem, schedule, rooms, facilitators, rng):
+    used_rooms = sorted({room for _, room, _ in schedule.values()})
+    return {
+        "remove_rooms": rng.sample(used_rooms, min(rooms, len(used_rooms) - 1)),
+        "remove_facilitators": rng.sample(problem["facilitators"], min(facilitators, len(problem["facilitators"]) - 1))
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark warm-start re-optimization against a cold start")
+    parser.add_argument("--activities", type=int, default=0, help="synthetic instance size, 0 uses the built-in instance and best_schedule.txt")
+    parser.add_argument("--population", type=int, default=100)
+    parser.add_argument("--generations", type=int, default=300, help="generations of the cold start, and of the run making the old schedule")
+    parser.add_argument("--close-rooms", type=int, default=2)
+    parser.add_argument("--remove-facilitators", type=int, default=2)
+    parser.add_argument("--max-drift", type=int, default=None)
+    parser.add_argument("--selection", default="tournament")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.activities:
+        old_problem = generate_problem(args.activities, seed=args.seed)
+        old_tables = compile_problem(old_problem)
+        activities = len(old_tables.activities_list)
+        old = reoptimize(old_tables, np.full((activities, 3), -1), np.ones(activities, dtype=bool), args.population, args.generations,
+                         selection_method=args.selection, seed=args.seed + 1)
+        schedule = dict(zip(old_tables.activities_list, old["schedule"]))
+        print(f"old schedule: fitness {old['fitness']:.3f} after {old['seconds']:.1f}s")
+    else:
+        old_problem = current_problem()
+        schedule = read_schedule("best_schedule.txt")
+
+    changes = random_changes(old_problem, schedule, args.close_rooms, args.remove_facilitators, random.Random(args.seed))
+    problem = apply_changes(old_problem, changes)
+    tables = compile_problem(problem)
+    old_genes, affected = affected_activities(old_problem, problem, tables, schedule)
+    print(f"closed {', '.join(changes['remove_rooms'])}; removed {', '.join(changes['remove_facilitators'])}; "
+          f"{int(affected.sum())} of {len(tables.activities_list)} activities affected")
+
+    def warm(target=None):
+        return reoptimize(tables, old_genes, affected, args.population, args.generations, args.max_drift,
+                          selection_method=args.selection, target_fitness=target, seed=args.seed)
+
+    def cold_repair(target=None):
+        result = reoptimize(tables, np.full(old_genes.shape, -1), np.ones(len(affected), dtype=bool), args.population, args.generations,
+                            selection_method=args.selection, target_fitness=target, seed=args.seed)
+        return moved(result)
+
+    def cold_ga(target=None):
+        return moved(evolve_arrays(tables, args.population, args.generations, selection_method=args.selection, elitism=2, target_fitness=target, seed=args.seed))
+
+    def moved(result):
+        # activities the change did not affect that are no longer where the old schedule had them
+        genes = tables.encode_schedule(result["schedule"])
+        result["drift"] = int(((genes != old_genes).any(axis=1) & ~affected).sum())
+        return result
+
+    starts = {"warm start": warm, "cold repair": cold_repair, "cold GA": cold_ga}
+    runs = {name: start() for name, start in starts.items()}
+    target = min(runs["warm start"]["fitness"], runs["cold repair"]["fitness"])
+    timed = {name: start(target) for name, start in starts.items()}
+    print(f"\n{'':<12}{'fitness':>9}{'seconds':>9}{'evaluations':>13}{'moved':>7}   to reach {target:.3f}")
+    for name, result in runs.items():
+        seconds = timed[name]["seconds_to_target"]
+        evaluations = timed[name]["evaluations_to_target"]
+        reached = f"{seconds:.3f}s, {evaluations} evaluations" if seconds is not None else "not reached"
+        print(f"{name:<12}{result['fitness']:>9.3f}{result['seconds']:>9.2f}{result['evaluations']:>13}{result['drift']:>7}   {reached}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import time
+import numpy as np
+from VectorizedFitness import TIME, ROOM, FACILITATOR, batch_fitness
+
+# Exact search for the schedule with the best fitness. Activities are assigned one at a
+# time in depth first order, and a node is cut off when an upper bound on the fitness of
+# every completion is not better than the best schedule found so far.
+#
+# The bound splits fitness like IncrementalFitness: per-activity room and facilitator
+# scores, terms of groups sharing a (time, room), a (facilitator, time) or a facilitator,
+# and the pair rules. Group counts only grow while activities are added, so for the
+# activities already placed a group term is bounded by its value now (facilitator load by
+# the best value any larger count can still reach), and every activity still to place adds
+# at most the best single step any larger count allows. An unplaced activity can then be
+# bounded on its own, and its bound separates per time slot into a room part and a
+# facilitator part. The same numbers prune the values of the activity being branched on:
+# a (time, room, facilitator) whose bound cannot beat the incumbent is never tried.
+
+def overlap_value(count):
+    return np.where(count > 1, -0.5 * count, 0.0)
+
+def overlap_step(count):
+    # best change a further activity can cause in a (time, room) group of count
+    return np.where(count == 0, 0.0, -0.5)
+
+def slot_value(count):
+    return np.where(count == 0, 0.0, np.where(count == 1, 0.2, -0.2 * count))
+
+def slot_step(count):
+    return np.where(count == 0, 0.2, -0.2)
+
+def load_bound(count):
+    # best facilitator load value any count >= count can reach
+    return np.where(count > 4, -0.5 * count, 0.0)
+
+def load_step(count):
+    return np.where(count < 4, 0.0, -0.5)
+
+class ScheduleSearch:
+    def __init__(self, tables):
+        self.tables = tables
+        self.sizes = (len(tables.time_names), len(tables.room_names), len(tables.facilitators))
+        activities = len(tables.activities_list)
+        self.genes = np.full((activities, 3), -1, dtype=np.int64)
+        self.room_count = np.zeros((self.sizes[TIME], self.sizes[ROOM]), dtype=np.int64)
+        self.slot_count = np.zeros((self.sizes[FACILITATOR], self.sizes[TIME]), dtype=np.int64)
+        self.load = np.zeros(self.sizes[FACILITATOR], dtype=np.int64)
+        self.static = 0.0
+
+        self.pairs = [("spread", int(a), int(b)) for a, b in tables.spread_pairs] + [("sequence", int(a), int(b)) for a, b in tables.sequence_pairs]
+        self.pairs_of = [[] for _ in range(activities)]
+        for pair in self.pairs:
+            self.pairs_of[pair[1]].append(pair)
+            self.pairs_of[pair[2]].append(pair)
+        # value of every pair rule for every (time of a, time of b, a remote, b remote)
+        hours = tables.hours
+        diff = np.abs(hours[:, None] - hours[None, :])[:, :, None, None]
+        mismatch = np.arange(2)[None, None, :, None] != np.arange(2)[None, None, None, :]
+        self.pair_table = {
+            "spread": np.broadcast_to(np.where(diff > 4, 0.5, 0.0) - np.where(diff == 0, 0.5, 0.0), (len(hours), len(hours), 2, 2)),
+            "sequence": -np.where(diff == 0, 0.25, 0.0) + np.where(diff == 1, 0.5, 0.0) - np.where((diff == 1) & mismatch, 0.4, 0.0) + np.where(diff == 2, 0.25, 0.0)
+        }
+        self.remote = tables.remote_room.astype(np.int64)
+
+    def assign(self, activity, t, r, f):
+        self.genes[activity] = (t, r, f)
+        self.room_count[t, r] += 1
+        self.slot_count[f, t] += 1
+        self.load[f] += 1
+        self.static += self.tables.capacity_score[activity, r] + self.tables.facilitator_score[activity, f]
+
+    def unassign(self, activity):
+        t, r, f = self.genes[activity]
+        self.genes[activity] = -1
+        self.room_count[t, r] -= 1
+        self.slot_count[f, t] -= 1
+        self.load[f] -= 1
+        self.static -= self.tables.capacity_score[activity, r] + self.tables.facilitator_score[activity, f]
+
+    def parts(self, activity):
+        # (times, rooms) and (times, facilitators) arrays whose sum bounds what placing
+        # activity there adds, pair rules with an already placed partner included
+        tables = self.tables
+        room_part = tables.capacity_score[activity][None, :] + overlap_step(self.room_count)
+        facilitator_part = (tables.facilitator_score[activity][:, None] + slot_step(self.slot_count) + load_step(self.load)[:, None]).T
+        for kind, a, b in self.pairs_of[activity]:
+            other = b if a == activity else a
+            if self.genes[other, TIME] < 0:
+                continue
+            ot, orr = self.genes[other, TIME], self.genes[other, ROOM]
+            table = self.pair_table[kind]
+            if a == activity:
+                room_part = room_part + table[:, ot, :, self.remote[orr]][:, self.remote]
+            else:
+                room_part = room_part + table[ot, :, self.remote[orr], :][:, self.remote]
+        return room_part, facilitator_part
+
+    def bound(self, unassigned):
+        # Upper bound on the fitness of every completion, and the bound of each unassigned activity
+        value = self.static + overlap_value(self.room_count).sum() + slot_value(self.slot_count).sum() + load_bound(self.load).sum()
+        for kind, a, b in self.pairs:
+            ta, tb = self.genes[a, TIME], self.genes[b, TIME]
+            if ta >= 0 and tb >= 0:
+                value += self.pair_table[kind][ta, tb, self.remote[self.genes[a, ROOM]], self.remote[self.genes[b, ROOM]]]
+            elif ta < 0 and tb < 0:
+                value += 0.5
+        best = {}
+        for activity in unassigned:
+            room_part, facilitator_part = self.parts(activity)
+            best[activity] = float((room_part.max(axis=1) + facilitator_part.max(axis=1)).max())
+        return value + sum(best.values()), best
+
+    def candidates(self, activity, threshold, width=None):
+        # (time, room, facilitator) values whose bound is above threshold, most promising first
+        room_part, facilitator_part = self.parts(activity)
+        values = room_part[:, :, None] + facilitator_part[:, None, :]
+        flat = np.flatnonzero(values.ravel() > threshold)
+        flat = flat[np.argsort(-values.ravel()[flat], kind="stable")]
+        if width is not None:
+            flat = flat[:width]
+        return [tuple(int(x) for x in np.unravel_index(i, values.shape)) for i in flat]
+
+def activity_order(tables):
+    # activities in pair rules first, then the largest sections, which have the fewest good rooms
+    paired = set(tables.spread_pairs.ravel().tolist()) | set(tables.sequence_pairs.ravel().tolist())
+    good_rooms = (tables.capacity_score > 0).sum(axis=1)
+    return sorted(range(len(tables.activities_list)), key=lambda a: (a not in paired, good_rooms[a], a))
+
+def branch_and_bound(tables, time_budget=10.0, initial=None, width=None, report=None):
+    # Searches until the tree is exhausted or time_budget seconds have passed. initial is an
+    # optional schedule to start from, width limits the values tried per activity. report,
+    # when given, is called with every improvement as (seconds, fitness, nodes). Returns a dict
+    # with the best schedule, its fitness, the root upper bound, whether the search finished
+    # (proving the schedule optimal, unless width cut values), the nodes visited and the history
+    start = time.perf_counter()
+    search = ScheduleSearch(tables)
+    order = activity_order(tables)
+    best_genes, best_value = None, float("-inf")
+    history = []
+
+    def improve(genes, value):
+        nonlocal best_genes, best_value
+        if value > best_value:
+            best_genes, best_value = genes.copy(), value
+            history.append((time.perf_counter() - start, value, nodes))
+            if report:
+                report(*history[-1])
+
+    nodes = 0
+    if initial is not None:
+        genes = tables.encode_schedule(initial) if isinstance(initial[0][0], str) else np.asarray(initial)
+        improve(genes, float(batch_fitness(tables, genes[None])[0]))
+
+    root_bound, _ = search.bound(order)
+    # every frame is (depth, candidate values, next candidate)
+    stack = []
+    depth = 0
+    finished = False
+    while True:
+        if time.perf_counter() - start > time_budget:
+            break
+        nodes += 1
+        if depth == len(order):
+            improve(search.genes, float(batch_fitness(tables, search.genes[None])[0]))
+            values = []
+        else:
+            bound, best = search.bound(order[depth:])
+            activity = order[depth]
+            if bound <= best_value + 1e-9:
+                values = []
+            else:
+                # the rest of the bound without this activity, so each value is checked on its own
+                values = search.candidates(activity, best_value + 1e-9 - (bound - best[activity]), width)
+        stack.append([depth, values, 0])
+
+        # move to the next untried value, backtracking through exhausted frames
+        while stack:
+            frame = stack[-1]
+            frame_depth, values, index = frame
+            if frame_depth < len(order) and index > 0:
+                search.unassign(order[frame_depth])
+            if index < len(values):
+                frame[2] += 1
+                search.assign(order[frame_depth], *values[index])
+                depth = frame_depth + 1
+                break
+            stack.pop()
+        if not stack:
+            finished = True
+            break
+
+    return {
+        "schedule": tables.decode_schedule(best_genes) if best_genes is not None else None,
+        "fitness": best_value,
+        "bound": float(root_bound),
+        "finished": finished,
+        "nodes": nodes,
+        "seconds": time.perf_counter() - start,
+        "history": history
+    }
@@ -0,0 +1,66 @@
+import json
+import os
+import random
+import numpy as np
+
+# Checkpoints of a running genetic_algorithm(). The file is a small JSON header with the
+# scalar state (generation, mutation rate, ...) followed by the raw arrays:
+#   population   encoded (population, activities, 3) genes in the smallest unsigned type
+#   fitnesses    float64 fitness of every schedule
+#   rng          Mersenne Twister state of the random module
+# so a run can continue exactly where it stopped.
+MAGIC = b"HW2CHKPT"
+VERSION = 1
+
+def random_state():
+    # The random module state as (header fields, uint32 array)
+    version, internal, gauss_next = random.getstate()
+    return {"rng_version": version, "gauss_next": gauss_next}, np.array(internal, dtype=np.uint32)
+
+def set_random_state(header, internal):
+    random.setstate((header["rng_version"], tuple(int(value) for value in internal), header["gauss_next"]))
+
+# Writes the encoded population, its fitnesses, the random module state and the scalar
+# fields of state to path
+def save_checkpoint(path, encoded, fitnesses, state):
+    rng_header, rng = random_state()
+    encoded = np.asarray(encoded)
+    arrays = {
+        "population": encoded.astype(np.min_scalar_type(max(int(encoded.max(initial=0)), 0))),
+        "fitnesses": np.asarray(fitnesses, dtype=np.float64),
+        "rng": rng
+    }
+    layout = {}
+    position = 0
+    for name, array in arrays.items():
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": position}
+        position += array.nbytes
+    header = json.dumps({"version": VERSION, "state": state, "random": rng_header, "arrays": layout}).encode()
+
+    # write to a temporary file first so a crash while saving keeps the previous checkpoint
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(MAGIC)
+        file.write(len(header).to_bytes(8, "little"))
+        file.write(header)
+        for array in arrays.values():
+            file.write(np.ascontiguousarray(array).tobytes())
+    os.replace(temporary, path)
+
+# Reads a checkpoint, restores the random module and returns (encoded, fitnesses, state)
+def load_checkpoint(path):
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a checkpoint")
+        length = int.from_bytes(file.read(8), "little")
+        header = json.loads(file.read(length))
+        data = file.read()
+    if header.get("version") != VERSION:
+        raise ValueError(f"{path} has checkpoint version {header.get('version')}, expected {VERSION}")
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"]))
+        arrays[name] = np.frombuffer(data, dtype, count, entry["offset"]).reshape(entry["shape"])
+    set_random_state(header["random"], arrays["rng"])
+    return arrays["population"].astype(np.int64), arrays["fitnesses"].tolist(), header["state"]
@@ -0,0 +1,54 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from VectorizedFitness import batch_fitness
+
+# Bounded least-recently-used cache of schedule fitnesses. Schedules are keyed on a 16 byte
+# BLAKE2 digest of their encoded genes, so an entry costs the same for any instance size.
+# Only schedules missing from the cache are passed to batch_fitness(), and a schedule that
+# appears several times in one population is scored once.
+
+class FitnessCache:
+    def __init__(self, tables, capacity=100000):
+        self.tables = tables
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, genes):
+        return hashlib.blake2b(genes.tobytes(), digest_size=16).digest()
+
+    def evaluate(self, encoded):
+        # Fitness of every schedule of an encoded (population, activities, 3) array
+        encoded = np.ascontiguousarray(encoded, dtype=np.int64)
+        result = np.empty(len(encoded))
+        # key -> positions of the schedules still to be scored
+        pending = {}
+        for i, genes in enumerate(encoded):
+            key = self.key(genes)
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+                result[i] = value
+                self.hits += 1
+            elif key in pending:
+                pending[key].append(i)
+                self.hits += 1
+            else:
+                pending[key] = [i]
+                self.misses += 1
+
+        if pending:
+            first = [positions[0] for positions in pending.values()]
+            values = batch_fitness(self.tables, encoded[first]).tolist()
+            for (key, positions), value in zip(pending.items(), values):
+                result[positions] = value
+                self.entries[key] = value
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+        return result
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0, "size": len(self.entries)}
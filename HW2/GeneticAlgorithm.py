@@ -1,5 +1,16 @@
+import argparse
+import json
+import os
 import random
-from scipy.special import softmax
+import time
+import numpy as np
+from Checkpoint import load_checkpoint, save_checkpoint
+from FitnessCache import FitnessCache
+from Memetic import memetic_stage
+from PopulationArrays import PopulationBuffers, generational_step, steady_state_step
+from Problem import load_problem
+from Selection import selection_methods
+from VectorizedFitness import FitnessTables, batch_fitness, population_diversity
 
 # Defining data
 facilitators = [
@@ -86,8 +97,28 @@ activities = {
     }
 }
 
+# Rules that name specific facilitators, sections and buildings
+rules = {
+    "low_load_exempt": ["Tyler"],
+    "spread_pairs": [["SLA100A", "SLA100B"], ["SLA191A", "SLA191B"]],
+    "sequence_pairs": [["SLA100A", "SLA191A"], ["SLA100A", "SLA191B"], ["SLA100B", "SLA191A"], ["SLA100B", "SLA191B"]],
+    "remote_buildings": ["Roman", "Beach"]
+}
+
 activities_list = list(activities.keys())
 
+# Integer lookup tables for scoring whole populations at once
+fitness_tables = FitnessTables(activities, facilitators, rooms, time_hour, rules)
+
+def use_problem(problem):
+    # Replace the built-in instance with a loaded one (see Problem.load_problem). fitness()
+    # only knows the built-in instance, everything else scores through fitness_tables
+    global facilitators, time_hour, rooms, activities, rules, activities_list, fitness_tables
+    facilitators, time_hour, rooms = problem["facilitators"], problem["times"], problem["rooms"]
+    activities, rules = problem["activities"], problem["rules"]
+    activities_list = list(activities.keys())
+    fitness_tables = FitnessTables(activities, facilitators, rooms, time_hour, rules)
+
 # Functions for random generation
 def random_assignment():
     # Return a random time, room, and facilitator tuple.
@@ -230,25 +261,22 @@ def fitness(schedule):
 
     return total_fitness
 
+def population_fitness(population, cache=None):
+    # Score a whole population in one batched pass, same values as fitness() on each schedule.
+    # With a FitnessCache only schedules it has not seen yet are scored
+    encoded = fitness_tables.encode_population(population)
+    if cache is not None:
+        return cache.evaluate(encoded).tolist()
+    return batch_fitness(fitness_tables, encoded).tolist()
+
 # Selection, crossovoer and Mutation fucnctions
-def selection(population, fitnesses):
-    probs = softmax(fitnesses)
-    cdf = []
-    current_sum = 0.0
-    for p in probs:
-        current_sum += p
-        cdf.append(current_sum)
-
-    def pick_one():
-        rand = random.random()
-        for i, val in enumerate(cdf):
-            if rand <= val:
-                return population[i]
-        return population[-1]
-
-    p1 = pick_one()
-    p2 = pick_one()
-    return p1, p2
+def selection(population, fitnesses, pairs=1, method="roulette", rng=None):
+    # Draw the parents of a whole generation at once, returns a list of (p1, p2) pairs.
+    # The numpy generator is seeded from random, so random.seed() still fixes every run
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(64))
+    picks = selection_methods[method](fitnesses, 2 * pairs, rng).tolist()
+    return [(population[picks[i]], population[picks[i + 1]]) for i in range(0, 2 * pairs, 2)]
 
 def crossover(scheduleA, scheduleB):
     size = len(scheduleA)
@@ -278,52 +306,90 @@ def mutate(schedule, mutation_rate):
 def genetic_algorithm(
     population_size=500, 
     max_generations=500, 
-    initial_mutation_rate=0.01
+    initial_mutation_rate=0.01,
+    selection_method="roulette",
+    checkpoint_path=None,
+    checkpoint_every=10,
+    metrics_path=None,
+    resume=False,
+    cache_size=0,
+    memetic_fraction=0.0,
+    memetic_moves=20,
+    tabu_tenure=0,
+    elitism=1,
+    steady_state=0
 ):
-    # Create initial population
-    population = [random_schedule() for _ in range(population_size)]
+    # The population lives in PopulationArrays buffers. elitism copies that many of the best
+    # schedules into every generation unchanged, and steady_state > 0 replaces the worst
+    # schedules with batches of that many offspring instead, a generation then being
+    # population_size offspring.
+    # With checkpoint_path the state is saved every checkpoint_every generations and, with
+    # resume, a run continues from it. With metrics_path one JSON line per generation is written.
+    # cache_size > 0 keeps the fitness of that many recent schedules so repeats are not rescored.
+    # memetic_fraction > 0 runs a local search of memetic_moves moves on that top fraction of
+    # every generation, greedy or, with tabu_tenure > 0, tabu search
+    cache = FitnessCache(fitness_tables, cache_size) if cache_size else None
+    start_generation = 0
+    baseline_avg_100 = None
+    stopped = False
+    if resume and checkpoint_path and os.path.exists(checkpoint_path):
+        genes, _, state = load_checkpoint(checkpoint_path)
+        if genes.shape[1:] != (len(activities_list), 3):
+            raise ValueError(f"{checkpoint_path} holds schedules of {genes.shape[1]} activities, the problem has {len(activities_list)}")
+        mutation_rate = state["mutation_rate"]
+        best_fitness_so_far = state["best_fitness_so_far"]
+        baseline_avg_100 = state["baseline_avg_100"]
+        # a run that already met the stopping rule stays finished
+        start_generation = max_generations if state["stopped"] else state["generation"] + 1
+        print(f"Resuming from generation {state['generation'] + 1}.")
+    else:
+        # Create initial population
+        genes = fitness_tables.encode_population([random_schedule() for _ in range(population_size)])
+        mutation_rate = initial_mutation_rate
 
     # Evaluate fitness
-    fitnesses = [fitness(sch) for sch in population]
-    
-    mutation_rate = initial_mutation_rate
-    best_fitness_so_far = max(fitnesses)
-    
+    buffers = PopulationBuffers(fitness_tables, len(genes), None, genes, cache)
+    if not start_generation:
+        best_fitness_so_far = float(buffers.fitness.max())
+
+    def save(g):
+        state = {"generation": g, "mutation_rate": mutation_rate, "best_fitness_so_far": best_fitness_so_far, "baseline_avg_100": baseline_avg_100, "stopped": stopped}
+        save_checkpoint(checkpoint_path, buffers.genes(), buffers.fitness, state)
+
+    metrics = open(metrics_path, "a" if start_generation else "w") if metrics_path else None
     avg_fitness_history = []
     
-    for g in range(max_generations):
+    for g in range(start_generation, max_generations):
         # Store the old best fitness before evolving to next gen
         old_best_fitness_so_far = best_fitness_so_far
         
-        new_population = []
-        new_fitnesses = []
-
-        # Build next generation
-        while len(new_population) < population_size:
-            # select parents
-            p1, p2 = selection(population, fitnesses)
-
-            # produce offspring
-            c1, c2 = crossover(p1, p2)
-
-            # mutate
-            mutate(c1, mutation_rate)
-            mutate(c2, mutation_rate)
-
-            new_population.append(c1)
-            if len(new_population) < population_size:
-                new_population.append(c2)
-
-        # Evaluate new population
-        new_fitnesses = [fitness(sch) for sch in new_population]
-
-        # Replace old population and fitnesses
-        population = new_population
-        fitnesses = new_fitnesses
+        timings = {}
+        cache_before = cache.stats() if cache else None
+        started = time.perf_counter()
+        # the numpy generator is seeded from random, so random.seed() and a checkpoint still fix every run
+        rng = np.random.default_rng(random.getrandbits(64))
+        if steady_state:
+            evaluations = 0
+            while evaluations < buffers.size:
+                evaluations += steady_state_step(buffers, mutation_rate, selection_method, min(steady_state, buffers.size), rng, timings)
+        else:
+            evaluations = generational_step(buffers, mutation_rate, selection_method, elitism, rng, timings)
+        if memetic_fraction > 0:
+            before_search = time.perf_counter()
+            top = np.argsort(buffers.fitness, kind="stable")[::-1][:max(1, int(buffers.size * memetic_fraction))]
+            schedules = [fitness_tables.decode_schedule(buffers.current[i]) for i in top]
+            changed = memetic_stage(fitness_tables, schedules, buffers.fitness[top].tolist(), 1.0, memetic_moves, tabu_tenure)
+            if changed:
+                # rescore the improved schedules exactly, the search only adds up fitness changes
+                rows = top[changed]
+                buffers.current[rows] = fitness_tables.encode_population([schedules[i] for i in changed])
+                buffers.fitness[rows] = buffers.score(buffers.current[rows])
+            timings["local_search"] = time.perf_counter() - before_search
+        elapsed = time.perf_counter() - started
 
         # Track stats
-        current_best = max(fitnesses)
-        current_avg = sum(fitnesses) / len(fitnesses)
+        current_best = float(buffers.fitness.max())
+        current_avg = float(buffers.fitness.mean())
         avg_fitness_history.append(current_avg)
 
         # If the new best fitness beats the old best fitness, cut mutation in half
@@ -331,10 +397,24 @@ def genetic_algorithm(
             mutation_rate /= 2.0
             best_fitness_so_far = current_best
 
+        if metrics:
+            record = {
+                "generation": g, "best_fitness": current_best, "avg_fitness": current_avg,
+                "diversity": population_diversity(buffers.genes()),
+                "evaluations_per_second": evaluations / elapsed, "mutation_rate": mutation_rate,
+                "seconds": timings
+            }
+            if cache:
+                stats = cache.stats()
+                record["cache"] = {"hits": stats["hits"] - cache_before["hits"], "misses": stats["misses"] - cache_before["misses"], "hit_rate": stats["hit_rate"], "size": stats["size"]}
+            metrics.write(json.dumps(record) + "\n")
+            metrics.flush()
+
         # log progress
         if g % 10 == 0:
             print(f"Generation {g} | Best fitness: {current_best:.3f} "
-                  f"| Avg fitness: {current_avg:.3f} | Mutation: {mutation_rate:.5f}")
+                  f"| Avg fitness: {current_avg:.3f} | Mutation: {mutation_rate:.5f}"
+                  + (f" | Cache hit rate: {cache.stats()['hit_rate']:.1%}" if cache else ""))
 
         # After 100 generations, check improvement in average fitness
         if g == 100:
@@ -344,19 +424,58 @@ def genetic_algorithm(
             # if improvement < 1% over baseline, stop
             if baseline_avg_100 != 0 and (current_avg - baseline_avg_100) < 0.01 * baseline_avg_100:
                 print(f"Stopping at generation {g}.")
+                stopped = True
                 break
 
+        if checkpoint_path and (g + 1) % checkpoint_every == 0:
+            save(g)
+
+    if checkpoint_path and start_generation < max_generations:
+        save(g)
+    if metrics:
+        metrics.close()
+
     # Return the best schedule and its fitness
-    best_index = max(range(len(population)), key=lambda i: fitnesses[i])
-    best_schedule = population[best_index]
-    return best_schedule, fitnesses[best_index]
+    best_index = int(np.argmax(buffers.fitness))
+    best_schedule = fitness_tables.decode_schedule(buffers.current[best_index])
+    return best_schedule, float(buffers.fitness[best_index])
 
 # Execution and Output
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Schedule the activities with a genetic algorithm")
+    parser.add_argument("--problem", help="JSON file or directory of CSV files with the instance, the built-in instance by default")
+    parser.add_argument("--population", type=int, default=500)
+    parser.add_argument("--generations", type=int, default=300)
+    parser.add_argument("--checkpoint", help="file the run state is saved to, no checkpoints without it")
+    parser.add_argument("--checkpoint-every", type=int, default=10, help="generations between checkpoints")
+    parser.add_argument("--resume", action="store_true", help="continue from the --checkpoint file")
+    parser.add_argument("--metrics", help="write per-generation metrics to this JSON lines file")
+    parser.add_argument("--cache-size", type=int, default=0, help="remember the fitness of this many recent schedules")
+    parser.add_argument("--memetic", type=float, default=0.0, help="fraction of every generation improved by local search")
+    parser.add_argument("--memetic-moves", type=int, default=20, help="moves per local search")
+    parser.add_argument("--tabu", type=int, default=0, help="tabu tenure of the local search, 0 for greedy")
+    parser.add_argument("--elitism", type=int, default=1, help="best schedules copied unchanged into every generation")
+    parser.add_argument("--steady-state", type=int, default=0, help="replace the worst schedules with batches of this many offspring instead of whole generations")
+    args = parser.parse_args()
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs --checkpoint")
+    if args.problem:
+        use_problem(load_problem(args.problem))
+
     best_sched, best_fit = genetic_algorithm(
-        population_size=500, 
-        max_generations=300,
-        initial_mutation_rate=0.01
+        population_size=args.population,
+        max_generations=args.generations,
+        initial_mutation_rate=0.01,
+        checkpoint_path=args.checkpoint,
+        checkpoint_every=args.checkpoint_every,
+        metrics_path=args.metrics,
+        resume=args.resume,
+        cache_size=args.cache_size,
+        memetic_fraction=args.memetic,
+        memetic_moves=args.memetic_moves,
+        tabu_tenure=args.tabu,
+        elitism=args.elitism,
+        steady_state=args.steady_state
     )
     print("\nBest schedule found, fitness = {:.3f}:".format(best_fit))
     
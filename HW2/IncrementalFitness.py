@@ -0,0 +1,161 @@
+import random
+from collections import Counter
+from VectorizedFitness import TIME, ROOM, FACILITATOR
+
+# Incremental fitness for single-gene edits. fitness() is a sum of
+#   - per-activity terms that only depend on the activity's own room and facilitator,
+#   - terms that only depend on how many activities share a (time, room), a
+#     (facilitator, time) or a facilitator, summed per group,
+#   - the spread and sequence pair rules, which each look at two activities.
+# Changing one gene moves one activity between two groups of each kind, so the change in
+# fitness is found from a constant number of counters and table lookups. The total is
+# kept by adding deltas, so it can differ from fitness() by float rounding only.
+
+def overlap_total(count):
+    # -0.5 for every activity sharing its time and room with another
+    return -0.5 * count if count > 1 else 0.0
+
+def slot_load_total(count):
+    # +0.2 for an activity that is its facilitator's only one in the slot, -0.2 each otherwise
+    return 0.2 if count == 1 else -0.2 * count
+
+def facilitator_load_total(count, low_load_penalized):
+    # -0.5 each above 4 activities, -0.4 each at 2 or fewer unless the facilitator is exempt
+    total = 0.0
+    if count > 4:
+        total -= 0.5 * count
+    if low_load_penalized and 0 < count <= 2:
+        total -= 0.4 * count
+    return total
+
+class IncrementalFitness:
+    # Keeps the counters fitness() builds for one schedule so single-gene edits are scored in constant time
+    def __init__(self, tables, schedule):
+        self.tables = tables
+        if schedule and isinstance(schedule[0][0], str):
+            schedule = tables.encode_schedule(schedule)
+        self.genes = [list(map(int, gene)) for gene in schedule]
+        # the pair rules every activity takes part in
+        self.spread_pairs_of = [[] for _ in self.genes]
+        self.sequence_pairs_of = [[] for _ in self.genes]
+        for first, second in tables.spread_pairs.tolist():
+            self.spread_pairs_of[first].append((first, second))
+            self.spread_pairs_of[second].append((first, second))
+        for first, second in tables.sequence_pairs.tolist():
+            self.sequence_pairs_of[first].append((first, second))
+            self.sequence_pairs_of[second].append((first, second))
+        self.time_room = Counter((t, r) for t, r, _ in self.genes)
+        self.slot_load = Counter((f, t) for t, _, f in self.genes)
+        self.facilitator_load = Counter(f for _, _, f in self.genes)
+        self.value = self.full_value()
+
+    def full_value(self):
+        # Fitness of the current genes computed from the counters
+        tables = self.tables
+        total = sum(tables.capacity_score[a, r] + tables.facilitator_score[a, f] for a, (_, r, f) in enumerate(self.genes))
+        total += sum(overlap_total(count) for count in self.time_room.values())
+        total += sum(slot_load_total(count) for count in self.slot_load.values())
+        total += sum(facilitator_load_total(count, tables.low_load_penalized[f]) for f, count in self.facilitator_load.items())
+        total += self.pair_value(self.genes, self.tables.spread_pairs.tolist(), self.tables.sequence_pairs.tolist())
+        return float(total)
+
+    def pair_value(self, genes, spread_pairs, sequence_pairs):
+        # The spread and sequence pair rules of fitness() for the given pairs
+        tables = self.tables
+        hours = tables.hours
+        total = 0.0
+        for first, second in spread_pairs:
+            diff = abs(hours[genes[first][TIME]] - hours[genes[second][TIME]])
+            if diff > 4:
+                total += 0.5
+            if diff == 0:
+                total -= 0.5
+        for first, second in sequence_pairs:
+            diff = abs(hours[genes[first][TIME]] - hours[genes[second][TIME]])
+            if diff == 0:
+                total -= 0.25
+            if diff == 1:
+                total += 0.5
+                if tables.remote_room[genes[first][ROOM]] != tables.remote_room[genes[second][ROOM]]:
+                    total -= 0.4
+            if diff == 2:
+                total += 0.25
+        return total
+
+    def delta(self, activity, field, value):
+        # Change in fitness if gene field (TIME, ROOM or FACILITATOR) of activity were set to value
+        tables = self.tables
+        old = self.genes[activity]
+        if old[field] == value:
+            return 0.0
+        new = list(old)
+        new[field] = value
+        (t, r, f), (nt, nr, nf) = old, new
+        change = 0.0
+
+        if r != nr:
+            change += tables.capacity_score[activity, nr] - tables.capacity_score[activity, r]
+        if f != nf:
+            change += tables.facilitator_score[activity, nf] - tables.facilitator_score[activity, f]
+
+        if (t, r) != (nt, nr):
+            before, after = self.time_room[(t, r)], self.time_room[(nt, nr)]
+            change += overlap_total(before - 1) - overlap_total(before) + overlap_total(after + 1) - overlap_total(after)
+        if (f, t) != (nf, nt):
+            before, after = self.slot_load[(f, t)], self.slot_load[(nf, nt)]
+            change += slot_load_total(before - 1) - slot_load_total(before) + slot_load_total(after + 1) - slot_load_total(after)
+        if f != nf:
+            before, after = self.facilitator_load[f], self.facilitator_load[nf]
+            change += facilitator_load_total(before - 1, tables.low_load_penalized[f]) - facilitator_load_total(before, tables.low_load_penalized[f])
+            change += facilitator_load_total(after + 1, tables.low_load_penalized[nf]) - facilitator_load_total(after, tables.low_load_penalized[nf])
+
+        spread_pairs, sequence_pairs = self.spread_pairs_of[activity], self.sequence_pairs_of[activity]
+        if (spread_pairs or sequence_pairs) and field != FACILITATOR:
+            before = self.pair_value(self.genes, spread_pairs, sequence_pairs)
+            self.genes[activity] = new
+            change += self.pair_value(self.genes, spread_pairs, sequence_pairs) - before
+            self.genes[activity] = old
+        return float(change)
+
+    def apply(self, activity, field, value):
+        # Set gene field of activity to value, update the counters and return the change in fitness
+        change = self.delta(activity, field, value)
+        t, r, f = self.genes[activity]
+        self.time_room[(t, r)] -= 1
+        self.slot_load[(f, t)] -= 1
+        self.facilitator_load[f] -= 1
+        self.genes[activity][field] = value
+        t, r, f = self.genes[activity]
+        self.time_room[(t, r)] += 1
+        self.slot_load[(f, t)] += 1
+        self.facilitator_load[f] += 1
+        self.value += change
+        return change
+
+    def violating_activities(self):
+        # Activities that currently break a constraint: a shared room, a double-booked or
+        # over/under-loaded facilitator, a badly sized room or an unlisted facilitator
+        tables = self.tables
+        violating = []
+        for a, (t, r, f) in enumerate(self.genes):
+            load = self.facilitator_load[f]
+            if (self.time_room[(t, r)] > 1 or self.slot_load[(f, t)] > 1 or load > 4 or (tables.low_load_penalized[f] and load <= 2)
+                    or tables.capacity_score[a, r] < 0 or tables.facilitator_score[a, f] < 0):
+                violating.append(a)
+        return violating
+
+    def schedule(self):
+        # The current genes as (time, room, facilitator) tuples
+        return self.tables.decode_schedule(self.genes)
+
+def hill_climb(tables, schedule, steps=200, rng=random):
+    # Random single-gene proposals, keeping every one that does not lower fitness; returns (schedule, fitness)
+    state = IncrementalFitness(tables, schedule)
+    sizes = (len(tables.time_names), len(tables.room_names), len(tables.facilitators))
+    for _ in range(steps):
+        activity = rng.randrange(len(state.genes))
+        field = rng.randrange(3)
+        value = rng.randrange(sizes[field])
+        if state.delta(activity, field, value) >= 0:
+            state.apply(activity, field, value)
+    return state.schedule(), state.value
@@ -0,0 +1,125 @@
+import argparse
+import json
+import multiprocessing
+import random
+import time
+import numpy as np
+import GeneticAlgorithm
+from PopulationArrays import PopulationBuffers, generational_step
+from Problem import load_problem
+
+# Island model for genetic_algorithm(). Every island is a separate process with its own
+# population and seed, kept in PopulationBuffers and evolved with the same generational_step()
+# and elitism as genetic_algorithm(). The islands evolve independently for a number of
+# generations (an epoch), then each one sends its best encoded schedules through a pipe to
+# the next island in a ring, where they replace the worst schedules. Since migration only happens between
+# epochs, a run is reproducible from its seed regardless of process scheduling.
+
+def island_seeds(seed, islands):
+    # Independent, reproducible seeds for every island derived from one run seed
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(islands)]
+
+def island_worker(connection, seed, population_size, migrant_count, mutation_rate, selection_method, elitism=1, problem=None):
+    # Runs one island. Every message is (generations, migrants) and is answered with
+    # (best migrants, best fitness, best schedule), migrants being (genes, fitness) pairs;
+    # None stops the island
+    if problem:
+        GeneticAlgorithm.use_problem(load_problem(problem))
+    tables = GeneticAlgorithm.fitness_tables
+    random.seed(seed)
+    genes = tables.encode_population([GeneticAlgorithm.random_schedule() for _ in range(population_size)])
+    buffers = PopulationBuffers(tables, population_size, None, genes)
+    best_fitness_so_far = float(buffers.fitness.max())
+
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        generations, migrants = message
+
+        # incoming schedules replace the worst ones
+        worst = np.argsort(buffers.fitness, kind="stable")
+        for i, (migrant, value) in zip(worst.tolist(), migrants):
+            buffers.current[i] = migrant
+            buffers.fitness[i] = value
+
+        for _ in range(generations):
+            # same generation step and mutation schedule as genetic_algorithm()
+            rng = np.random.default_rng(random.getrandbits(64))
+            generational_step(buffers, mutation_rate, selection_method, elitism, rng)
+            if buffers.fitness.max() > best_fitness_so_far:
+                mutation_rate /= 2.0
+                best_fitness_so_far = float(buffers.fitness.max())
+
+        ranked = np.argsort(buffers.fitness, kind="stable")[::-1][:migrant_count].tolist()
+        best = ranked[0]
+        connection.send(([(buffers.current[i].copy(), float(buffers.fitness[i])) for i in ranked], float(buffers.fitness[best]), tables.decode_schedule(buffers.current[best])))
+    connection.close()
+
+def run_islands(islands=4, population_size=500, max_generations=300, migration_interval=10, migrants=5, initial_mutation_rate=0.01, selection_method="roulette", seed=0, elitism=1, problem=None):
+    # Evolves the islands and returns (best schedule, best fitness, history), where history
+    # holds a (seconds, generation, best fitness) entry after every epoch. problem is the
+    # file or directory every island loads with load_problem(), the built-in instance if None
+    startTime = time.perf_counter()
+    connections, processes = [], []
+    for island_seed in island_seeds(seed, islands):
+        parent, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=island_worker, args=(child, island_seed, population_size, migrants, initial_mutation_rate, selection_method, elitism, problem), daemon=True)
+        process.start()
+        child.close()
+        connections.append(parent)
+        processes.append(process)
+
+    best_schedule, best_fitness = None, float("-inf")
+    history = []
+    outgoing = [[] for _ in range(islands)]
+    generation = 0
+    try:
+        while generation < max_generations:
+            generations = min(migration_interval, max_generations - generation)
+            for connection, incoming in zip(connections, outgoing):
+                connection.send((generations, incoming))
+            results = [connection.recv() for connection in connections]
+            generation += generations
+
+            for _, fitness, schedule in results:
+                if fitness > best_fitness:
+                    best_schedule, best_fitness = schedule, fitness
+            # ring topology: island i receives the best schedules of island i - 1
+            outgoing = [results[i - 1][0] for i in range(islands)] if islands > 1 else [[]]
+            history.append((time.perf_counter() - startTime, generation, best_fitness))
+    finally:
+        for connection in connections:
+            connection.send(None)
+        for process in processes:
+            process.join()
+    return best_schedule, best_fitness, history
+
+# Runs the island model for each island count and reports best fitness over wall-clock time
+def main():
+    parser = argparse.ArgumentParser(description="Run the genetic algorithm as an island model in separate processes")
+    parser.add_argument("--islands", default="1,2,4", help="comma separated island counts to compare")
+    parser.add_argument("--population", type=int, default=500, help="population of every island")
+    parser.add_argument("--generations", type=int, default=200)
+    parser.add_argument("--interval", type=int, default=10, help="generations between migrations")
+    parser.add_argument("--migrants", type=int, default=5)
+    parser.add_argument("--selection", default="roulette")
+    parser.add_argument("--elitism", type=int, default=1, help="best schedules copied unchanged into every generation of an island")
+    parser.add_argument("--problem", help="JSON file or directory of CSV files with the instance, the built-in instance by default")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the history as JSON lines to this file")
+    args = parser.parse_args()
+
+    output = open(args.output, "w") if args.output else None
+    for islands in map(int, args.islands.split(",")):
+        _, best_fitness, history = run_islands(islands, args.population, args.generations, args.interval, args.migrants, selection_method=args.selection, seed=args.seed, elitism=args.elitism, problem=args.problem)
+        print(f"{islands} islands: best fitness {best_fitness:.3f} after {history[-1][0]:.1f}s")
+        for seconds, generation, fitness in history:
+            print(f"  {seconds:>8.2f}s  generation {generation:>5}  best {fitness:.3f}")
+            if output:
+                output.write(json.dumps({"islands": islands, "seconds": seconds, "generation": generation, "best_fitness": fitness}) + "\n")
+    if output:
+        output.close()
+
+if __name__ == "__main__":
+    main()
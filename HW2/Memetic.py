@@ -0,0 +1,57 @@
+import random
+from IncrementalFitness import IncrementalFitness
+
+# Local search for the memetic stage of genetic_algorithm(). Moves change one gene of an
+# activity that currently violates a constraint and are scored with IncrementalFitness, so
+# a move costs a constant number of counter lookups. Every step tries all values of every
+# gene of up to sample violating activities and makes the best move:
+#   greedy  (tabu_tenure 0) stops as soon as no move improves the schedule
+#   tabu    also takes the best worsening move, but a changed gene may not be changed back
+#           for tabu_tenure steps; the best schedule seen is returned
+
+def local_search(tables, schedule, max_moves=20, tabu_tenure=0, sample=8, rng=random):
+    # Returns (improved schedule, its fitness), the schedule as (time, room, facilitator) tuples
+    state = IncrementalFitness(tables, schedule)
+    sizes = (len(tables.time_names), len(tables.room_names), len(tables.facilitators))
+    tabu = {}
+    best_value, best_genes = state.value, [list(gene) for gene in state.genes]
+
+    for step in range(max_moves):
+        candidates = state.violating_activities()
+        if not candidates:
+            break
+        if len(candidates) > sample:
+            candidates = rng.sample(candidates, sample)
+        best_move, best_change = None, float("-inf")
+        for activity in candidates:
+            for field, size in enumerate(sizes):
+                if tabu.get((activity, field), -1) >= step:
+                    continue
+                for value in range(size):
+                    if value == state.genes[activity][field]:
+                        continue
+                    change = state.delta(activity, field, value)
+                    if change > best_change:
+                        best_move, best_change = (activity, field, value), change
+        if best_move is None or (best_change <= 0 and not tabu_tenure):
+            break
+
+        state.apply(*best_move)
+        if tabu_tenure:
+            tabu[best_move[:2]] = step + tabu_tenure
+        if state.value > best_value:
+            best_value, best_genes = state.value, [list(gene) for gene in state.genes]
+
+    return tables.decode_schedule(best_genes), best_value
+
+def memetic_stage(tables, population, fitnesses, fraction=0.1, max_moves=20, tabu_tenure=0, sample=8, rng=random):
+    # Runs local_search on the top fraction of the population in place, returns the indices changed
+    count = max(1, int(len(population) * fraction)) if fraction > 0 else 0
+    top = sorted(range(len(population)), key=lambda i: fitnesses[i], reverse=True)[:count]
+    changed = []
+    for i in top:
+        schedule, value = local_search(tables, population[i], max_moves, tabu_tenure, sample, rng)
+        if value > fitnesses[i]:
+            population[i] = schedule
+            changed.append(i)
+    return changed
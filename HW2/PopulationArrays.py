@@ -0,0 +1,162 @@
+import time
+import numpy as np
+from Selection import selection_methods
+from VectorizedFitness import batch_fitness
+
+# Population of genetic_algorithm(). The population lives in two preallocated
+# (population, activities, 3) gene arrays: offspring of one generation are written in
+# place into the spare array, which then becomes the current one, so no schedules are
+# allocated while evolving. evolve_arrays() is the bare loop without checkpoints, metrics,
+# cache or local search. It adds
+#   elitism       the best schedules are copied into the next generation unchanged
+#   steady state  instead of replacing the whole population, small batches of offspring
+#                 replace the worst schedules whenever they are fitter
+# Crossover and mutation follow crossover() and mutate(): one-point crossover, and each
+# child changes one gene of one activity with probability mutation_rate * activities.
+
+class PopulationBuffers:
+    # With a FitnessCache every schedule is scored through it
+    def __init__(self, tables, population_size, rng, genes=None, cache=None):
+        self.tables = tables
+        self.cache = cache
+        self.sizes = np.array([len(tables.time_names), len(tables.room_names), len(tables.facilitators)])
+        activities = len(tables.activities_list)
+        # one spare row so offspring can always be written in whole pairs
+        self.current = np.empty((population_size + 1, activities, 3), dtype=np.int64)
+        self.spare = np.empty_like(self.current)
+        if genes is None:
+            genes = rng.integers(0, self.sizes, size=(population_size, activities, 3))
+        self.current[:population_size] = genes
+        self.size = population_size
+        self.fitness = self.score(self.genes())
+        self.spare_fitness = np.empty_like(self.fitness)
+
+    def genes(self):
+        return self.current[:self.size]
+
+    def score(self, genes):
+        return self.cache.evaluate(genes) if self.cache is not None else batch_fitness(self.tables, genes)
+
+    def swap(self):
+        self.current, self.spare = self.spare, self.current
+        self.fitness, self.spare_fitness = self.spare_fitness, self.fitness
+
+def crossover_into(out, genes, parents, rng):
+    # One-point crossover of consecutive parent pairs, children written into out[:len(parents)]
+    first, second = parents[0::2], parents[1::2]
+    pairs = len(first)
+    activities = genes.shape[1]
+    if activities < 2:
+        out[0:2 * pairs:2], out[1:2 * pairs:2] = genes[first], genes[second]
+        return
+    points = rng.integers(1, activities, size=pairs)
+    head = (np.arange(activities) < points[:, None])[:, :, None]
+    out[0:2 * pairs:2] = np.where(head, genes[first], genes[second])
+    out[1:2 * pairs:2] = np.where(head, genes[second], genes[first])
+
+def mutate_in_place(genes, mutation_rate, sizes, rng):
+    # mutate() on every schedule of genes at once
+    count, activities = genes.shape[0], genes.shape[1]
+    mutated = np.flatnonzero(rng.random(count) < mutation_rate * activities)
+    fields = rng.integers(0, 3, size=len(mutated))
+    genes[mutated, rng.integers(0, activities, size=len(mutated)), fields] = rng.integers(0, sizes[fields])
+
+def add_timings(timings, clocks):
+    # Adds the seconds between consecutive (step, time) clock readings to timings
+    if timings is not None:
+        for (_, before), (step, after) in zip(clocks, clocks[1:]):
+            timings[step] = timings.get(step, 0.0) + after - before
+
+def generational_step(buffers, mutation_rate, selection_method, elitism, rng, timings=None):
+    # Fills the spare buffer with the next generation and swaps it in, returns the evaluations used.
+    # timings, when given, collects the seconds spent in each step
+    clock = time.perf_counter
+    clocks = [(None, clock())]
+    size = buffers.size
+    elites = np.argsort(buffers.fitness, kind="stable")[::-1][:elitism]
+    buffers.spare[:len(elites)] = buffers.current[elites]
+    buffers.spare_fitness[:len(elites)] = buffers.fitness[elites]
+
+    children = size - len(elites)
+    pairs = (children + 1) // 2
+    parents = selection_methods[selection_method](buffers.fitness, 2 * pairs, rng)
+    clocks.append(("selection", clock()))
+    offspring = buffers.spare[len(elites):len(elites) + 2 * pairs]
+    crossover_into(offspring, buffers.genes(), parents, rng)
+    clocks.append(("crossover", clock()))
+    mutate_in_place(offspring[:children], mutation_rate, buffers.sizes, rng)
+    clocks.append(("mutation", clock()))
+    buffers.spare_fitness[len(elites):] = buffers.score(offspring[:children])
+    clocks.append(("fitness", clock()))
+    buffers.swap()
+    add_timings(timings, clocks)
+    return children
+
+def steady_state_step(buffers, mutation_rate, selection_method, batch, rng, timings=None):
+    # Breeds batch offspring and lets each replace one of the worst schedules if it is fitter
+    clock = time.perf_counter
+    clocks = [(None, clock())]
+    pairs = (batch + 1) // 2
+    parents = selection_methods[selection_method](buffers.fitness, 2 * pairs, rng)
+    clocks.append(("selection", clock()))
+    offspring = buffers.spare[:2 * pairs]
+    crossover_into(offspring, buffers.genes(), parents, rng)
+    clocks.append(("crossover", clock()))
+    mutate_in_place(offspring[:batch], mutation_rate, buffers.sizes, rng)
+    clocks.append(("mutation", clock()))
+    offspring_fitness = buffers.score(offspring[:batch])
+    clocks.append(("fitness", clock()))
+
+    # pair the fittest offspring with the worst schedules
+    worst = np.argpartition(buffers.fitness, batch - 1)[:batch] if batch < buffers.size else np.arange(buffers.size)
+    worst = worst[np.argsort(buffers.fitness[worst], kind="stable")]
+    order = np.argsort(offspring_fitness, kind="stable")[::-1][:len(worst)]
+    better = offspring_fitness[order] > buffers.fitness[worst]
+    buffers.current[worst[better]] = offspring[order[better]]
+    buffers.fitness[worst[better]] = offspring_fitness[order[better]]
+    clocks.append(("replacement", clock()))
+    add_timings(timings, clocks)
+    return batch
+
+def evolve_arrays(tables, population_size=500, max_generations=500, initial_mutation_rate=0.01, selection_method="roulette", elitism=1, steady_state=0, target_fitness=None, seed=0, genes=None):
+    # Runs the GA on the population buffers. steady_state > 0 switches to steady-state
+    # replacement with batches of that many offspring; a generation then means population_size
+    # offspring. Returns a dict with the best schedule, its fitness, evaluations used, and the
+    # evaluations and seconds it took to reach target_fitness (None if never reached)
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    buffers = PopulationBuffers(tables, population_size, rng, genes)
+    evaluations = population_size
+    mutation_rate = initial_mutation_rate
+    best_fitness_so_far = float(buffers.fitness.max())
+    reached = (evaluations, time.perf_counter() - start) if target_fitness is not None and best_fitness_so_far >= target_fitness else None
+
+    generations = 0
+    while generations < max_generations and reached is None:
+        generations += 1
+        if steady_state:
+            done = 0
+            while done < population_size:
+                done += steady_state_step(buffers, mutation_rate, selection_method, min(steady_state, population_size), rng)
+            evaluations += done
+        else:
+            evaluations += generational_step(buffers, mutation_rate, selection_method, elitism, rng)
+
+        # same mutation schedule as genetic_algorithm()
+        current_best = float(buffers.fitness.max())
+        if current_best > best_fitness_so_far:
+            mutation_rate /= 2.0
+            best_fitness_so_far = current_best
+        if target_fitness is not None and current_best >= target_fitness:
+            reached = (evaluations, time.perf_counter() - start)
+
+    best = int(np.argmax(buffers.fitness))
+    return {
+        "schedule": tables.decode_schedule(buffers.current[best]),
+        "fitness": float(buffers.fitness[best]),
+        "generations": generations,
+        "evaluations": evaluations,
+        "seconds": time.perf_counter() - start,
+        "evaluations_to_target": reached[0] if reached else None,
+        "seconds_to_target": reached[1] if reached else None
+    }
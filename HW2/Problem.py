@@ -0,0 +1,138 @@
+import argparse
+import csv
+import json
+import os
+import random
+import time
+import numpy as np
+from VectorizedFitness import FitnessTables, batch_fitness
+
+# Loading scheduling instances from files. A problem is a dictionary with the same parts
+# GeneticAlgorithm.py defines for the built-in instance:
+#   facilitators  list of names
+#   times         time slot name -> hour
+#   rooms         room name -> capacity
+#   activities    section name -> {"expected", "preferred", "other"}
+#   rules         the rules FitnessTables takes (low_load_exempt, spread_pairs, ...)
+# It is read from one JSON file holding that dictionary, or from a directory of CSV files:
+#   facilitators.csv  name, low_load_exempt (0/1)
+#   times.csv         name, hour
+#   rooms.csv         name, capacity, building, remote (0/1)
+#   activities.csv    name, expected, preferred, other (names separated by ';')
+#   pairs.csv         rule (spread/sequence), first, second
+# compile_problem() turns it into the integer tables every scoring function works on.
+
+def load_problem(path):
+    if os.path.isdir(path):
+        return load_csv_problem(path)
+    with open(path) as file:
+        return json.load(file)
+
+def read_rows(directory, name):
+    with open(os.path.join(directory, name), newline="") as file:
+        return list(csv.DictReader(file))
+
+def load_csv_problem(directory):
+    facilitators = read_rows(directory, "facilitators.csv")
+    rooms = read_rows(directory, "rooms.csv")
+    rules = {
+        "low_load_exempt": [row["name"] for row in facilitators if row.get("low_load_exempt", "0").strip() == "1"],
+        "buildings": {row["name"]: row["building"] for row in rooms if row.get("building")},
+        "remote_buildings": sorted({row["building"] for row in rooms if row.get("remote", "0").strip() == "1"}),
+        "spread_pairs": [],
+        "sequence_pairs": []
+    }
+    if os.path.exists(os.path.join(directory, "pairs.csv")):
+        for row in read_rows(directory, "pairs.csv"):
+            rules[row["rule"] + "_pairs"].append([row["first"], row["second"]])
+
+    def names(value):
+        return [name.strip() for name in (value or "").split(";") if name.strip()]
+
+    return {
+        "facilitators": [row["name"] for row in facilitators],
+        "times": {row["name"]: int(row["hour"]) for row in read_rows(directory, "times.csv")},
+        "rooms": {row["name"]: int(row["capacity"]) for row in rooms},
+        "activities": {row["name"]: {"expected": int(row["expected"]), "preferred": names(row["preferred"]), "other": names(row.get("other"))} for row in read_rows(directory, "activities.csv")},
+        "rules": rules
+    }
+
+def save_problem(problem, path):
+    with open(path, "w") as file:
+        json.dump(problem, file, indent=1)
+
+def compile_problem(problem):
+    return FitnessTables(problem["activities"], problem["facilitators"], problem["rooms"], problem["times"], problem["rules"])
+
+# Random instance with the shape of a real timetable: sections of the same course are
+# spread apart, some courses should follow each other, and a few buildings are remote
+def generate_problem(activities=2000, rooms=200, facilitators=300, buildings=20, seed=0):
+    rng = random.Random(seed)
+    facilitator_names = [f"F{i}" for i in range(facilitators)]
+    building_names = [f"B{i}" for i in range(buildings)]
+    room_names = [f"{rng.choice(building_names)} {i:03d}" for i in range(rooms)]
+    problem = {
+        "facilitators": facilitator_names,
+        "times": {f"{hour}:00": hour for hour in range(8, 21)},
+        "rooms": {name: rng.choice([20, 30, 45, 60, 75, 100, 150, 250]) for name in room_names},
+        "activities": {},
+        "rules": {
+            "low_load_exempt": rng.sample(facilitator_names, max(1, facilitators // 50)),
+            "remote_buildings": rng.sample(building_names, max(1, buildings // 5)),
+            "spread_pairs": [],
+            "sequence_pairs": []
+        }
+    }
+
+    courses = []
+    while len(problem["activities"]) < activities:
+        course = f"C{len(courses)}"
+        sections = [f"{course}{letter}" for letter in "AB"[:min(rng.choice([1, 1, 2]), activities - len(problem["activities"]))]]
+        expected = rng.choice([10, 15, 20, 25, 30, 40, 50, 60, 75, 100])
+        staff = rng.sample(facilitator_names, min(7, facilitators))
+        for section in sections:
+            problem["activities"][section] = {"expected": expected, "preferred": staff[:rng.randint(1, 4)], "other": staff[4:4 + rng.randint(0, 3)]}
+        if len(sections) == 2:
+            problem["rules"]["spread_pairs"].append(sections)
+            # now and then the next course should follow this one
+            if courses and len(courses[-1]) == 2 and rng.random() < 0.3:
+                problem["rules"]["sequence_pairs"].extend([first, second] for first in courses[-1] for second in sections)
+        courses.append(sections)
+    return problem
+
+def random_population(tables, size, rng):
+    # Random encoded (size, activities, 3) population for the compiled tables
+    shape = (size, len(tables.activities_list))
+    return np.stack([rng.integers(0, len(tables.time_names), shape), rng.integers(0, len(tables.room_names), shape), rng.integers(0, len(tables.facilitators), shape)], axis=2)
+
+# Writes a synthetic instance, or times scoring on synthetic instances of growing size
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic scheduling instances and time scoring on them")
+    parser.add_argument("--activities", default="100,1000,5000", help="comma separated instance sizes")
+    parser.add_argument("--rooms", type=int, default=200)
+    parser.add_argument("--facilitators", type=int, default=300)
+    parser.add_argument("--population", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the first instance to this JSON file instead of timing")
+    args = parser.parse_args()
+
+    sizes = list(map(int, args.activities.split(",")))
+    if args.output:
+        save_problem(generate_problem(sizes[0], args.rooms, args.facilitators, seed=args.seed), args.output)
+        return
+
+    rng = np.random.default_rng(args.seed)
+    for size in sizes:
+        problem = generate_problem(size, args.rooms, args.facilitators, seed=args.seed)
+        start = time.perf_counter()
+        tables = compile_problem(problem)
+        compileTime = time.perf_counter() - start
+        encoded = random_population(tables, args.population, rng)
+        start = time.perf_counter()
+        batch_fitness(tables, encoded)
+        scoreTime = time.perf_counter() - start
+        print(f"{size:>7} activities, {len(tables.spread_pairs) + len(tables.sequence_pairs):>5} pair rules: compiled in {compileTime * 1000:>8.1f} ms, "
+              f"{args.population} schedules scored in {scoreTime * 1000:>8.1f} ms ({scoreTime / args.population / size * 1e9:.0f} ns per activity)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import numpy as np
+
+# Parent selection for a whole generation at once. Each method builds its selection
+# distribution a single time from the fitness array and returns count parent indices
+# drawn in one vectorized step:
+#   roulette    softmax of the fitnesses, the distribution selection() used so far
+#   rank        linear ranking, the probability depends only on the fitness rank
+#   tournament  the fittest of size uniformly drawn individuals
+# Drawing from a cumulative array with binary search costs O(population + count log population)
+# per generation, instead of a linear CDF scan for every parent.
+
+def softmax_probabilities(fitnesses):
+    # Same distribution as scipy.special.softmax
+    fitnesses = np.asarray(fitnesses, dtype=np.float64)
+    weights = np.exp(fitnesses - fitnesses.max())
+    return weights / weights.sum()
+
+def draw_from(probabilities, count, rng):
+    # Indices drawn from a probability vector, the first index whose cumulative sum reaches the draw
+    cdf = np.cumsum(probabilities)
+    picks = np.searchsorted(cdf, rng.random(count), side="left")
+    return np.minimum(picks, len(cdf) - 1)
+
+def roulette_indices(fitnesses, count, rng):
+    return draw_from(softmax_probabilities(fitnesses), count, rng)
+
+def rank_indices(fitnesses, count, rng, pressure=1.5):
+    # Linear ranking: the worst individual gets weight 2 - pressure, the best gets pressure
+    n = len(fitnesses)
+    if n == 1:
+        return np.zeros(count, dtype=np.int64)
+    ranks = np.empty(n)
+    ranks[np.argsort(fitnesses, kind="stable")] = np.arange(n)
+    probabilities = ((2 - pressure) + 2 * (pressure - 1) * ranks / (n - 1)) / n
+    return draw_from(probabilities, count, rng)
+
+def tournament_indices(fitnesses, count, rng, size=2):
+    fitnesses = np.asarray(fitnesses)
+    entrants = rng.integers(0, len(fitnesses), size=(count, size))
+    return entrants[np.arange(count), np.argmax(fitnesses[entrants], axis=1)]
+
+selection_methods = {
+    "roulette": roulette_indices,
+    "rank": rank_indices,
+    "tournament": tournament_indices
+}
@@ -0,0 +1,120 @@
+import numpy as np
+
+# Batched fitness evaluation. Schedules are encoded as integer arrays of shape
+# (population, activities, 3) holding [time index, room index, facilitator index],
+# and every scoring rule of fitness() is applied to the whole population at once.
+# The floating point operations happen in the same order as in fitness(), so the
+# scores are bit-for-bit identical to the scalar function.
+
+TIME, ROOM, FACILITATOR = 0, 1, 2
+
+class FitnessTables:
+    # Integer-indexed lookup tables compiled from the problem definition. rules holds the
+    # parts of the scoring that name specific facilitators, sections and buildings:
+    #   low_load_exempt   facilitators not penalized for overseeing 2 or fewer activities
+    #   spread_pairs      [a, b] sections rewarded for being more than 4 hours apart
+    #   sequence_pairs    [a, b] sections rewarded for consecutive time slots
+    #   remote_buildings  buildings that cost a penalty when paired with any other building
+    #   buildings         building of every room, the first word of the room name if missing
+    def __init__(self, activities, facilitators, rooms, time_hour, rules):
+        self.activities_list = list(activities.keys())
+        self.facilitators = list(facilitators)
+        self.room_names = list(rooms.keys())
+        self.time_names = list(time_hour.keys())
+        self.activity_index = {a: i for i, a in enumerate(self.activities_list)}
+        self.time_index = {t: i for i, t in enumerate(self.time_names)}
+        self.room_index = {r: i for i, r in enumerate(self.room_names)}
+        self.facilitator_index = {f: i for i, f in enumerate(self.facilitators)}
+        self.hours = np.array([time_hour[t] for t in self.time_names], dtype=np.int64)
+
+        # capacity score of every activity in every room
+        expected = np.array([activities[a]["expected"] for a in self.activities_list], dtype=np.float64)[:, None]
+        capacity = np.array([rooms[r] for r in self.room_names], dtype=np.float64)[None, :]
+        self.capacity_score = np.where(capacity < expected, -0.5, np.where(capacity > 6 * expected, -0.4, np.where(capacity > 3 * expected, -0.2, 0.3)))
+        # facilitator match score of every activity for every facilitator
+        self.facilitator_score = np.full((len(self.activities_list), len(self.facilitators)), -0.1)
+        for a, activity in enumerate(self.activities_list):
+            for facilitator in activities[activity].get("other", []):
+                self.facilitator_score[a, self.facilitator_index[facilitator]] = 0.2
+            for facilitator in activities[activity].get("preferred", []):
+                self.facilitator_score[a, self.facilitator_index[facilitator]] = 0.5
+
+        exempt = set(rules.get("low_load_exempt", []))
+        self.low_load_penalized = np.array([f not in exempt for f in self.facilitators], dtype=bool)
+        buildings = rules.get("buildings", {})
+        self.building_names = sorted({buildings.get(room, room.split()[0]) for room in self.room_names})
+        building_index = {b: i for i, b in enumerate(self.building_names)}
+        self.building = np.array([building_index[buildings.get(room, room.split()[0])] for room in self.room_names], dtype=np.int64)
+        remote = set(rules.get("remote_buildings", []))
+        self.remote_room = np.array([self.building_names[b] in remote for b in self.building], dtype=bool)
+        self.spread_pairs = np.array([[self.activity_index[a], self.activity_index[b]] for a, b in rules.get("spread_pairs", [])], dtype=np.int64).reshape(-1, 2)
+        self.sequence_pairs = np.array([[self.activity_index[a], self.activity_index[b]] for a, b in rules.get("sequence_pairs", [])], dtype=np.int64).reshape(-1, 2)
+
+    def encode_schedule(self, schedule):
+        # Turn a list of (time, room, facilitator) tuples into an (activities, 3) array
+        return np.array([(self.time_index[t], self.room_index[r], self.facilitator_index[f]) for t, r, f in schedule], dtype=np.int64)
+
+    def encode_population(self, population):
+        # Turn a list of schedules into a (population, activities, 3) array
+        return np.array([[(self.time_index[t], self.room_index[r], self.facilitator_index[f]) for t, r, f in schedule] for schedule in population], dtype=np.int64).reshape(len(population), len(self.activities_list), 3)
+
+    def decode_schedule(self, encoded):
+        # Turn an (activities, 3) array back into (time, room, facilitator) tuples
+        return [(self.time_names[t], self.room_names[r], self.facilitators[f]) for t, r, f in np.asarray(encoded).tolist()]
+
+# number of activities sharing each activity's key within the same schedule
+def group_counts(keys, key_count):
+    population = keys.shape[0]
+    flat = keys + (np.arange(population) * key_count)[:, None]
+    counts = np.bincount(flat.ravel(), minlength=population * key_count)
+    return counts[flat]
+
+def batch_fitness(tables, encoded):
+    # Score every schedule of an encoded (population, activities, 3) array, returns (population,) floats
+    encoded = np.asarray(encoded)
+    times, rooms, facilitators = encoded[:, :, TIME], encoded[:, :, ROOM], encoded[:, :, FACILITATOR]
+    time_count, room_count, facilitator_count = len(tables.time_names), len(tables.room_names), len(tables.facilitators)
+    activity_ids = np.arange(encoded.shape[1])
+
+    time_room_count = group_counts(times * room_count + rooms, time_count * room_count)
+    facilitator_slot_count = group_counts(facilitators * time_count + times, facilitator_count * time_count)
+    facilitator_total_count = group_counts(facilitators, facilitator_count)
+
+    # per-activity scores, one rule after another like fitness()
+    score = np.zeros(encoded.shape[:2])
+    score = score - np.where(time_room_count > 1, 0.5, 0.0)
+    score = score + tables.capacity_score[activity_ids, rooms]
+    score = score + tables.facilitator_score[activity_ids, facilitators]
+    score = score + np.where(facilitator_slot_count == 1, 0.2, -0.2)
+    score = score - np.where(facilitator_total_count > 4, 0.5, 0.0)
+    score = score - np.where(tables.low_load_penalized[facilitators] & (facilitator_total_count <= 2), 0.4, 0.0)
+
+    # cumsum adds the activities left to right, the same order as the scalar loop
+    total_fitness = np.cumsum(score, axis=1)[:, -1] if encoded.shape[1] else np.zeros(encoded.shape[0])
+
+    # the pair rules, every term as its own column in the order fitness() adds them, so
+    # cumsum adds them one by one after the activity scores
+    hours = tables.hours[times]
+    in_remote = tables.remote_room[rooms]
+    first, second = tables.spread_pairs[:, 0], tables.spread_pairs[:, 1]
+    diff = np.abs(hours[:, first] - hours[:, second])
+    spread_terms = np.stack([np.where(diff > 4, 0.5, 0.0), np.where(diff == 0, -0.5, 0.0)], axis=2)
+    first, second = tables.sequence_pairs[:, 0], tables.sequence_pairs[:, 1]
+    diff = np.abs(hours[:, first] - hours[:, second])
+    mismatch = (diff == 1) & (in_remote[:, first] != in_remote[:, second])
+    sequence_terms = np.stack([np.where(diff == 0, -0.25, 0.0), np.where(diff == 1, 0.5, 0.0), np.where(mismatch, -0.4, 0.0), np.where(diff == 2, 0.25, 0.0)], axis=2)
+    terms = np.concatenate([total_fitness[:, None], spread_terms.reshape(len(encoded), -1), sequence_terms.reshape(len(encoded), -1)], axis=1)
+    total_fitness = np.cumsum(terms, axis=1)[:, -1]
+
+    return total_fitness
+
+def population_diversity(encoded):
+    # Chance that two schedules drawn from an encoded population differ in a gene, averaged over all genes
+    encoded = np.asarray(encoded)
+    population = encoded.shape[0]
+    genes = encoded.reshape(population, -1)
+    value_count = int(genes.max(initial=0)) + 1
+    keys = genes + np.arange(genes.shape[1]) * value_count
+    counts = np.bincount(keys.ravel(), minlength=genes.shape[1] * value_count).reshape(genes.shape[1], value_count)
+    shares = counts / max(population, 1)
+    return float(1.0 - (shares ** 2).sum(axis=1).mean()) if genes.shape[1] else 0.0
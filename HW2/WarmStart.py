@@ -0,0 +1,254 @@
+import argparse
+import copy
+import json
+import os
+import re
+import time
+import numpy as np
+import GeneticAlgorithm
+from IncrementalFitness import IncrementalFitness
+from PopulationArrays import PopulationBuffers, generational_step
+from Problem import compile_problem, load_problem
+from VectorizedFitness import batch_fitness
+
+# Re-optimization of an existing schedule after a small change to the problem, such as a room
+# closing or a facilitator becoming unavailable. Instead of starting genetic_algorithm() from
+# random schedules again:
+#   1. the old schedule is mapped onto the changed problem, and the activities the change
+#      affects (their time, room or facilitator is gone, their requirements or their room's
+#      capacity changed, or they are new) are marked
+#   2. only those activities are repaired, each gene set to its best value with IncrementalFitness
+#   3. the population is seeded with the repaired schedule and mutated copies of it and evolved
+#      with the array GA of PopulationArrays, and after every generation a schedule that moved
+#      more than max_drift unaffected activities away from the old schedule has the excess
+#      moved back
+
+# line of best_schedule.txt, "SLA100A: time=10 AM, room=Beach 301, facilitator=Banks"
+schedule_line = re.compile(r"^(.+?): time=(.+?), room=(.+?), facilitator=(.+)$")
+
+def read_schedule(path):
+    # {activity: (time, room, facilitator)} from a schedule file written by GeneticAlgorithm.py
+    schedule = {}
+    with open(path) as file:
+        for line in file:
+            match = schedule_line.match(line.strip())
+            if match:
+                schedule[match.group(1)] = match.group(2, 3, 4)
+    return schedule
+
+def write_schedule(path, tables, schedule, fitness):
+    # Same format as GeneticAlgorithm.py, so the result can be re-optimized again
+    with open(path, "w") as out_file:
+        out_file.write(f"Best schedule found, fitness = {fitness:.3f}:\n\n")
+        for activity, (time, room, facilitator) in zip(tables.activities_list, schedule):
+            out_file.write(f"{activity}: time={time}, room={room}, facilitator={facilitator}\n")
+
+def current_problem():
+    # The instance GeneticAlgorithm.py currently uses, as a problem dictionary
+    return {
+        "facilitators": GeneticAlgorithm.facilitators,
+        "times": GeneticAlgorithm.time_hour,
+        "rooms": GeneticAlgorithm.rooms,
+        "activities": GeneticAlgorithm.activities,
+        "rules": GeneticAlgorithm.rules
+    }
+
+def apply_changes(problem, changes):
+    # Returns a copy of problem with a change set applied. A change set is a dictionary with any of
+    #   remove_rooms, remove_facilitators, remove_times, remove_activities  lists of names
+    #   add_rooms {name: capacity}, add_times {name: hour}, add_facilitators [names]
+    #   add_activities, update_activities  {name: {"expected", "preferred", "other"}}, an
+    #                                      update only replaces the fields it gives
+    problem = copy.deepcopy(problem)
+    rules = problem["rules"]
+    for name in changes.get("remove_rooms", []):
+        del problem["rooms"][name]
+        rules.get("buildings", {}).pop(name, None)
+    for name in changes.get("remove_times", []):
+        del problem["times"][name]
+    removed = set(changes.get("remove_facilitators", []))
+    if removed:
+        problem["facilitators"] = [f for f in problem["facilitators"] if f not in removed]
+        rules["low_load_exempt"] = [f for f in rules.get("low_load_exempt", []) if f not in removed]
+        for activity in problem["activities"].values():
+            activity["preferred"] = [f for f in activity.get("preferred", []) if f not in removed]
+            activity["other"] = [f for f in activity.get("other", []) if f not in removed]
+    removed = set(changes.get("remove_activities", []))
+    for name in removed:
+        del problem["activities"][name]
+    for kind in ("spread_pairs", "sequence_pairs"):
+        rules[kind] = [pair for pair in rules.get(kind, []) if not removed.intersection(pair)]
+
+    problem["rooms"].update(changes.get("add_rooms", {}))
+    problem["times"].update(changes.get("add_times", {}))
+    problem["facilitators"] += [f for f in changes.get("add_facilitators", []) if f not in problem["facilitators"]]
+    problem["activities"].update(copy.deepcopy(changes.get("add_activities", {})))
+    for name, update in changes.get("update_activities", {}).items():
+        problem["activities"][name].update(update)
+    return problem
+
+def requirements(activity, facilitators):
+    # expected enrollment and the role of every listed facilitator that is still available
+    roles = {f: "other" for f in activity.get("other", []) if f in facilitators}
+    roles.update((f, "preferred") for f in activity.get("preferred", []) if f in facilitators)
+    return activity["expected"], roles
+
+def affected_activities(old_problem, problem, tables, old_schedule):
+    # Maps the old schedule onto the compiled tables of the changed problem. Returns the
+    # (activities, 3) genes, -1 where the old value no longer exists, and a mask of the
+    # activities the change affects. Dropping a removed facilitator from an activity's lists
+    # does not count as a change of its requirements
+    activities = len(tables.activities_list)
+    genes = np.full((activities, 3), -1, dtype=np.int64)
+    affected = np.zeros(activities, dtype=bool)
+    available = set(problem["facilitators"])
+    old_exempt, exempt = set(old_problem["rules"].get("low_load_exempt", [])), set(problem["rules"].get("low_load_exempt", []))
+    for a, name in enumerate(tables.activities_list):
+        if name not in old_schedule or name not in old_problem["activities"]:
+            affected[a] = True
+            continue
+        t, r, f = old_schedule[name]
+        genes[a] = (tables.time_index.get(t, -1), tables.room_index.get(r, -1), tables.facilitator_index.get(f, -1))
+        affected[a] = ((genes[a] < 0).any()
+                       or requirements(old_problem["activities"][name], available) != requirements(problem["activities"][name], available)
+                       or old_problem["rooms"].get(r) != problem["rooms"][r]
+                       or old_problem["times"].get(t) != problem["times"][t]
+                       or (f in old_exempt) != (f in exempt))
+    return genes, affected
+
+def repair(tables, genes, affected, rng, passes=3):
+    # Sets every gene of the affected activities to its best value in turn, until a pass changes
+    # nothing; the other activities keep their old genes. Missing values start out random
+    sizes = np.array([len(tables.time_names), len(tables.room_names), len(tables.facilitators)])
+    genes = genes.copy()
+    missing = genes < 0
+    genes[missing] = rng.integers(0, np.broadcast_to(sizes, genes.shape)[missing])
+    state = IncrementalFitness(tables, genes.tolist())
+    for _ in range(passes):
+        improved = False
+        for activity in np.flatnonzero(affected).tolist():
+            for field, size in enumerate(sizes.tolist()):
+                changes = [state.delta(activity, field, value) for value in range(size)]
+                best = int(np.argmax(changes))
+                if changes[best] > 0:
+                    state.apply(activity, field, best)
+                    improved = True
+        if not improved:
+            break
+    return np.array(state.genes, dtype=np.int64)
+
+def limit_drift(genes, old_genes, free, max_drift, rng):
+    # Moves activities of the (population, activities, 3) genes back to old_genes in place until
+    # every schedule differs from it in at most max_drift activities outside free; returns the
+    # rows that were changed
+    moved = (genes != old_genes[None]).any(axis=2) & ~free[None]
+    excess = moved.sum(axis=1) - max_drift
+    rows = np.flatnonzero(excess > 0)
+    for row in rows.tolist():
+        revert = rng.choice(np.flatnonzero(moved[row]), excess[row], replace=False)
+        genes[row, revert] = old_genes[revert]
+    return rows
+
+def drift(genes, old_genes, free):
+    # number of activities outside free that differ from the old schedule
+    return int(((genes != old_genes).any(axis=1) & ~free).sum())
+
+def seed_population(tables, repaired, population_size, mutations, rng):
+    # The repaired schedule and copies of it with 1 to mutations random gene changes each
+    sizes = np.array([len(tables.time_names), len(tables.room_names), len(tables.facilitators)])
+    genes = np.repeat(repaired[None], population_size, axis=0)
+    for row in range(1, population_size):
+        count = int(rng.integers(1, mutations + 1))
+        fields = rng.integers(0, 3, size=count)
+        genes[row, rng.integers(0, len(repaired), size=count), fields] = rng.integers(0, sizes[fields])
+    return genes
+
+def reoptimize(tables, old_genes, affected, population_size=100, max_generations=200, max_drift=None, mutations=3,
+               mutation_rate=None, selection_method="tournament", elitism=2, patience=30, target_fitness=None, seed=0):
+    # Repairs and evolves the old schedule as described at the top. old_genes and affected come
+    # from affected_activities(); max_drift None leaves the drift unlimited. Stops after
+    # max_generations, after patience generations without improvement or on reaching
+    # target_fitness. mutation_rate defaults to one gene change per child. Returns a dict like
+    # evolve_arrays() with the drift of the result and the fitness right after the repair
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    repaired = repair(tables, old_genes, affected, rng)
+    genes = seed_population(tables, repaired, population_size, mutations, rng)
+    if max_drift is not None:
+        limit_drift(genes, old_genes, affected, max_drift, rng)
+    buffers = PopulationBuffers(tables, population_size, rng, genes)
+    evaluations = population_size
+    mutation_rate = mutation_rate or 1.0 / len(tables.activities_list)
+    repaired_fitness = float(buffers.fitness[0])
+    best_fitness_so_far = float(buffers.fitness.max())
+    reached = (evaluations, time.perf_counter() - start) if target_fitness is not None and best_fitness_so_far >= target_fitness else None
+
+    generations = stale = 0
+    while generations < max_generations and reached is None and stale < patience:
+        generations += 1
+        evaluations += generational_step(buffers, mutation_rate, selection_method, elitism, rng)
+        if max_drift is not None:
+            rows = limit_drift(buffers.genes(), old_genes, affected, max_drift, rng)
+            if len(rows):
+                buffers.fitness[rows] = batch_fitness(tables, buffers.current[rows])
+                evaluations += len(rows)
+
+        current_best = float(buffers.fitness.max())
+        if current_best > best_fitness_so_far:
+            best_fitness_so_far, stale = current_best, 0
+        else:
+            stale += 1
+        if target_fitness is not None and current_best >= target_fitness:
+            reached = (evaluations, time.perf_counter() - start)
+
+    best = int(np.argmax(buffers.fitness))
+    return {
+        "schedule": tables.decode_schedule(buffers.current[best]),
+        "fitness": float(buffers.fitness[best]),
+        "repaired_fitness": repaired_fitness,
+        "affected": int(affected.sum()),
+        "drift": drift(buffers.current[best], old_genes, affected),
+        "generations": generations,
+        "evaluations": evaluations,
+        "seconds": time.perf_counter() - start,
+        "evaluations_to_target": reached[0] if reached else None,
+        "seconds_to_target": reached[1] if reached else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-optimize a schedule after a change to the problem")
+    parser.add_argument("--problem", help="JSON file or directory of CSV files with the old instance, the built-in instance by default")
+    parser.add_argument("--schedule", default="best_schedule.txt", help="schedule written by GeneticAlgorithm.py for the old instance")
+    parser.add_argument("--changes", help="JSON file with the change set")
+    parser.add_argument("--close-room", action="append", default=[], help="room that is no longer available, can be repeated")
+    parser.add_argument("--remove-facilitator", action="append", default=[], help="facilitator that is no longer available, can be repeated")
+    parser.add_argument("--population", type=int, default=100)
+    parser.add_argument("--generations", type=int, default=200)
+    parser.add_argument("--max-drift", type=int, default=3, help="unaffected activities that may move, a negative value leaves it unlimited")
+    parser.add_argument("--patience", type=int, default=30, help="generations without improvement before stopping")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="best_schedule_warm.txt", help="file for the new schedule, never the --schedule file")
+    args = parser.parse_args()
+    # the old schedule stays as it was, it is the reference the drift is measured against
+    if os.path.abspath(args.output) == os.path.abspath(args.schedule) or (os.path.exists(args.output) and os.path.samefile(args.output, args.schedule)):
+        parser.error(f"--output {args.output} would overwrite the --schedule file")
+    max_drift = args.max_drift if args.max_drift >= 0 else None
+
+    old_problem = load_problem(args.problem) if args.problem else current_problem()
+    changes = {}
+    if args.changes:
+        with open(args.changes) as file:
+            changes = json.load(file)
+    changes.setdefault("remove_rooms", []).extend(args.close_room)
+    changes.setdefault("remove_facilitators", []).extend(args.remove_facilitator)
+    problem = apply_changes(old_problem, changes)
+    tables = compile_problem(problem)
+    old_genes, affected = affected_activities(old_problem, problem, tables, read_schedule(args.schedule))
+
+    result = reoptimize(tables, old_genes, affected, args.population, args.generations, max_drift, patience=args.patience, seed=args.seed)
+    print(f"{result['affected']} of {len(tables.activities_list)} activities affected, fitness {result['repaired_fitness']:.3f} after repair, "
+          f"{result['fitness']:.3f} after {result['generations']} generations in {result['seconds']:.2f}s, {result['drift']} other activities moved")
+    write_schedule(args.output, tables, result["schedule"], result["fitness"])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import json
+import random
+import pytest
+from GeneticAlgorithm import fitness, genetic_algorithm
+from IslandModel import run_islands
+
+def best_fitnesses(path):
+    with open(path) as file:
+        return [json.loads(line)["best_fitness"] for line in file]
+
+# with elitism or steady-state replacement the best schedule is never lost
+@pytest.mark.parametrize("options", [{"elitism": 1}, {"elitism": 3, "selection_method": "tournament"}, {"steady_state": 16}, {"steady_state": 16, "cache_size": 200}])
+def test_best_fitness_never_drops(tmp_path, options):
+    random.seed(0)
+    schedule, best = genetic_algorithm(60, 40, metrics_path=tmp_path / "metrics.jsonl", **options)
+    history = best_fitnesses(tmp_path / "metrics.jsonl")
+    assert len(history) == 40
+    assert all(later >= earlier for earlier, later in zip(history, history[1:]))
+    assert best == pytest.approx(history[-1]) and best == pytest.approx(fitness(schedule))
+
+# islands keep their best schedules through elitism and migration
+def test_islands_never_lose_the_best_schedule():
+    schedule, best, history = run_islands(islands=2, population_size=60, max_generations=30, migration_interval=5, migrants=3, seed=0)
+    bests = [fitness for _, _, fitness in history]
+    assert [generation for _, generation, _ in history] == list(range(5, 31, 5))
+    assert all(later >= earlier for earlier, later in zip(bests, bests[1:]))
+    assert best == pytest.approx(fitness(schedule))
@@ -0,0 +1,47 @@
+import math
+import random
+import numpy as np
+from GeneticAlgorithm import fitness, fitness_tables, random_schedule
+from IncrementalFitness import IncrementalFitness
+from Problem import compile_problem, generate_problem
+from VectorizedFitness import batch_fitness
+
+def random_edit(tables, state, rng):
+    sizes = (len(tables.time_names), len(tables.room_names), len(tables.facilitators))
+    field = rng.randrange(3)
+    return rng.randrange(len(state.genes)), field, rng.randrange(sizes[field])
+
+# random single-gene edits scored with delta and applied with apply must keep the running
+# total equal to fitness() of the edited schedule
+def test_edits_match_full_fitness():
+    rng = random.Random(0)
+    for _ in range(20):
+        random.seed(rng.random())
+        state = IncrementalFitness(fitness_tables, random_schedule())
+        assert math.isclose(state.value, fitness(state.schedule()), abs_tol=1e-9)
+        for _ in range(500):
+            activity, field, value = random_edit(fitness_tables, state, rng)
+            before = fitness(state.schedule())
+            change = state.delta(activity, field, value)
+            if rng.random() < 0.5:
+                # delta alone must not change the state
+                assert math.isclose(fitness(state.schedule()), before, abs_tol=1e-9)
+                continue
+            assert math.isclose(state.apply(activity, field, value), change, abs_tol=1e-12)
+            after = fitness(state.schedule())
+            assert math.isclose(after - before, change, abs_tol=1e-9), (activity, field, value)
+            assert math.isclose(state.value, after, abs_tol=1e-6)
+
+# same on a generated instance with spread and sequence pairs, scored with batch_fitness
+def test_edits_match_batch_fitness_on_generated_instance():
+    rng = random.Random(1)
+    tables = compile_problem(generate_problem(300, rooms=20, facilitators=25, seed=1))
+    genes = np.random.default_rng(1).integers(0, [len(tables.time_names), len(tables.room_names), len(tables.facilitators)], size=(len(tables.activities_list), 3))
+    state = IncrementalFitness(tables, genes.tolist())
+    assert len(tables.spread_pairs) and len(tables.sequence_pairs)
+    for step in range(2000):
+        activity, field, value = random_edit(tables, state, rng)
+        state.apply(activity, field, value)
+        if step % 100 == 0:
+            assert math.isclose(state.value, float(batch_fitness(tables, np.array([state.genes]))[0]), abs_tol=1e-6)
+            assert math.isclose(state.value, state.full_value(), abs_tol=1e-6)